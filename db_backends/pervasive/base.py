@@ -0,0 +1,246 @@
+"""
+Pervasive (Actian Zen) database backend for Django, built on pyodbc.
+
+Connections are drawn from a per-process pool (see ``pool.py``) so that a
+request reuses an already negotiated ODBC session instead of opening a new
+one. Pooling is configured through ``OPTIONS['pool']``:
+
+    'OPTIONS': {
+        'driver': 'Pervasive ODBC Interface',
+        'pool': {'max_size': 5, 'timeout': 30},   # or True / False
+    }
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.base.client import BaseDatabaseClient
+from django.db.backends.base.creation import BaseDatabaseCreation
+from django.utils.functional import cached_property
+
+try:
+    import pyodbc as Database
+except ImportError as e:
+    raise ImproperlyConfigured('Error loading pyodbc module: %s' % e) from e
+
+from . import pool as connection_pool
+from .features import DatabaseFeatures
+from .introspection import DatabaseIntrospection
+from .operations import DatabaseOperations
+from .schema import DatabaseSchemaEditor
+
+DEFAULT_DRIVER = 'Pervasive ODBC Interface'
+
+DEFAULT_POOL_OPTIONS = {
+    'max_size': 5,
+    'min_size': 0,
+    'timeout': 30.0,
+    'max_idle': 600.0,
+    'max_lifetime': 3600.0,
+    'health_check_interval': 30.0,
+}
+
+
+class CursorWrapper:
+    """
+    Translate Django's ``format`` paramstyle (%s) into pyodbc's ``qmark``
+    style (?) and delegate everything else to the pyodbc cursor.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def convert_query(self, query, params):
+        if params is None:
+            return query
+        return query % (('?',) * len(params))
+
+    def execute(self, query, params=None):
+        if params is None:
+            return self.cursor.execute(query)
+        return self.cursor.execute(self.convert_query(query, params), tuple(params))
+
+    def executemany(self, query, param_list):
+        param_list = [tuple(params) for params in param_list]
+        if not param_list:
+            return None
+        return self.cursor.executemany(self.convert_query(query, param_list[0]), param_list)
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+
+class DatabaseWrapper(BaseDatabaseWrapper):
+    vendor = 'pervasive'
+    display_name = 'Pervasive'
+
+    data_types = {
+        'AutoField': 'IDENTITY',
+        'BigAutoField': 'BIGIDENTITY',
+        'BinaryField': 'LONGVARBINARY',
+        'BooleanField': 'BIT',
+        'CharField': 'VARCHAR(%(max_length)s)',
+        'DateField': 'DATE',
+        'DateTimeField': 'TIMESTAMP',
+        'DecimalField': 'DECIMAL(%(max_digits)s, %(decimal_places)s)',
+        'DurationField': 'BIGINT',
+        'FileField': 'VARCHAR(%(max_length)s)',
+        'FilePathField': 'VARCHAR(%(max_length)s)',
+        'FloatField': 'DOUBLE',
+        'IntegerField': 'INTEGER',
+        'BigIntegerField': 'BIGINT',
+        'IPAddressField': 'CHAR(15)',
+        'GenericIPAddressField': 'CHAR(39)',
+        'JSONField': 'LONGVARCHAR',
+        'PositiveBigIntegerField': 'BIGINT',
+        'PositiveIntegerField': 'INTEGER',
+        'PositiveSmallIntegerField': 'SMALLINT',
+        'SlugField': 'VARCHAR(%(max_length)s)',
+        'SmallAutoField': 'SMALLIDENTITY',
+        'SmallIntegerField': 'SMALLINT',
+        'TextField': 'LONGVARCHAR',
+        'TimeField': 'TIME',
+        'UUIDField': 'CHAR(32)',
+    }
+    operators = {
+        'exact': '= %s',
+        'iexact': '= UPPER(%s)',
+        'contains': "LIKE %s ESCAPE '\\'",
+        'icontains': "LIKE UPPER(%s) ESCAPE '\\'",
+        'gt': '> %s',
+        'gte': '>= %s',
+        'lt': '< %s',
+        'lte': '<= %s',
+        'startswith': "LIKE %s ESCAPE '\\'",
+        'endswith': "LIKE %s ESCAPE '\\'",
+        'istartswith': "LIKE UPPER(%s) ESCAPE '\\'",
+        'iendswith': "LIKE UPPER(%s) ESCAPE '\\'",
+    }
+    pattern_esc = r"REPLACE(REPLACE(REPLACE({}, '\', '\\'), '%%', '\%%'), '_', '\_')"
+    pattern_ops = {
+        'contains': "LIKE '%%' + {} + '%%' ESCAPE '\\'",
+        'icontains': "LIKE '%%' + UPPER({}) + '%%' ESCAPE '\\'",
+        'startswith': "LIKE {} + '%%' ESCAPE '\\'",
+        'istartswith': "LIKE UPPER({}) + '%%' ESCAPE '\\'",
+        'endswith': "LIKE '%%' + {} ESCAPE '\\'",
+        'iendswith': "LIKE '%%' + UPPER({}) ESCAPE '\\'",
+    }
+
+    Database = Database
+    SchemaEditorClass = DatabaseSchemaEditor
+    client_class = BaseDatabaseClient
+    creation_class = BaseDatabaseCreation
+    features_class = DatabaseFeatures
+    introspection_class = DatabaseIntrospection
+    ops_class = DatabaseOperations
+
+    def get_connection_params(self):
+        settings_dict = self.settings_dict
+        options = settings_dict['OPTIONS']
+
+        params = {}
+        if options.get('dsn'):
+            params['DSN'] = options['dsn']
+        else:
+            params['DRIVER'] = '{%s}' % options.get('driver', DEFAULT_DRIVER)
+        if settings_dict['HOST']:
+            params['ServerName'] = settings_dict['HOST']
+        if settings_dict['PORT']:
+            params['Port'] = str(settings_dict['PORT'])
+        if settings_dict['NAME']:
+            params['DBQ'] = settings_dict['NAME']
+        if settings_dict['USER']:
+            params['UID'] = settings_dict['USER']
+        if settings_dict['PASSWORD']:
+            params['PWD'] = settings_dict['PASSWORD']
+
+        # extra_params can add driver-specific keys; the explicit settings
+        # above take precedence over duplicates.
+        for pair in (options.get('extra_params') or '').split(';'):
+            key, sep, value = pair.partition('=')
+            if sep and key.strip() and key.strip() not in params:
+                params[key.strip()] = value.strip()
+
+        return {
+            'connection_string': ';'.join('%s=%s' % item for item in params.items()),
+            'timeout': options.get('timeout', 0),
+        }
+
+    @cached_property
+    def pool_options(self):
+        """Pool settings from OPTIONS['pool'], or None if pooling is off."""
+        configured = self.settings_dict['OPTIONS'].get('pool', True)
+        if not configured:
+            return None
+        if configured is True:
+            configured = {}
+        unknown = set(configured) - set(DEFAULT_POOL_OPTIONS)
+        if unknown:
+            raise ImproperlyConfigured(
+                'Unknown Pervasive pool option(s): %s' % ', '.join(sorted(unknown))
+            )
+        return {**DEFAULT_POOL_OPTIONS, **configured}
+
+    @property
+    def pool(self):
+        """The process-wide connection pool for this alias, if enabled."""
+        options = self.pool_options
+        if options is None:
+            return None
+        conn_params = self.get_connection_params()
+        key = (self.alias, conn_params['connection_string'])
+        return connection_pool.get_pool(
+            key, lambda: self._connect(conn_params), **options
+        )
+
+    def _connect(self, conn_params):
+        return Database.connect(
+            conn_params['connection_string'],
+            timeout=conn_params['timeout'],
+        )
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return self._connect(conn_params)
+        return pool.acquire()
+
+    def init_connection_state(self):
+        pass
+
+    def create_cursor(self, name=None):
+        return CursorWrapper(self.connection.cursor())
+
+    def _set_autocommit(self, autocommit):
+        with self.wrap_database_errors:
+            self.connection.autocommit = autocommit
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = self.pool
+        with self.wrap_database_errors:
+            if pool is None:
+                return self.connection.close()
+            # Connections that raised non-data errors go back only if they
+            # still answer a ping; otherwise they are dropped from the pool.
+            discard = self.errors_occurred and not self.is_usable()
+            pool.release(self.connection, discard=discard)
+
+    def is_usable(self):
+        try:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Database.Error:
+            return False
+        return True
+
+    def get_database_version(self):
+        with self.temporary_connection():
+            version = self.connection.getinfo(Database.SQL_DBMS_VER)
+        return tuple(int(part) for part in version.split('.') if part.isdigit())
@@ -0,0 +1,37 @@
+from django.db.backends.base.features import BaseDatabaseFeatures
+
+
+class DatabaseFeatures(BaseDatabaseFeatures):
+    minimum_database_version = None
+    # Pervasive/Zen returns IDENTITY values through @@IDENTITY only.
+    can_return_columns_from_insert = False
+    can_return_rows_from_bulk_insert = False
+    has_bulk_insert = False
+    # Declared statically so Django doesn't probe with a scratch table.
+    supports_transactions = True
+    uses_savepoints = True
+    can_release_savepoints = True
+    supports_timezones = False
+    has_zoneinfo_database = False
+    supports_json_field = False
+    supports_explaining_query_execution = False
+    supports_update_conflicts = False
+    supports_update_conflicts_with_target = False
+    supports_ignore_conflicts = False
+    has_select_for_update = False
+    supports_sequence_reset = False
+    supports_paramstyle_pyformat = False
+    supports_index_on_text_field = False
+    supports_partial_indexes = False
+    supports_expression_indexes = False
+    supports_covering_indexes = False
+    supports_boolean_expr_in_select_clause = False
+    supports_order_by_nulls_modifier = False
+    supports_column_check_constraints = False
+    supports_table_check_constraints = False
+    can_introspect_check_constraints = False
+    supports_collation_on_charfield = False
+    supports_collation_on_textfield = False
+    supports_regex_backreferencing = False
+    requires_literal_defaults = True
+    connection_persists_old_columns = True
@@ -0,0 +1,135 @@
+from collections import namedtuple
+
+from django.db.backends.base.introspection import (
+    BaseDatabaseIntrospection, FieldInfo as BaseFieldInfo, TableInfo,
+)
+
+FieldInfo = namedtuple('FieldInfo', BaseFieldInfo._fields + ('is_autofield',))
+
+
+class DatabaseIntrospection(BaseDatabaseIntrospection):
+    # Maps ODBC SQL type codes (as reported by SQLColumns) to field types.
+    data_types_reverse = {
+        -11: 'UUIDField',        # SQL_GUID
+        -10: 'TextField',        # SQL_WLONGVARCHAR
+        -9: 'CharField',         # SQL_WVARCHAR
+        -8: 'CharField',         # SQL_WCHAR
+        -7: 'BooleanField',      # SQL_BIT
+        -6: 'SmallIntegerField', # SQL_TINYINT
+        -5: 'BigIntegerField',   # SQL_BIGINT
+        -4: 'BinaryField',       # SQL_LONGVARBINARY
+        -3: 'BinaryField',       # SQL_VARBINARY
+        -2: 'BinaryField',       # SQL_BINARY
+        -1: 'TextField',         # SQL_LONGVARCHAR
+        1: 'CharField',          # SQL_CHAR
+        2: 'DecimalField',       # SQL_NUMERIC
+        3: 'DecimalField',       # SQL_DECIMAL
+        4: 'IntegerField',       # SQL_INTEGER
+        5: 'SmallIntegerField',  # SQL_SMALLINT
+        6: 'FloatField',         # SQL_FLOAT
+        7: 'FloatField',         # SQL_REAL
+        8: 'FloatField',         # SQL_DOUBLE
+        9: 'DateField',          # SQL_DATE
+        10: 'TimeField',         # SQL_TIME
+        11: 'DateTimeField',     # SQL_TIMESTAMP
+        12: 'CharField',         # SQL_VARCHAR
+        91: 'DateField',         # SQL_TYPE_DATE
+        92: 'TimeField',         # SQL_TYPE_TIME
+        93: 'DateTimeField',     # SQL_TYPE_TIMESTAMP
+    }
+
+    def get_field_type(self, data_type, description):
+        field_type = super().get_field_type(data_type, description)
+        if description.is_autofield:
+            if field_type == 'BigIntegerField':
+                return 'BigAutoField'
+            if field_type == 'SmallIntegerField':
+                return 'SmallAutoField'
+            return 'AutoField'
+        return field_type
+
+    def get_table_list(self, cursor):
+        """Return user tables and views, skipping the X$ data dictionary."""
+        return [
+            TableInfo(row.table_name, 'v' if row.table_type == 'VIEW' else 't')
+            for row in cursor.tables(tableType='TABLE,VIEW').fetchall()
+            if not row.table_name.upper().startswith('X$')
+        ]
+
+    def get_table_description(self, cursor, table_name):
+        return [
+            FieldInfo(
+                row.column_name,
+                row.data_type,
+                None,
+                row.column_size,
+                row.column_size,
+                row.decimal_digits,
+                bool(row.nullable),
+                row.column_def,
+                None,
+                'IDENTITY' in (row.type_name or '').upper(),
+            )
+            for row in cursor.columns(table=table_name).fetchall()
+        ]
+
+    def get_sequences(self, cursor, table_name, table_fields=()):
+        return [
+            {'table': table_name, 'column': info.name}
+            for info in self.get_table_description(cursor, table_name)
+            if info.is_autofield
+        ]
+
+    def get_relations(self, cursor, table_name):
+        return {
+            row.fkcolumn_name: (row.pkcolumn_name, row.pktable_name)
+            for row in cursor.foreignKeys(foreignTable=table_name).fetchall()
+        }
+
+    def get_primary_key_columns(self, cursor, table_name):
+        rows = sorted(cursor.primaryKeys(table=table_name).fetchall(), key=lambda row: row.key_seq)
+        return [row.column_name for row in rows] or None
+
+    def get_constraints(self, cursor, table_name):
+        constraints = {}
+
+        primary_key = self.get_primary_key_columns(cursor, table_name)
+        if primary_key:
+            constraints['PRIMARY'] = {
+                'columns': primary_key,
+                'primary_key': True,
+                'unique': True,
+                'foreign_key': None,
+                'check': False,
+                'index': False,
+            }
+
+        for row in cursor.foreignKeys(foreignTable=table_name).fetchall():
+            name = row.fk_name or 'fk_%s_%s' % (table_name, row.fkcolumn_name)
+            constraint = constraints.setdefault(name, {
+                'columns': [],
+                'primary_key': False,
+                'unique': False,
+                'foreign_key': (row.pktable_name, row.pkcolumn_name),
+                'check': False,
+                'index': False,
+            })
+            constraint['columns'].append(row.fkcolumn_name)
+
+        for row in cursor.statistics(table=table_name).fetchall():
+            if not row.index_name:
+                continue
+            constraint = constraints.setdefault(row.index_name, {
+                'columns': [],
+                'orders': [],
+                'primary_key': False,
+                'unique': not row.non_unique,
+                'foreign_key': None,
+                'check': False,
+                'index': True,
+                'type': 'idx',
+            })
+            constraint['columns'].append(row.column_name)
+            constraint.setdefault('orders', []).append('DESC' if row.asc_or_desc == 'D' else 'ASC')
+
+        return constraints
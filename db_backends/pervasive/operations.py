@@ -0,0 +1,153 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.db import NotSupportedError
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.models.expressions import Exists, ExpressionWrapper
+from django.db.models.lookups import Lookup
+from django.utils import timezone
+
+
+class DatabaseOperations(BaseDatabaseOperations):
+    cast_char_field_without_max_length = 'VARCHAR(8000)'
+
+    # ODBC scalar functions supported by the Zen SQL engine.
+    _extract_functions = {
+        'year': 'YEAR',
+        'quarter': 'QUARTER',
+        'month': 'MONTH',
+        'week': 'WEEK',
+        'week_day': 'DAYOFWEEK',
+        'day': 'DAYOFMONTH',
+        'hour': 'HOUR',
+        'minute': 'MINUTE',
+        'second': 'SECOND',
+    }
+
+    def quote_name(self, name):
+        if name.startswith('"') and name.endswith('"'):
+            return name
+        return '"%s"' % name
+
+    def no_limit_value(self):
+        return None
+
+    def max_name_length(self):
+        # V2 metadata allows 128 character identifiers.
+        return 128
+
+    def last_insert_id(self, cursor, table_name, pk_name):
+        cursor.execute('SELECT @@IDENTITY')
+        return cursor.fetchone()[0]
+
+    def conditional_expression_supported_in_where_clause(self, expression):
+        # BIT columns must be compared to a value ("calibrated" = 0) for the
+        # engine to accept the predicate and use an index on the column.
+        if isinstance(expression, (Exists, Lookup)):
+            return True
+        if isinstance(expression, ExpressionWrapper) and expression.conditional:
+            return self.conditional_expression_supported_in_where_clause(expression.expression)
+        if getattr(expression, 'conditional', False):
+            return False
+        return super().conditional_expression_supported_in_where_clause(expression)
+
+    def lookup_cast(self, lookup_type, internal_type=None):
+        if lookup_type in ('iexact', 'icontains', 'istartswith', 'iendswith'):
+            return 'UPPER(%s)'
+        return '%s'
+
+    def sql_flush(self, style, tables, *, reset_sequences=False, allow_cascade=False):
+        return [
+            '%s %s;' % (style.SQL_KEYWORD('DELETE FROM'), style.SQL_FIELD(self.quote_name(table)))
+            for table in tables
+        ]
+
+    # ----- date and time -----
+
+    def _check_tzname(self, tzname):
+        # Datetimes are stored as naive UTC; Zen has no time zone support to
+        # convert them to another zone server-side.
+        if tzname and tzname != 'UTC':
+            raise NotSupportedError('Pervasive cannot convert datetimes to %s.' % tzname)
+
+    def date_extract_sql(self, lookup_type, sql, params):
+        try:
+            function = self._extract_functions[lookup_type]
+        except KeyError:
+            raise NotSupportedError('Extract %r is not supported on Pervasive.' % lookup_type)
+        return '%s(%s)' % (function, sql), params
+
+    def time_extract_sql(self, lookup_type, sql, params):
+        return self.date_extract_sql(lookup_type, sql, params)
+
+    def datetime_extract_sql(self, lookup_type, sql, params, tzname):
+        self._check_tzname(tzname)
+        return self.date_extract_sql(lookup_type, sql, params)
+
+    def datetime_cast_date_sql(self, sql, params, tzname):
+        self._check_tzname(tzname)
+        return 'CONVERT(%s, SQL_DATE)' % sql, params
+
+    def datetime_cast_time_sql(self, sql, params, tzname):
+        self._check_tzname(tzname)
+        return 'CONVERT(%s, SQL_TIME)' % sql, params
+
+    def date_trunc_sql(self, lookup_type, sql, params, tzname=None):
+        raise NotSupportedError('Trunc is not supported on Pervasive.')
+
+    def datetime_trunc_sql(self, lookup_type, sql, params, tzname):
+        raise NotSupportedError('Trunc is not supported on Pervasive.')
+
+    def time_trunc_sql(self, lookup_type, sql, params, tzname=None):
+        raise NotSupportedError('Trunc is not supported on Pervasive.')
+
+    def regex_lookup(self, lookup_type):
+        raise NotSupportedError('Regular expression lookups are not supported on Pervasive.')
+
+    # ----- value adaptation -----
+
+    def adapt_datetimefield_value(self, value):
+        if value is None:
+            return None
+        if hasattr(value, 'resolve_expression'):
+            return value
+        if timezone.is_aware(value):
+            if not settings.USE_TZ:
+                raise ValueError('Pervasive does not support timezone-aware datetimes when USE_TZ is False.')
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        return value
+
+    def adapt_timefield_value(self, value):
+        if value is None:
+            return None
+        if hasattr(value, 'resolve_expression'):
+            return value
+        if timezone.is_aware(value):
+            raise ValueError('Pervasive does not support timezone-aware times.')
+        return value
+
+    def get_db_converters(self, expression):
+        converters = super().get_db_converters(expression)
+        internal_type = expression.output_field.get_internal_type()
+        if internal_type == 'BooleanField':
+            converters.append(self.convert_booleanfield_value)
+        elif internal_type == 'DateTimeField':
+            if settings.USE_TZ:
+                converters.append(self.convert_datetimefield_value)
+        elif internal_type == 'UUIDField':
+            converters.append(self.convert_uuidfield_value)
+        return converters
+
+    def convert_booleanfield_value(self, value, expression, connection):
+        return bool(value) if value in (0, 1) else value
+
+    def convert_datetimefield_value(self, value, expression, connection):
+        if value is not None:
+            value = timezone.make_aware(value, self.connection.timezone)
+        return value
+
+    def convert_uuidfield_value(self, value, expression, connection):
+        if value is not None:
+            value = uuid.UUID(value)
+        return value
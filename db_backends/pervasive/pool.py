@@ -0,0 +1,272 @@
+"""
+Connection pool for the Pervasive backend.
+
+Negotiating an ODBC session with the Pervasive server is far more expensive
+than the queries we run on it, so each worker process keeps a bounded set of
+open pyodbc connections and hands them out to requests. Django closes its
+connection at the end of every request (CONN_MAX_AGE=0); with the pool that
+close simply returns the session for the next request to reuse.
+"""
+import os
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class _PooledConnection:
+    """Book-keeping for a connection owned by the pool."""
+
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    A thread-safe, bounded pool of DB-API connections.
+
+    ``connect`` is a zero-argument callable returning a new connection.
+    Idle connections are health-checked with ``ping_sql`` before they are
+    handed out again once they have been idle longer than
+    ``health_check_interval`` seconds, and are discarded once older than
+    ``max_lifetime`` or idle longer than ``max_idle``.
+    """
+
+    def __init__(self, connect, max_size=5, min_size=0, timeout=30.0,
+                 max_idle=600.0, max_lifetime=3600.0,
+                 health_check_interval=30.0, ping_sql='SELECT 1'):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        if min_size > max_size:
+            raise ValueError('min_size cannot exceed max_size')
+        self._connect = connect
+        self.max_size = max_size
+        self.min_size = min_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.ping_sql = ping_sql
+
+        self._lock = threading.Condition()
+        self._idle = []
+        self._in_use = {}
+        self._opening = 0
+        self._pid = os.getpid()
+
+        # Counters exposed through stats()
+        self.connects = 0
+        self.reuses = 0
+        self.discards = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    # ----- public API -----
+
+    def acquire(self):
+        """Check a connection out of the pool, opening one if allowed."""
+        self._check_fork()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                # A slot was reserved; connect outside the lock since
+                # negotiating an ODBC session can take seconds.
+                try:
+                    entry = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opening -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._opening -= 1
+                    self.connects += 1
+                    self._in_use[id(entry.connection)] = entry
+                return entry.connection
+
+            if self._is_healthy(entry):
+                with self._lock:
+                    entry.last_used = time.monotonic()
+                    self._in_use[id(entry.connection)] = entry
+                    self.reuses += 1
+                return entry.connection
+
+            with self._lock:
+                self._discard(entry)
+                self._lock.notify()
+
+    def _reserve(self, deadline):
+        """
+        Pop an idle entry, or reserve a slot for a new connection and return
+        None. Block until one of the two is possible or ``deadline`` passes.
+        """
+        with self._lock:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size() < self.max_size:
+                    self._opening += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        'No connection available within %.1f seconds '
+                        '(max_size=%d)' % (self.timeout, self.max_size)
+                    )
+                self.waits += 1
+                self._lock.wait(remaining)
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, or close it if ``discard``."""
+        with self._lock:
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                # Not ours (e.g. checked out before a fork); just close it.
+                _close_quietly(connection)
+                return
+            if discard or self._expired(entry, time.monotonic()):
+                self._discard(entry)
+            else:
+                try:
+                    # Never hand out a session with an open transaction.
+                    connection.rollback()
+                except Exception:
+                    self._discard(entry)
+                else:
+                    entry.last_used = time.monotonic()
+                    self._idle.append(entry)
+            self._lock.notify()
+
+    def fill(self):
+        """Open connections until ``min_size`` are idle or in use."""
+        self._check_fork()
+        with self._lock:
+            # Reserve the slots, then connect outside the lock as acquire()
+            # does, so concurrent requests aren't held up by the fill.
+            missing = max(self.min_size - self._size(), 0)
+            self._opening += missing
+        for opened in range(missing):
+            try:
+                entry = self._open()
+            except Exception:
+                with self._lock:
+                    self._opening -= missing - opened
+                    self._lock.notify_all()
+                raise
+            with self._lock:
+                self._opening -= 1
+                self.connects += 1
+                self._idle.append(entry)
+                self._lock.notify()
+
+    def close_all(self):
+        """Close every idle connection; in-use ones close on release."""
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        """Return a snapshot of pool utilisation and lifetime counters."""
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'min_size': self.min_size,
+                'size': self._size(),
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'connects': self.connects,
+                'reuses': self.reuses,
+                'discards': self.discards,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+            }
+
+    # ----- internals -----
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _open(self):
+        return _PooledConnection(self._connect())
+
+    def _discard(self, entry):
+        self.discards += 1
+        _close_quietly(entry.connection)
+
+    def _expired(self, entry, now):
+        if self.max_lifetime is not None and now - entry.created_at > self.max_lifetime:
+            return True
+        return self.max_idle is not None and now - entry.last_used > self.max_idle
+
+    def _is_healthy(self, entry):
+        now = time.monotonic()
+        if self._expired(entry, now):
+            return False
+        if self.health_check_interval is None or now - entry.last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = entry.connection.cursor()
+            try:
+                cursor.execute(self.ping_sql)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    def _check_fork(self):
+        # ODBC sessions must not be shared between a parent and a forked
+        # worker (gunicorn --preload); start afresh in the child.
+        pid = os.getpid()
+        if pid != self._pid:
+            with self._lock:
+                if pid != self._pid:
+                    self._idle = []
+                    self._in_use = {}
+                    self._opening = 0
+                    self._pid = pid
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, connect, **options):
+    """Return the process-wide pool registered under ``key``, creating it."""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(connect, **options)
+        return pool
+
+
+def all_pools():
+    """Return a ``{key: pool}`` snapshot of every pool in this process."""
+    with _pools_lock:
+        return dict(_pools)
+
+
+def close_all_pools():
+    """Close idle connections in every pool and forget the pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,32 @@
+import datetime
+
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+
+
+class DatabaseSchemaEditor(BaseDatabaseSchemaEditor):
+    sql_rename_table = 'ALTER TABLE %(old_table)s RENAME TO %(new_table)s'
+    sql_delete_table = 'DROP TABLE %(table)s'
+
+    sql_alter_column_type = 'ALTER COLUMN %(column)s %(type)s%(collation)s'
+    sql_alter_column_null = 'ALTER COLUMN %(column)s %(type)s NULL'
+    sql_alter_column_not_null = 'ALTER COLUMN %(column)s %(type)s NOT NULL'
+    sql_delete_column = 'ALTER TABLE %(table)s DROP %(column)s'
+    sql_create_column_inline_fk = None
+
+    sql_delete_index = 'DROP INDEX %(table)s.%(name)s'
+
+    def quote_value(self, value):
+        if isinstance(value, (datetime.date, datetime.time, datetime.datetime)):
+            return "'%s'" % value
+        if isinstance(value, str):
+            return "'%s'" % value.replace("'", "''")
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return '0x%s' % bytes(value).hex()
+        if isinstance(value, bool):
+            return str(int(value))
+        if value is None:
+            return 'NULL'
+        return str(value)
+
+    def prepare_default(self, value):
+        return self.quote_value(value)
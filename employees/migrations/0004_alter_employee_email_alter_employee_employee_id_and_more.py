@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_alter_employee_options'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='employee_id',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='employee',
+            name='employee_number',
+            field=models.CharField(db_index=True, default='', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='employees_name_idx'),
+        ),
+    ]
@@ -3,15 +3,20 @@ from django.db import models
 class Employee(models.Model):
     # example fields
     name = models.CharField(max_length=100)
-    employee_id = models.CharField(max_length=20)
+    employee_id = models.CharField(max_length=20, db_index=True)
     department = models.CharField(max_length=100)
-    email = models.EmailField()
+    email = models.EmailField(db_index=True)
     first_name = models.CharField(max_length=50, default='')
     last_name = models.CharField(max_length=50, default='')
-    employee_number = models.CharField(max_length=20, default='')
+    employee_number = models.CharField(max_length=20, default='', db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Backs Meta.ordering and keyset pagination
+            models.Index(fields=['last_name', 'first_name', 'id'], name='employees_name_idx'),
+        ]
 
     def __str__(self):
         if self.first_name and self.last_name:
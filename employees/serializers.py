@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Employee
 from tools.models import Tool
+from toolprogram.profiling import ProfiledSerializerMixin
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Employee
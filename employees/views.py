@@ -3,38 +3,60 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, D
 from django.urls import reverse_lazy
 from .models import Employee
 from .serializers import EmployeeSerializer
+from sync.conditional import ConditionalGetMixin
+from toolprogram.cache import CachedListMixin, CachedListViewMixin
+from toolprogram.export import ExportMixin
+from toolprogram.pagination import KeysetListViewMixin
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(ConditionalGetMixin, CachedListMixin, ExportMixin, viewsets.ModelViewSet):
     """
     API endpoint for employees
     """
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
     permission_classes = [permissions.AllowAny]
+    cache_group = 'employees'
+    export_name = 'employees'
+    export_fields = ['id', 'employee_id', 'employee_number', 'name', 'first_name', 'last_name',
+                     'department', 'email', 'updated_at']
+    # Most queries per GET (see toolprogram.budgets); list and retrieve
+    # include the ETag version check
+    query_budgets = {'list': 3, 'retrieve': 2, 'export': 1}
 
-class EmployeeListView(ListView):
+class EmployeeListView(CachedListViewMixin, KeysetListViewMixin, ListView):
     model = Employee
     template_name = 'employees/employee_list.html'
     context_object_name = 'employees'
+    cache_group = 'employees'
+    # The response-cache version check and the page
+    query_budget = 2
+
+    def get_queryset(self):
+        # Only the columns the list shows
+        return super().get_queryset().only('name', 'first_name', 'last_name')
 
 class EmployeeDetailView(DetailView):
     model = Employee
     template_name = 'employees/employee_detail.html'
     context_object_name = 'employee'
+    query_budget = 1
 
 class EmployeeCreateView(CreateView):
     model = Employee
     fields = '__all__'
     template_name = 'employees/employee_form.html'
     success_url = reverse_lazy('employees:employee_list')
+    query_budget = 0
 
 class EmployeeUpdateView(UpdateView):
     model = Employee
     fields = '__all__'
     template_name = 'employees/employee_form.html'
     success_url = reverse_lazy('employees:employee_list')
+    query_budget = 1
 
 class EmployeeDeleteView(DeleteView):
     model = Employee
     template_name = 'employees/employee_confirm_delete.html'
     success_url = reverse_lazy('employees:employee_list')
+    query_budget = 1
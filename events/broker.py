@@ -0,0 +1,226 @@
+"""
+Publish/subscribe for the /api/events/ stream.
+
+Each process has one ``Broker`` holding its connected subscribers. With
+the ``local`` backend ``publish()`` hands events straight to it, which is
+enough for a single worker. With the ``database`` backend events are
+written to the ``Event`` table, in the separate ``events`` SQLite
+database, and a poller thread in every worker reads new rows and
+dispatches them, so clients of any worker see every event.
+"""
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'local',
+    'POLL_INTERVAL': 0.5,
+    'HEARTBEAT': 15.0,
+    'QUEUE_SIZE': 1000,
+    'HISTORY': 1000,
+    'RETENTION': 300.0,
+}
+
+
+def get_option(name):
+    return getattr(settings, 'EVENTS', {}).get(name, DEFAULTS[name])
+
+
+class Subscription:
+    """A subscriber's bounded queue; overflowing drops the oldest event"""
+
+    def __init__(self, broker, types=None, maxsize=None):
+        self.broker = broker
+        self.types = set(types) if types else None
+        self.maxsize = maxsize or get_option('QUEUE_SIZE')
+        self.dropped = 0
+
+    def wants(self, event):
+        return self.types is None or event['type'] in self.types
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class ThreadSubscription(Subscription):
+    """Subscription read by a blocking (WSGI) consumer"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue = queue.Queue(self.maxsize)
+
+    def deliver(self, event):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """Return the next event, or None after ``timeout`` seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """Subscription read by an asyncio (ASGI) consumer"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.maxsize)
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        # Publishers run in worker threads; hand off to the consumer's loop
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            self.close()  # Loop closed: the client has gone
+
+    async def get(self, timeout):
+        """Return the next event, or None after ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker:
+    """In-process fan-out to subscribers, with a short replay history"""
+
+    def __init__(self, history=None):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history or get_option('HISTORY'))
+        self._ids = itertools.count(1)
+
+    def subscribe(self, subscription, last_event_id=None):
+        """Register ``subscription``; replay history newer than ``last_event_id``"""
+        with self._lock:
+            self._subscribers.add(subscription)
+            backlog = [e for e in self._history if last_event_id is not None and e['id'] > last_event_id]
+        for event in backlog:
+            if subscription.wants(event):
+                subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def dispatch(self, event):
+        """Deliver an event that already carries its id"""
+        with self._lock:
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.wants(event):
+                subscription.deliver(event)
+
+    def publish_local(self, event_type, data):
+        event = {'id': next(self._ids), 'type': event_type, 'data': data}
+        self.dispatch(event)
+        return event
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+class DatabasePoller(threading.Thread):
+    """Reads new Event rows and dispatches them to this process's broker"""
+
+    def __init__(self, broker):
+        super().__init__(name='events-poller', daemon=True)
+        self.broker = broker
+        self.last_id = None
+        self.last_polled = None
+        self.last_cleanup = 0.0
+        self.stopped = threading.Event()
+
+    def poll(self):
+        from .models import Event
+
+        if self.last_id is None:
+            # Start from the newest event; history before we started is not replayed
+            latest = Event.objects.order_by('-id').values_list('id', flat=True).first()
+            self.last_id = latest or 0
+        for row in Event.objects.filter(id__gt=self.last_id).order_by('id')[:500]:
+            self.last_id = row.id
+            self.broker.dispatch({'id': row.id, 'type': row.type, 'data': row.data})
+        self.last_polled = time.time()
+
+        now = time.monotonic()
+        if now - self.last_cleanup > 60:
+            self.last_cleanup = now
+            Event.purge_older_than(get_option('RETENTION'))
+
+    def run(self):
+        interval = get_option('POLL_INTERVAL')
+        while not self.stopped.wait(interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Event poll failed")
+            finally:
+                close_old_connections()
+
+
+_broker = None
+_poller = None
+_state_lock = threading.Lock()
+
+
+def get_broker():
+    """Return this process's broker, starting the poller for the database backend"""
+    global _broker, _poller
+    with _state_lock:
+        if _broker is None:
+            _broker = Broker()
+        if get_option('BACKEND') == 'database' and (_poller is None or not _poller.is_alive()):
+            _poller = DatabasePoller(_broker)
+            _poller.start()
+        return _broker
+
+
+def get_poller():
+    """This process's database poller, or None if it hasn't been started"""
+    return _poller
+
+
+def publish(event_type, data):
+    """
+    Publish an event once the current transaction commits, so clients
+    never see changes that are rolled back.
+    """
+    def send():
+        if get_option('BACKEND') == 'database':
+            from .models import Event
+            Event.objects.create(type=event_type, data=data)
+        else:
+            get_broker().publish_local(event_type, data)
+
+    transaction.on_commit(send)
@@ -0,0 +1,22 @@
+import datetime
+
+from django.db import models
+from django.utils import timezone
+
+
+class Event(models.Model):
+    """Published event, shared between workers by the database backend"""
+    type = models.CharField(max_length=50)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.type} #{self.id}"
+
+    @classmethod
+    def purge_older_than(cls, seconds):
+        cutoff = timezone.now() - datetime.timedelta(seconds=seconds)
+        return cls.objects.filter(created_at__lt=cutoff).delete()[0]
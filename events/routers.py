@@ -0,0 +1,25 @@
+class EventsRouter:
+    """
+    Keep the events app in the ``events`` database (a SQLite file next to
+    the project), so the database fan-out's polling and writes stay off
+    the default database, which is the Pervasive ERP server in production.
+    """
+    app_label = 'events'
+    database = 'events'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.database
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == self.app_label:
+            return db == self.database
+        if db == self.database:
+            return False
+        return None
@@ -0,0 +1,46 @@
+"""
+Turn tool changes into /api/events/ events.
+
+Single-row writes publish ``tool.created``, ``tool.updated`` and
+``tool.deleted`` with the scanner payload; bulk writes publish
+``tools.created``, ``tools.updated``, ``tools.deleted`` and
+``tools.assigned`` with the affected ids (None when unknown).
+
+A view can name the change a save makes by setting ``_event_type`` on
+the tool first (``assign_to_workcenter`` sends ``tool.assigned``), so
+each change is still published once.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from tools.models import Tool
+from tools.serial_cache import tool_payload
+from tools.signals import tools_bulk_changed
+
+from .broker import publish
+
+BULK_EVENT_TYPES = {
+    'create': 'tools.created',
+    'update': 'tools.updated',
+    'delete': 'tools.deleted',
+    'assign': 'tools.assigned',
+}
+
+
+@receiver(post_save, sender=Tool)
+def tool_saved(sender, instance, created, **kwargs):
+    event_type = instance.__dict__.pop('_event_type', None)
+    publish(event_type or ('tool.created' if created else 'tool.updated'), tool_payload(instance))
+
+
+@receiver(post_delete, sender=Tool)
+def tool_deleted(sender, instance, **kwargs):
+    publish('tool.deleted', {'id': instance.pk, 'serial_number': instance.serial_number})
+
+
+@receiver(tools_bulk_changed, sender=Tool)
+def tools_changed_in_bulk(sender, action, ids=None, **kwargs):
+    data = {'ids': list(ids) if ids is not None else None}
+    if 'workcenter_id' in kwargs:
+        data['workcenter_id'] = kwargs['workcenter_id']
+    publish(BULK_EVENT_TYPES[action], data)
@@ -0,0 +1,72 @@
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .broker import AsyncSubscription, ThreadSubscription, get_broker, get_option
+
+
+def format_event(event):
+    """Render an event as a server-sent events message"""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event['data'], separators=(',', ':'))}\n\n"
+    )
+
+
+RETRY = "retry: 3000\n\n"
+HEARTBEAT = ": keepalive\n\n"
+
+
+async def async_stream(types, last_event_id):
+    broker = get_broker()
+    subscription = broker.subscribe(AsyncSubscription(broker, types), last_event_id)
+    try:
+        yield RETRY
+        while True:
+            event = await subscription.get(get_option('HEARTBEAT'))
+            yield HEARTBEAT if event is None else format_event(event)
+    finally:
+        subscription.close()
+
+
+def thread_stream(types, last_event_id):
+    broker = get_broker()
+    subscription = broker.subscribe(ThreadSubscription(broker, types), last_event_id)
+    try:
+        yield RETRY
+        while True:
+            event = subscription.get(get_option('HEARTBEAT'))
+            yield HEARTBEAT if event is None else format_event(event)
+    finally:
+        subscription.close()
+
+
+def event_stream(request):
+    """
+    Server-sent events of tool changes (see ``events.signals`` for the
+    event types). ``?types=tool.updated,tools.assigned`` filters the
+    stream and a reconnecting client's ``Last-Event-ID`` replays recent
+    events it missed.
+
+    Under ASGI (``uvicorn toolprogram.asgi:application``) each client is
+    a coroutine, so hundreds of screens cost no worker threads; under
+    WSGI each client holds a thread for as long as it stays connected.
+    """
+    types = [t.strip() for t in request.GET.get('types', '').split(',') if t.strip()]
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return JsonResponse({'error': 'Last-Event-ID must be an integer'}, status=400)
+
+    if isinstance(request, ASGIRequest):
+        stream = async_stream(types, last_event_id)
+    else:
+        stream = thread_stream(types, last_event_id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let a proxy buffer the stream
+    return response
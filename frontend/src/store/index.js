@@ -5,6 +5,13 @@ import axios from 'axios'
 axios.defaults.xsrfCookieName = 'csrftoken'
 axios.defaults.xsrfHeaderName = 'X-CSRFToken'
 
+// Tool events from /api/events/ that should trigger a delta sync
+const TOOL_EVENTS = [
+  'tool.created', 'tool.updated', 'tool.deleted', 'tool.assigned',
+  'tools.created', 'tools.updated', 'tools.deleted', 'tools.assigned'
+]
+let eventSource = null
+
 export default createStore({
   state: {
     tools: [],
@@ -13,6 +20,12 @@ export default createStore({
     currentEmployee: null,
     workcenters: [],
     currentWorkCenter: null,
+    // Watermarks from /api/sync/, per collection
+    syncTokens: {
+      tools: null,
+      employees: null,
+      workcenters: null
+    },
     loading: false,
     error: null
   },
@@ -54,6 +67,27 @@ export default createStore({
     SET_CURRENT_WORKCENTER(state, workcenter) {
       state.currentWorkCenter = workcenter
     },
+    APPLY_SYNC(state, { collection, delta, reset }) {
+      if (reset) {
+        state[collection] = delta.updated
+        return
+      }
+      const deleted = new Set(delta.deleted)
+      const rows = state[collection].filter(row => !deleted.has(row.id))
+      const index = new Map(rows.map((row, i) => [row.id, i]))
+      for (const row of delta.updated) {
+        if (index.has(row.id)) {
+          rows.splice(index.get(row.id), 1, row)
+        } else {
+          index.set(row.id, rows.length)
+          rows.push(row)
+        }
+      }
+      state[collection] = rows
+    },
+    SET_SYNC_TOKEN(state, { collection, token }) {
+      state.syncTokens[collection] = token
+    },
     SET_LOADING(state, loading) {
       state.loading = loading
     },
@@ -62,11 +96,53 @@ export default createStore({
     }
   },
   actions: {
-    async fetchTools({ commit }) {
+    // Fetch only the rows created, updated or deleted since the last sync
+    async syncCollection({ commit, state }, collection) {
+      const params = { models: collection }
+      if (state.syncTokens[collection]) {
+        params.since = state.syncTokens[collection]
+      }
+      let response = await axios.get('/api/sync/', { params })
+      const { reset } = response.data
+      const delta = response.data[collection]
+      if (!reset) {
+        commit('APPLY_SYNC', { collection, delta, reset })
+      }
+      // Both arrive in pages. Gather a reset before replacing the store;
+      // apply a delta page by page, as a row sent on one page may be
+      // deleted on a later one
+      while (response.data.next) {
+        response = await axios.get('/api/sync/', { params: { cursor: response.data.next } })
+        const page = response.data[collection] || { updated: [], deleted: [] }
+        if (reset) {
+          delta.updated.push(...page.updated)
+        } else {
+          commit('APPLY_SYNC', { collection, delta: page, reset })
+        }
+      }
+      if (reset) {
+        commit('APPLY_SYNC', { collection, delta, reset })
+      }
+      commit('SET_SYNC_TOKEN', { collection, token: response.data.token })
+    },
+    // Keep tools live: pull a delta whenever the server reports a change
+    listenForToolChanges({ dispatch }) {
+      if (eventSource) {
+        return
+      }
+      eventSource = new EventSource('/api/events/')
+      let pending = null
+      const refresh = () => {
+        // Coalesce bursts (e.g. a bulk import) into one sync
+        clearTimeout(pending)
+        pending = setTimeout(() => dispatch('syncCollection', 'tools'), 250)
+      }
+      TOOL_EVENTS.forEach(type => eventSource.addEventListener(type, refresh))
+    },
+    async fetchTools({ commit, dispatch }) {
       commit('SET_LOADING', true)
       try {
-        const response = await axios.get('/api/tools/')
-        commit('SET_TOOLS', response.data)
+        await dispatch('syncCollection', 'tools')
       } catch (error) {
         commit('SET_ERROR', error.message)
       } finally {
@@ -122,22 +198,20 @@ export default createStore({
         commit('SET_LOADING', false)
       }
     },
-    async fetchEmployees({ commit }) {
+    async fetchEmployees({ commit, dispatch }) {
       commit('SET_LOADING', true)
       try {
-        const response = await axios.get('/api/employees/')
-        commit('SET_EMPLOYEES', response.data)
+        await dispatch('syncCollection', 'employees')
       } catch (error) {
         commit('SET_ERROR', error.message)
       } finally {
         commit('SET_LOADING', false)
       }
     },
-    async fetchWorkCenters({ commit }) {
+    async fetchWorkCenters({ commit, dispatch }) {
       commit('SET_LOADING', true)
       try {
-        const response = await axios.get('/api/workcenters/')
-        commit('SET_WORKCENTERS', response.data)
+        await dispatch('syncCollection', 'workcenters')
       } catch (error) {
         commit('SET_ERROR', error.message)
       } finally {
@@ -0,0 +1,55 @@
+// Infinite scroll for the tool list
+
+document.addEventListener('DOMContentLoaded', function() {
+    const grid = document.querySelector('.tools-grid');
+    if (!grid || !('IntersectionObserver' in window)) {
+        // Without an observer the "Load more" link pages normally
+        return;
+    }
+
+    let loading = false;
+
+    // Replace the "Load more" link with the next page of cards
+    function loadMore(link) {
+        if (loading) {
+            return;
+        }
+        loading = true;
+        fetch(link.dataset.cardsUrl, { headers: { 'Accept': 'text/html' } })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Failed to load tools');
+                }
+                return response.text();
+            })
+            .then(html => {
+                observer.unobserve(link);
+                link.insertAdjacentHTML('beforebegin', html);
+                link.remove();
+                observeNext();
+            })
+            .catch(error => {
+                console.error('Error loading more tools:', error);
+            })
+            .finally(() => {
+                loading = false;
+            });
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                loadMore(entry.target);
+            }
+        });
+    }, { rootMargin: '400px' });
+
+    function observeNext() {
+        const link = grid.querySelector('.load-more');
+        if (link) {
+            observer.observe(link);
+        }
+    }
+
+    observeNext();
+});
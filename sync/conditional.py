@@ -0,0 +1,86 @@
+"""
+Conditional GET for the REST viewsets.
+
+Each synced table has a version counter (``sync.models.TableVersion``)
+bumped by every create, update and delete, including the bulk paths that
+send ``tools_bulk_changed``. Reading the counters is one indexed lookup,
+whatever the table sizes. The ETag hashes the versions of the tables a
+response is built from together with the request URL and media type, so
+``If-None-Match`` can be answered with 304 before the list queries run
+or the serializer is touched.
+
+A counter, unlike a MAX(updated_at) or row-count watermark, also moves
+for updates whose transaction commits after a later write is already
+visible: every committed write adds one, whatever its timestamp.
+
+Last-Modified is sent for information only: it has one-second
+resolution, so two writes in the same second would share a value and
+``If-Modified-Since`` is not used to answer 304.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import TableVersion
+
+
+def table_versions(models):
+    """
+    Return {model: (version, last change)} in one query; a table never
+    written since it was created is at (0, None).
+    """
+    labels = {model._meta.label_lower: model for model in models}
+    current = {
+        table: (version, changed_at) for table, version, changed_at in
+        TableVersion.objects.filter(table__in=labels).values_list('table', 'version', 'changed_at')
+    }
+    return {model: current.get(label, (0, None)) for label, model in labels.items()}
+
+
+class ConditionalGetMixin:
+    """
+    Emit ETag/Last-Modified on list and retrieve, and answer a matching
+    If-None-Match with 304 Not Modified.
+    """
+    # Models whose rows appear in the response; defaults to the queryset's
+    version_models = None
+
+    def get_version_models(self):
+        return self.version_models or [self.queryset.model]
+
+    def get_table_versions(self):
+        """The versions of the response's tables, read once per request"""
+        if not hasattr(self, '_table_versions'):
+            self._table_versions = table_versions(self.get_version_models())
+        return self._table_versions
+
+    def get_validators(self, request):
+        """Return (etag, last_modified timestamp or None) for this request"""
+        versions = list(self.get_table_versions().values())
+        fingerprint = repr((versions, request.get_full_path(), request.accepted_media_type))
+        etag = '"%s"' % hashlib.sha1(fingerprint.encode()).hexdigest()
+        moments = [changed_at for _, changed_at in versions if changed_at]
+        last_modified = int(max(moments).timestamp()) if moments else None
+        return etag, last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        # Only the ETag is validated; see the module docstring
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Always revalidate; the 304 path makes that cheap
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Accept'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
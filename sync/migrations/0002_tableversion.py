@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+SYNCED_TABLES = ['tools.tool', 'employees.employee', 'workcenters.workcenter']
+
+
+def create_versions(apps, schema_editor):
+    TableVersion = apps.get_model('sync', 'TableVersion')
+    TableVersion.objects.bulk_create([TableVersion(table=table) for table in SYNCED_TABLES])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=100, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row, kept so /api/sync/ can report the deletion"""
+    # ``model`` of the marker left when every synced table is emptied at
+    # once; clients that synced before it must reset
+    RESET = '*'
+
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='sync_tombstone_model_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
+
+    @classmethod
+    def mark_reset(cls):
+        return cls.objects.create(model=cls.RESET, object_id=0)
+
+
+class TableVersion(models.Model):
+    """
+    Per-table change counter for ETags and the response cache.
+
+    Bumped after every write to the table (see ``sync.signals``), inside
+    the writer's transaction when there is one, so no reader sees a new
+    version before the rows it stands for. Checking it is one indexed
+    lookup however large the table grows.
+    """
+    table = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
+
+    @classmethod
+    def bump(cls, *models_changed):
+        now = timezone.now()
+        for model in models_changed:
+            label = model._meta.label_lower
+            changes = {'version': F('version') + 1, 'changed_at': now}
+            if cls.objects.filter(table=label).update(**changes):
+                continue
+            # First write since the table was created (or flushed)
+            try:
+                with transaction.atomic():
+                    cls.objects.create(table=label, version=1, changed_at=now)
+            except IntegrityError:
+                cls.objects.filter(table=label).update(**changes)
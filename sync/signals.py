@@ -0,0 +1,62 @@
+"""
+Tombstones for deleted rows, table versions for every write and
+updated_at bumps the ORM can't do itself.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from employees.models import Employee
+from tools.models import Tool
+from tools.signals import tools_bulk_changed
+from workcenters.models import WorkCenter
+
+from .models import TableVersion, Tombstone
+
+SYNCED_MODELS = (Tool, Employee, WorkCenter)
+
+
+@receiver(post_delete)
+def record_tombstone(sender, instance, **kwargs):
+    # QuerySet.delete() also sends post_delete per row, so cascades are
+    # covered.
+    if sender in SYNCED_MODELS:
+        Tombstone.objects.create(model=sender._meta.label_lower, object_id=instance.pk)
+
+
+@receiver(tools_bulk_changed, sender=Tool)
+def record_bulk_tombstones(sender, action, ids=None, **kwargs):
+    # The bulk delete endpoint issues one raw DELETE and sends no post_delete
+    if action == 'delete' and ids:
+        label = Tool._meta.label_lower
+        Tombstone.objects.bulk_create([Tombstone(model=label, object_id=pk) for pk in ids])
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_table_version(sender, **kwargs):
+    if sender in SYNCED_MODELS:
+        TableVersion.bump(sender)
+
+
+@receiver(tools_bulk_changed, sender=Tool)
+def bump_tool_version(sender, **kwargs):
+    TableVersion.bump(Tool)
+
+
+@receiver(pre_save, sender=WorkCenter)
+def detect_workcenter_rename(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and 'name' not in update_fields):
+        return
+    instance._sync_renamed = (
+        WorkCenter.objects.filter(pk=instance.pk).exclude(name=instance.name).exists()
+    )
+
+
+@receiver(post_save, sender=WorkCenter)
+def touch_workcenter_tools(sender, instance, created, **kwargs):
+    # Tool payloads embed the workcenter name, so a renamed workcenter
+    # must resend its tools; other edits leave them alone.
+    if instance.__dict__.pop('_sync_renamed', False):
+        Tool.objects.filter(location=instance).update(updated_at=timezone.now())
+        TableVersion.bump(Tool)
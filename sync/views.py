@@ -0,0 +1,264 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from employees.models import Employee
+from employees.serializers import EmployeeSerializer
+from tools.models import Tool
+from tools.serializers import ToolSerializer
+from workcenters.models import WorkCenter
+from workcenters.serializers import WorkCenterSerializer
+
+from .models import Tombstone
+
+# Each token is backdated by this much so rows written by transactions
+# that were still open when the token was issued are resent next time.
+TOKEN_OVERLAP = datetime.timedelta(seconds=5)
+
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def to_micros(moment):
+    """Microseconds since the epoch, exactly (no float rounding)"""
+    return (moment - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def from_micros(micros):
+    return EPOCH + datetime.timedelta(microseconds=micros)
+
+
+def encode_token(moment):
+    """Opaque watermark: microseconds since the epoch"""
+    return str(to_micros(moment))
+
+
+def decode_token(token):
+    """Return the watermark datetime, or None if the token is malformed"""
+    try:
+        return from_micros(int(token))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def encode_cursor(token, after, since=None):
+    """
+    Opaque paging cursor: the token issued with the first page and, per
+    collection, where the last page stopped. A reset stores the last id
+    sent; a delta also stores its ``since`` token and an
+    ``[updated_at, id]`` position per stream (``'u'`` rows, ``'d'``
+    tombstones), with the updated_at in microseconds.
+    """
+    payload = {'t': token, 'a': after}
+    if since is not None:
+        payload['s'] = since
+    payload = json.dumps(payload, separators=(',', ':'))
+    return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_position(value):
+    return isinstance(value, list) and len(value) == 2 and all(is_int(part) for part in value)
+
+
+def decode_cursor(encoded):
+    """Return ``(token, after, since)``, or None if the cursor is malformed"""
+    try:
+        payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        token, after, since = payload['t'], payload['a'], payload.get('s')
+    except (TypeError, KeyError, ValueError, UnicodeError, AttributeError):
+        return None
+    if decode_token(token) is None or not isinstance(after, dict) or not after:
+        return None
+    if since is None:
+        valid = all(is_int(pk) for pk in after.values())
+    else:
+        valid = decode_token(since) is not None and all(
+            isinstance(streams, dict) and streams and set(streams) <= {'u', 'd'}
+            and all(is_position(position) for position in streams.values())
+            for streams in after.values()
+        )
+    return (token, after, since) if valid else None
+
+
+def tombstone_retention():
+    days = getattr(settings, 'SYNC', {}).get('TOMBSTONE_RETENTION_DAYS', 30)
+    return datetime.timedelta(days=days)
+
+
+def page_size():
+    return getattr(settings, 'SYNC', {}).get('PAGE_SIZE', 1000)
+
+
+class SyncView(APIView):
+    """
+    Delta sync for client-side stores.
+
+    ``GET /api/sync/`` returns every row and a ``token``; passing that
+    token back as ``?since=`` returns only rows created or updated since,
+    plus the ids deleted since. Apply ``deleted`` before ``updated``.
+    ``reset`` is true when the client must replace its copy instead,
+    i.e. on first sync, when ``since`` is older than the tombstone
+    retention or when the tables were emptied wholesale since then. ``?models=tools,employees`` limits the collections.
+
+    Both are sent ``SYNC['PAGE_SIZE']`` rows per collection at a time, so
+    neither has to be built in one response: a reset in id order, a
+    delta in (updated_at, id) order with its tombstones in (deleted_at,
+    id) order. While ``next`` is set, fetch ``?cursor=<next>`` for the
+    collections that have more; keep the ``token`` (the same on every
+    page) once ``next`` is null. Gather a reset's pages before replacing
+    the copy; apply a delta's pages as they arrive.
+    """
+    permission_classes = [permissions.AllowAny]
+    # One query per collection, plus one for its tombstones and one for a
+    # reset marker with ?since=
+    query_budget = 7
+
+    collections = {
+        'tools': (Tool, ToolSerializer),
+        'employees': (Employee, EmployeeSerializer),
+        'workcenters': (WorkCenter, WorkCenterSerializer),
+    }
+
+    def get_rows(self, name, since, after=None):
+        """
+        One page of rows and the last one sent: with ``since`` None, a reset
+        page after id ``after``; otherwise rows updated since ``since``,
+        after the ``(updated_at, id)`` position ``after`` if given.
+        """
+        model, serializer_class = self.collections[name]
+        queryset = model.objects.all()
+        if model is Tool:
+            queryset = queryset.select_related('location')
+        if since is None:
+            queryset = queryset.filter(pk__gt=after or 0).order_by('pk')
+        else:
+            queryset = queryset.filter(updated_at__gte=since)
+            if after is not None:
+                moment, pk = after
+                queryset = queryset.filter(Q(updated_at__gt=moment) | Q(updated_at=moment, pk__gt=pk))
+            queryset = queryset.order_by('updated_at', 'pk')
+        objects = list(queryset[:page_size()])
+        serializer = serializer_class(objects, many=True, context={'request': self.request})
+        if model is WorkCenter:
+            # Nested tools change without touching the workcenter row;
+            # clients sync tools as their own collection.
+            serializer.child.fields.pop('tools', None)
+        return serializer.data, objects[-1] if objects else None
+
+    def get_deleted(self, name, since, after=None):
+        """
+        One page of tombstones deleted since ``since``, after the
+        ``(deleted_at, id)`` position ``after`` if given: the object ids,
+        and the last tombstone read if the page was full (else None).
+        """
+        model = self.collections[name][0]
+        queryset = Tombstone.objects.filter(model=model._meta.label_lower, deleted_at__gte=since)
+        if after is not None:
+            moment, pk = after
+            queryset = queryset.filter(Q(deleted_at__gt=moment) | Q(deleted_at=moment, pk__gt=pk))
+        tombstones = list(queryset.order_by('deleted_at', 'pk').only('object_id', 'deleted_at')[:page_size()])
+        # A row deleted more than once (same id re-created) is sent once
+        ids = list(dict.fromkeys(tombstone.object_id for tombstone in tombstones))
+        return ids, tombstones[-1] if len(tombstones) == page_size() else None
+
+    def get(self, request):
+        encoded = request.query_params.get('cursor')
+        if encoded:
+            return self.get_page(encoded)
+
+        names = request.query_params.get('models')
+        names = [n.strip() for n in names.split(',') if n.strip()] if names else list(self.collections)
+        unknown = set(names) - set(self.collections)
+        if unknown:
+            return Response(
+                {"error": f"Unknown model(s): {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        now = timezone.now()
+        since = None
+        token = request.query_params.get('since')
+        if token:
+            since = decode_token(token)
+            if since is None:
+                return Response(
+                    {"error": "Invalid since token"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if since < now - tombstone_retention():
+                since = None  # Deletions may have been purged; start over
+            elif Tombstone.objects.filter(model=Tombstone.RESET, deleted_at__gte=since).exists():
+                since = None  # Emptied without per-row tombstones
+
+        issued = encode_token(now - TOKEN_OVERLAP)
+        if since is None:
+            return self.reset_page(issued, {name: 0 for name in names})
+        return self.delta_page(issued, {name: {'u': None, 'd': None} for name in names}, token)
+
+    def get_page(self, encoded):
+        decoded = decode_cursor(encoded)
+        if decoded is None or not set(decoded[1]) <= set(self.collections):
+            return Response(
+                {"error": "Invalid cursor"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        token, after, since = decoded
+        if since is None:
+            return self.reset_page(token, after)
+        return self.delta_page(token, after, since)
+
+    def reset_page(self, token, after):
+        """
+        One page of a reset. The token is issued before the first page, so
+        rows written while the client pages through arrive in its next delta.
+        """
+        data = {'token': token, 'reset': True, 'next': None}
+        remaining = {}
+        for name, last_id in after.items():
+            rows, last = self.get_rows(name, None, last_id)
+            data[name] = {'updated': rows, 'deleted': []}
+            if len(rows) == page_size():
+                remaining[name] = last.pk
+        if remaining:
+            data['next'] = encode_cursor(token, remaining)
+        return Response(data)
+
+    def delta_page(self, token, after, since):
+        """
+        One page of a delta since the ``since`` token. ``after`` holds, per
+        collection, the position reached in its rows (``'u'``) and
+        tombstones (``'d'``); a stream missing from it is already sent.
+        """
+        moment = decode_token(since)
+        data = {'token': token, 'reset': False, 'next': None}
+        remaining = {}
+        for name, streams in after.items():
+            data[name] = {'updated': [], 'deleted': []}
+            more = {}
+            if 'u' in streams:
+                position = streams['u'] and (from_micros(streams['u'][0]), streams['u'][1])
+                rows, last = self.get_rows(name, moment, position)
+                data[name]['updated'] = rows
+                if len(rows) == page_size():
+                    more['u'] = [to_micros(last.updated_at), last.pk]
+            if 'd' in streams:
+                position = streams['d'] and (from_micros(streams['d'][0]), streams['d'][1])
+                data[name]['deleted'], last = self.get_deleted(name, moment, position)
+                if last is not None:
+                    more['d'] = [to_micros(last.deleted_at), last.pk]
+            if more:
+                remaining[name] = more
+        if remaining:
+            data['next'] = encode_cursor(token, remaining, since)
+        return Response(data)
@@ -0,0 +1,140 @@
+"""
+Tests that API endpoints run a fixed number of queries
+"""
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from tools.models import Tool
+from tools.serializers import ToolSerializer
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+# ETag version check on /api/workcenters/: one lookup for the workcenter
+# and tool tables' versions
+VERSION_QUERIES = 1
+
+
+class WorkCenterNestedToolsTestCase(TestCase):
+    """Test nested tools on /api/workcenters/ are batch loaded"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.workcenters = [WorkCenter.objects.create(name=f"WC {i}") for i in range(5)]
+        for wc in self.workcenters:
+            for j in range(3):
+                Tool.objects.create(name=f"{wc.name} Tool {j}", serial_number=f"{wc.pk}-{j}", location=wc)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_list_query_count_is_constant(self):
+        """Test listing workcenters doesn't query once per workcenter"""
+        few, _ = self.count_queries('/api/workcenters/')
+        for i in range(5, 15):
+            WorkCenter.objects.create(name=f"WC {i}")
+        many, data = self.count_queries('/api/workcenters/')
+        self.assertEqual(few, many)
+        # COUNT(*), the page and one query for every nested tool
+        self.assertEqual(many, 3 + VERSION_QUERIES)
+
+    def test_nested_tools_payload(self):
+        """Test each workcenter embeds only its own tools"""
+        _, data = self.count_queries('/api/workcenters/')
+        first = next(wc for wc in data['results'] if wc['id'] == self.workcenters[0].pk)
+        self.assertEqual(len(first['tools']), 3)
+        self.assertEqual(set(first['tools'][0]), {'id', 'name', 'serial_number', 'calibrated'})
+        self.assertTrue(all(t['name'].startswith('WC 0 ') for t in first['tools']))
+
+    def test_detail_embeds_tools(self):
+        """Test the detail endpoint loads tools in one query"""
+        count, data = self.count_queries(f'/api/workcenters/{self.workcenters[1].pk}/')
+        self.assertEqual(count, 2 + VERSION_QUERIES)
+        self.assertEqual(len(data['tools']), 3)
+
+    def test_expand_opt_out(self):
+        """Test ?expand= skips the nested tools entirely"""
+        count, data = self.count_queries('/api/workcenters/?expand=')
+        self.assertEqual(count, 2 + VERSION_QUERIES)
+        self.assertNotIn('tools', data['results'][0])
+
+        count, data = self.count_queries('/api/workcenters/?expand=tools')
+        self.assertEqual(count, 3 + VERSION_QUERIES)
+        self.assertIn('tools', data['results'][0])
+
+
+class ToolSparseFieldsetTestCase(TestCase):
+    """Test /api/tools/ joins the workcenter and honours ?fields="""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.workcenter = WorkCenter.objects.create(name="Tool Crib")
+        for i in range(5):
+            Tool.objects.create(name=f"Gauge {i}", serial_number=f"G-{i}",
+                                description="x" * 500, location=self.workcenter)
+
+    def test_list_query_count_is_constant(self):
+        """Test tool locations are joined rather than fetched per row"""
+        with CaptureQueriesContext(connection) as few:
+            self.client.get('/api/tools/')
+        other = WorkCenter.objects.create(name="Assembly")
+        for i in range(10):
+            Tool.objects.create(name=f"Caliper {i}", serial_number=f"C-{i}", location=other)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/api/tools/')
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(response.json()['results'][0]['location']['name'], 'Assembly')
+
+    def test_sparse_fieldset(self):
+        """Test ?fields= narrows both the payload and the SELECT"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tools/?fields=id,name,serial_number')
+        self.assertEqual(response.status_code, 200)
+        tool = response.json()['results'][0]
+        self.assertEqual(set(tool), {'id', 'name', 'serial_number'})
+
+        select = queries.captured_queries[-1]['sql']
+        self.assertIn('"serial_number"', select)
+        self.assertNotIn('"description"', select)
+        self.assertNotIn('workcenters_workcenter', select)
+
+    def test_sparse_fieldset_with_location(self):
+        """Test the nested location survives a sparse fieldset"""
+        tool = Tool.objects.first()
+        response = self.client.get(f'/api/tools/{tool.pk}/?fields=serial_number,location')
+        self.assertEqual(response.json(), {
+            'serial_number': tool.serial_number,
+            'location': {'id': self.workcenter.pk, 'name': 'Tool Crib'},
+        })
+
+    def test_unknown_field(self):
+        """Test unknown field names are rejected"""
+        response = self.client.get('/api/tools/?fields=name,price')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('price', response.json()['fields'])
+
+
+class ToolListSerializerTestCase(TestCase):
+    """Test serializing many tools loads their workcenters in one query"""
+
+    def test_locations_batch_loaded(self):
+        """Test tools fetched without select_related don't query per row"""
+        for i in range(4):
+            workcenter = WorkCenter.objects.create(name=f"WC {i}")
+            Tool.objects.create(name=f"Gauge {i}", serial_number=f"G-{i}", location=workcenter)
+        Tool.objects.create(name="Loose Gauge", serial_number="G-loose")
+
+        with CaptureQueriesContext(connection) as queries:
+            data = ToolSerializer(Tool.objects.order_by('pk'), many=True).data
+        # The tools, then every location at once
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(data[0]['location']['name'], 'WC 0')
+        self.assertIsNone(data[-1]['location'])
+
+        with CaptureQueriesContext(connection) as queries:
+            ToolSerializer(Tool.objects.select_related('location'), many=True).data
+        self.assertEqual(len(queries), 1)
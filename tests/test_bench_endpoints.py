@@ -0,0 +1,96 @@
+"""
+Tests for the bench_endpoints latency benchmark
+"""
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import Resolver404, resolve
+from tools.management.benchmarks import percentile
+from tools.management.commands.bench_endpoints import DEFAULT_BASELINE, Command, routes
+from tools.models import Tool
+from toolprogram.health import state as health_state
+from tests import clear_caches
+
+
+# The tests run the health check themselves
+@override_settings(HEALTH={'BACKGROUND': False})
+class BenchEndpointsTestCase(TestCase):
+    """Test the benchmark measures routes and flags regressions"""
+    databases = {'default', 'events'}
+
+    def setUp(self):
+        clear_caches()
+        call_command('generate_dataset', tools=60, employees=10, workcenters=10, stdout=StringIO())
+        self.command = Command(stdout=StringIO(), stderr=StringIO())
+        self.ids = self.command.dataset_ids({'seed': 1})
+        self.options = {'iterations': 3, 'warmup': 1}
+
+    def test_every_route_resolves_and_succeeds(self):
+        """Test each benchmarked route exists and answers with its expected status"""
+        client = Client()
+        health_state.refresh()
+        self.addCleanup(health_state.reset)
+        for route in routes():
+            path, _ = route.request(self.ids, 0)
+            try:
+                resolve(path.split('?')[0])
+            except Resolver404:
+                self.fail(f'{route.label}: {path} does not resolve')
+            result = self.command.measure(client, route, self.ids, self.options)
+            self.assertEqual(result['status'], route.status, route.label)
+
+    def test_measurement_fields(self):
+        """Test a measurement reports percentiles, queries and memory"""
+        route = next(route for route in routes() if route.label == 'tool detail')
+        result = self.command.measure(Client(), route, self.ids, self.options)
+        self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+        self.assertLessEqual(result['p95_ms'], result['p99_ms'])
+        self.assertGreater(result['queries'], 0)
+        self.assertGreater(result['peak_kib'], 0)
+
+    def test_writes_rolled_back(self):
+        """Test routes that write leave the dataset as they found it"""
+        before = list(Tool.objects.order_by('pk').values_list('pk', 'location_id', 'updated_at'))
+        for route in routes():
+            if route.writes:
+                result = self.command.measure(Client(), route, self.ids, self.options)
+                self.assertEqual(result['status'], route.status, route.label)
+                if route.label == 'tool assign':
+                    # The UPDATE and the table version bump, not the savepoints
+                    self.assertLessEqual(result['queries'], 4)
+        self.assertEqual(list(Tool.objects.order_by('pk').values_list('pk', 'location_id', 'updated_at')), before)
+
+    def test_baseline_covers_every_route(self):
+        """Test the stored baseline has each route at each size; compare() skips missing ones"""
+        with open(DEFAULT_BASELINE) as f:
+            baseline = json.load(f)
+        labels = [route.label for route in routes()]
+        for size, measured in baseline['sizes'].items():
+            self.assertEqual(list(measured), labels, size)
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.07), 7)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile(list(range(1, 31)), 0.95), 29)
+        self.assertEqual(percentile([7], 0.95), 7)
+        self.assertEqual(percentile([3, 9], 0), 3)
+
+    def test_compare_flags_regressions(self):
+        """Test slower p95s and extra queries are regressions; noise is not"""
+        def result(p95, queries):
+            return {'p95_ms': p95, 'queries': queries}
+
+        baseline = {'sizes': {'10000': {
+            'slower': result(10.0, 3), 'more queries': result(10.0, 3),
+            'jitter': result(0.5, 1), 'steady': result(10.0, 3),
+        }}}
+        current = {'sizes': {'10000': {
+            'slower': result(20.0, 3), 'more queries': result(10.0, 4),
+            'jitter': result(1.5, 1), 'steady': result(11.0, 3), 'new route': result(5.0, 1),
+        }}}
+        regressions = self.command.compare(current, baseline, tolerance=0.25)
+        self.assertEqual(sorted(label for _, label, _ in regressions), ['more queries', 'slower'])
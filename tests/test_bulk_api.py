@@ -0,0 +1,241 @@
+"""
+Tests for the bulk tool endpoints at /api/tools/bulk/
+"""
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from tools.models import Tool
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class BulkToolAPITestCase(TestCase):
+    """Test bulk create, update and delete of tools"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name="Tool Crib")
+        self.assembly = WorkCenter.objects.create(name="Assembly")
+        self.url = '/api/tools/bulk/'
+
+    def send(self, method, data):
+        return getattr(self.client, method)(self.url, data, content_type='application/json')
+
+    def test_bulk_create(self):
+        """Test a shipment of gauges is created in a fixed number of queries"""
+        items = [
+            {'name': f'Gauge {i}', 'serial_number': f'G-{i:04d}',
+             'location': self.crib.pk if i % 2 else self.assembly.pk}
+            for i in range(200)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send('post', items)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Tool.objects.count(), 200)
+        self.assertLess(len(queries), 10)
+
+        data = response.json()
+        self.assertEqual(len(data), 200)
+        self.assertTrue(all(item['id'] for item in data))
+        self.assertEqual(data[1]['location'], {'id': self.crib.pk, 'name': 'Tool Crib'})
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test an invalid item rejects the batch with per-item errors"""
+        items = [
+            {'name': 'Good', 'serial_number': 'OK-1'},
+            {'name': '', 'serial_number': 'BAD-1'},
+            {'name': 'Lost', 'serial_number': 'BAD-2', 'location': 99999},
+        ]
+        response = self.send('post', items)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('name', errors[1])
+        self.assertIn('location', errors[2])
+        self.assertEqual(Tool.objects.count(), 0)
+
+    def test_bulk_create_requires_list(self):
+        """Test a single object is rejected"""
+        response = self.send('post', {'name': 'Single', 'serial_number': 'S-1'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_update(self):
+        """Test PATCH updates many tools matched on id"""
+        tools = [Tool.objects.create(name=f'Caliper {i}', serial_number=f'C-{i}') for i in range(50)]
+        items = [{'id': tool.pk, 'calibrated': True, 'location': self.crib.pk} for tool in tools]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send('patch', items)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(queries), 10)
+        self.assertEqual(Tool.objects.filter(calibrated=True, location=self.crib).count(), 50)
+        # Fields not in the payload are untouched
+        self.assertEqual(Tool.objects.get(pk=tools[3].pk).name, 'Caliper 3')
+
+    def test_bulk_update_unknown_id(self):
+        """Test unknown and missing ids are reported per item"""
+        tool = Tool.objects.create(name='Caliper', serial_number='C-1')
+        response = self.send('patch', [{'id': tool.pk, 'name': 'Renamed'}, {'id': 99999}, {'name': 'x'}])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('id', errors[1])
+        self.assertIn('id', errors[2])
+        tool.refresh_from_db()
+        self.assertEqual(tool.name, 'Caliper')
+
+    def test_bulk_update_invalid_id_types(self):
+        """Test ids that aren't integers are item errors, not a server error"""
+        tool = Tool.objects.create(name='Caliper', serial_number='C-1')
+        items = [{'id': tool.pk, 'name': 'Renamed'}, {'id': [tool.pk]}, {'id': {'pk': 1}},
+                 {'id': True}, {'id': str(tool.pk)}]
+        response = self.send('put', items)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {})
+        self.assertTrue(all('id' in error for error in errors[1:]))
+        tool.refresh_from_db()
+        self.assertEqual(tool.name, 'Caliper')
+
+    def test_bulk_put_requires_all_fields(self):
+        """Test PUT validates each item as a full update"""
+        tool = Tool.objects.create(name='Caliper', serial_number='C-1')
+        response = self.send('put', [{'id': tool.pk, 'calibrated': True}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json()['errors'][0])
+
+    def test_bulk_delete(self):
+        """Test DELETE removes many tools and reports missing ids"""
+        tools = [Tool.objects.create(name=f'Probe {i}', serial_number=f'P-{i}') for i in range(5)]
+        keep = Tool.objects.create(name='Keep', serial_number='K-1')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send('delete', {'ids': [t.pk for t in tools] + [99999]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'deleted': 5, 'not_found': [99999]})
+        self.assertEqual(list(Tool.objects.all()), [keep])
+        deletes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "tools_tool"')]
+        self.assertEqual(len(deletes), 1)
+
+    def test_bulk_delete_rejects_string_ids(self):
+        """Test a string of ids is rejected rather than split into digits"""
+        tools = [Tool.objects.create(name=f'Probe {i}', serial_number=f'P-{i}') for i in range(3)]
+        response = self.send('delete', {'ids': ''.join(str(t.pk) for t in tools[:2])})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Tool.objects.count(), 3)
+
+    def test_bulk_delete_query_param(self):
+        """Test ids may be passed in the query string"""
+        tool = Tool.objects.create(name='Probe', serial_number='P-1')
+        response = self.client.delete(f'{self.url}?ids={tool.pk}')
+        self.assertEqual(response.json()['deleted'], 1)
+
+
+class BulkAssignToWorkCenterTestCase(TestCase):
+    """Test moving many tools to a workcenter at once"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name="Tool Crib")
+        self.cell = WorkCenter.objects.create(name="Cell 4")
+        self.tools = [
+            Tool.objects.create(name=f'Torque Wrench {i}', serial_number=f'TW-{i}',
+                                calibrated=i % 2 == 0, location=self.crib)
+            for i in range(20)
+        ]
+        self.url = '/api/tools/assign_to_workcenter/'
+
+    def post(self, data):
+        return self.client.post(self.url, data, content_type='application/json')
+
+    def test_assign_by_ids(self):
+        """Test tools listed by id move with a single UPDATE"""
+        ids = [tool.pk for tool in self.tools[:10]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post({'workcenter_id': self.cell.pk, 'tool_ids': ids + [99999]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'workcenter_id': self.cell.pk, 'updated': 10, 'not_found': [99999],
+        })
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "tools_tool"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Tool.objects.filter(location=self.cell).count(), 10)
+
+    def test_assign_by_filter(self):
+        """Test a filter selects the tools to move"""
+        response = self.post({
+            'workcenter_id': self.cell.pk,
+            'filter': {'location': self.crib.pk, 'calibrated': False},
+        })
+        self.assertEqual(response.json()['updated'], 10)
+        self.assertFalse(Tool.objects.filter(location=self.cell, calibrated=True).exists())
+
+    def test_unknown_workcenter(self):
+        """Test a missing workcenter is reported once and nothing moves"""
+        response = self.post({'workcenter_id': 99999, 'tool_ids': [self.tools[0].pk]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Tool.objects.filter(location=self.crib).count(), 20)
+
+    def test_requires_ids_or_filter(self):
+        """Test exactly one of tool_ids and filter must be given"""
+        self.assertEqual(self.post({'workcenter_id': self.cell.pk}).status_code, 400)
+        response = self.post({'workcenter_id': self.cell.pk, 'filter': {'owner': 'me'}})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_filter_values(self):
+        """Test filter values of the wrong type are rejected with a 400"""
+        for filters in [{'calibrated': 'maybe'}, {'location': 'abc'}, {'serial_numbers': 'TW-1'},
+                        {'serial_numbers': [{'a': 1}]}]:
+            with self.subTest(filters=filters):
+                response = self.post({'workcenter_id': self.cell.pk, 'filter': filters})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(filters)), response.json()['errors'])
+        self.assertEqual(Tool.objects.filter(location=self.crib).count(), 20)
+
+    def test_tool_ids_must_be_a_list(self):
+        """Test a string of ids is rejected rather than split into digits"""
+        ids = ''.join(str(tool.pk) for tool in self.tools[:3])
+        response = self.post({'workcenter_id': self.cell.pk, 'tool_ids': ids})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Tool.objects.filter(location=self.crib).count(), 20)
+
+    def test_single_tool_action_unchanged(self):
+        """Test the per-tool assign_to_workcenter action still works"""
+        tool = self.tools[0]
+        response = self.client.post(f'/api/tools/{tool.pk}/assign_to_workcenter/',
+                                    {'workcenter_id': self.cell.pk}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['location']['id'], self.cell.pk)
+
+
+class BulkSerialNumberTestCase(TestCase):
+    """Test serial number uniqueness in bulk requests"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.url = '/api/tools/bulk/'
+        Tool.objects.create(name='Existing', serial_number='DUP-1')
+
+    def test_existing_serial_rejected(self):
+        """Test a serial already in the database is reported on its item"""
+        items = [{'name': 'New', 'serial_number': 'NEW-1'}, {'name': 'Clash', 'serial_number': 'DUP-1'}]
+        response = self.client.post(self.url, items, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('serial_number', errors[1])
+
+    def test_duplicate_within_batch_rejected(self):
+        """Test two items with the same serial are rejected"""
+        items = [{'name': 'A', 'serial_number': 'SAME'}, {'name': 'B', 'serial_number': 'SAME'}]
+        response = self.client.post(self.url, items, content_type='application/json')
+        self.assertIn('serial_number', response.json()['errors'][1])
+        self.assertEqual(Tool.objects.count(), 1)
+
+    def test_update_keeps_own_serial(self):
+        """Test resubmitting a tool's own serial is not a conflict"""
+        tool = Tool.objects.get(serial_number='DUP-1')
+        response = self.client.put(self.url, [{'id': tool.pk, 'name': 'Renamed', 'serial_number': 'DUP-1'}],
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,109 @@
+"""
+Tests for ETag / Last-Modified conditional GETs on the REST API
+"""
+from django.test import TestCase, Client
+from employees.models import Employee
+from tools.models import Tool
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class ConditionalGetTestCase(TestCase):
+    """Test unchanged collections are answered with 304"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        self.tool = Tool.objects.create(name='Bore Gauge', serial_number='BG-1', location=self.crib)
+        Tool.objects.create(name='Feeler Gauge', serial_number='FG-1')
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match gets 304 without the list queries"""
+        response = self.client.get('/api/tools/')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(1):
+            response = self.revalidate('/api/tools/', etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changes_invalidate(self):
+        """Test creates, updates and deletes change the ETag"""
+        etag = self.client.get('/api/tools/')['ETag']
+
+        self.tool.calibrated = True
+        self.tool.save()
+        response = self.revalidate('/api/tools/', etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        Tool.objects.create(name='Depth Gauge', serial_number='DG-1')
+        response = self.revalidate('/api/tools/', etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.tool.delete()
+        self.assertEqual(self.revalidate('/api/tools/', etag).status_code, 200)
+
+    def test_etag_varies_by_query(self):
+        """Test different pages and fieldsets have different ETags"""
+        full = self.client.get('/api/tools/')['ETag']
+        sparse = self.client.get('/api/tools/?fields=id,name')['ETag']
+        self.assertNotEqual(full, sparse)
+        self.assertEqual(self.revalidate('/api/tools/?fields=id,name', full).status_code, 200)
+
+    def test_detail_not_modified(self):
+        """Test detail endpoints honour If-None-Match"""
+        url = f'/api/tools/{self.tool.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+    def test_if_modified_since_ignored(self):
+        """Test If-Modified-Since alone never gets a 304"""
+        self.assertNotIn('Last-Modified', self.client.get('/api/employees/'))
+        Employee.objects.create(name='Ann Lee', first_name='Ann', last_name='Lee',
+                                employee_id='E1', department='QA', email='ann@example.com')
+        last_modified = self.client.get('/api/employees/')['Last-Modified']
+        # A second write in the same second keeps Last-Modified unchanged
+        Employee.objects.create(name='Bo Ray', first_name='Bo', last_name='Ray',
+                                employee_id='E2', department='QA', email='bo@example.com')
+        response = self.client.get('/api/employees/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_late_commit_changes_etag(self):
+        """Test a row stamped older than the newest one still changes the ETag"""
+        etag = self.client.get('/api/tools/')['ETag']
+        late = Tool.objects.create(name='Height Gauge', serial_number='HG-1')
+        Tool.objects.filter(pk=late.pk).update(updated_at=self.tool.updated_at)
+        self.assertEqual(self.revalidate('/api/tools/', etag).status_code, 200)
+
+    def test_workcenters_track_tools(self):
+        """Test a workcenter's ETag changes when an embedded tool changes"""
+        etag = self.client.get('/api/workcenters/')['ETag']
+        self.assertEqual(self.revalidate('/api/workcenters/', etag).status_code, 304)
+        self.tool.name = 'Dial Bore Gauge'
+        self.tool.save()
+        self.assertEqual(self.revalidate('/api/workcenters/', etag).status_code, 200)
+
+    def test_workcenter_headers_ignore_tools(self):
+        """Test ?expand= without tools keeps its ETag across tool writes"""
+        etag = self.client.get('/api/workcenters/?expand=')['ETag']
+        self.tool.name = 'Dial Bore Gauge'
+        self.tool.save()
+        self.assertEqual(self.revalidate('/api/workcenters/?expand=', etag).status_code, 304)
+
+    def test_writes_unaffected(self):
+        """Test If-None-Match does not apply to writes"""
+        etag = self.client.get(f'/api/tools/{self.tool.pk}/')['ETag']
+        response = self.client.patch(f'/api/tools/{self.tool.pk}/', {'calibrated': True},
+                                     content_type='application/json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,87 @@
+"""
+Tests for connection persistence, warm-up and the bench_connections command
+"""
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TransactionTestCase
+from toolprogram import warmup
+from toolprogram.warmup import warm_up
+
+
+class FakePool:
+    def __init__(self):
+        self.filled = 0
+        self.closed = 0
+
+    def fill(self):
+        self.filled += 1
+
+    def close_all(self):
+        self.closed += 1
+
+
+class ConnectionSettingsTestCase(SimpleTestCase):
+    """Test every database sets persistence and health checks"""
+
+    def test_configured(self):
+        for alias, database in settings.DATABASES.items():
+            self.assertIsInstance(database['CONN_MAX_AGE'], int, alias)
+            self.assertTrue(database['CONN_HEALTH_CHECKS'], alias)
+
+
+class WarmUpTestCase(TransactionTestCase):
+    """Test warm-up connects each database before the first request"""
+
+    def test_connects(self):
+        """Test the connect is timed and the connection closed again before workers fork"""
+        connection.close()
+        with patch.object(connection, 'close', wraps=connection.close) as close:
+            timings = warm_up()
+        self.assertIsNotNone(timings['default'])
+        close.assert_called_once()
+
+    def test_fills_pool(self):
+        """Test a pooled backend's pool is filled to min_size"""
+        pool = FakePool()
+        with patch.object(connection, 'pool', pool, create=True):
+            warm_up(['default'])
+        self.assertEqual(pool.filled, 1)
+
+    def test_pools_filled_after_fork(self):
+        """Test a preloading parent closes its pooled sessions before a fork and each worker fills its own"""
+        with patch.object(warmup, '_fork_hooks_registered', False), \
+                patch('os.register_at_fork') as register_at_fork:
+            warm_up([])
+            warm_up([])
+        register_at_fork.assert_called_once_with(before=warmup.close_pools, after_in_child=warmup.fill_pools)
+
+        pool = FakePool()
+        with patch.object(connection, 'pool', pool, create=True):
+            warmup.close_pools()
+            warmup.fill_pools()
+        self.assertEqual((pool.closed, pool.filled), (1, 1))
+
+    def test_failure_not_fatal(self):
+        """Test an unreachable database is logged and skipped"""
+        with patch.object(connection, 'ensure_connection', side_effect=OperationalError('unreachable')):
+            with self.assertLogs('toolprogram.warmup', 'ERROR'):
+                timings = warm_up(['default'])
+        self.assertEqual(timings, {'default': None})
+
+
+class BenchConnectionsTestCase(TransactionTestCase):
+    """Test bench_connections compares connection strategies"""
+
+    def test_report(self):
+        out = StringIO()
+        call_command('bench_connections', iterations=3, stdout=out)
+        output = out.getvalue()
+        for strategy in ['new connection', 'persistent', 'persistent + health check']:
+            self.assertIn(f'  {strategy} ', output)
+        self.assertIn('CONN_HEALTH_CHECKS=True', output)
+        self.assertIn('Reusing connections saves', output)
@@ -8,6 +8,7 @@ from tools.models import Tool
 from employees.models import Employee
 from workcenters.models import WorkCenter
 import json
+from tests import clear_caches
 
 
 class ToolManagementWorkflowTestCase(TestCase):
@@ -15,6 +16,7 @@ class ToolManagementWorkflowTestCase(TestCase):
     
     def setUp(self):
         """Set up test environment"""
+        clear_caches()
         self.client = Client()
         
         # Create user
@@ -102,6 +104,7 @@ class EmployeeManagementWorkflowTestCase(TestCase):
     
     def setUp(self):
         """Set up test environment"""
+        clear_caches()
         self.client = Client()
         
         # Create user
@@ -163,6 +166,7 @@ class WorkCenterOperationsWorkflowTestCase(TestCase):
     
     def setUp(self):
         """Set up test environment"""
+        clear_caches()
         self.client = Client()
         
         # Create user
@@ -226,6 +230,7 @@ class APIWorkflowTestCase(TestCase):
     
     def setUp(self):
         """Set up test environment"""
+        clear_caches()
         self.client = Client()
         
         # Create user and authenticate
@@ -304,6 +309,7 @@ class IntegrationWorkflowTestCase(TestCase):
     
     def setUp(self):
         """Set up test environment"""
+        clear_caches()
         self.client = Client()
         
         # Create comprehensive test data
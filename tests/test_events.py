@@ -0,0 +1,166 @@
+"""
+Tests for the server-sent events stream at /api/events/
+"""
+import json
+from asgiref.sync import async_to_sync
+from django.db import connections, router
+from django.test import TestCase, Client, AsyncClient, override_settings
+from events.broker import Broker, DatabasePoller, ThreadSubscription, get_broker
+from events.models import Event
+from tools.models import Tool
+from workcenters.models import WorkCenter
+
+
+def parse(chunk):
+    """Return (type, data) from an SSE message"""
+    text = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = dict(line.split(': ', 1) for line in text.strip().splitlines())
+    return fields['event'], json.loads(fields['data'])
+
+
+class EventPublishingTestCase(TestCase):
+    """Test tool changes are published once committed"""
+
+    def setUp(self):
+        self.broker = get_broker()
+        self.subscription = self.broker.subscribe(ThreadSubscription(self.broker))
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+
+    def tearDown(self):
+        self.subscription.close()
+
+    def received(self):
+        events = []
+        while (event := self.subscription.get(0)) is not None:
+            events.append((event['type'], event['data']))
+        return events
+
+    def test_single_tool_events(self):
+        """Test create, update and delete of one tool"""
+        with self.captureOnCommitCallbacks(execute=True):
+            tool = Tool.objects.create(name='Scribe', serial_number='SC-1')
+        with self.captureOnCommitCallbacks(execute=True):
+            tool.calibrated = True
+            tool.save()
+        pk = tool.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            tool.delete()
+        events = self.received()
+        self.assertEqual([t for t, _ in events], ['tool.created', 'tool.updated', 'tool.deleted'])
+        self.assertTrue(events[1][1]['calibrated'])
+        self.assertEqual(events[2][1], {'id': pk, 'serial_number': 'SC-1'})
+
+    def test_assign_events(self):
+        """Test single and bulk assignment publish assigned events"""
+        tool = Tool.objects.create(name='Scribe', serial_number='SC-1')
+        self.received()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/tools/{tool.pk}/assign_to_workcenter/',
+                             {'workcenter_id': self.crib.pk}, content_type='application/json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/tools/assign_to_workcenter/',
+                             {'workcenter_id': self.crib.pk, 'tool_ids': [tool.pk]},
+                             content_type='application/json')
+        events = self.received()
+        # One event per change, not an extra tool.updated from the save
+        self.assertEqual([t for t, _ in events], ['tool.assigned', 'tools.assigned'])
+        self.assertEqual(events[0][1]['location']['id'], self.crib.pk)
+        self.assertEqual(events[1][1], {'ids': [tool.pk], 'workcenter_id': self.crib.pk})
+
+    def test_bulk_delete_publishes_once(self):
+        """Test a bulk delete sends one tools.deleted and no per-row events"""
+        tools = [Tool.objects.create(name=f'Scribe {i}', serial_number=f'SC-{i}') for i in range(3)]
+        self.received()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete('/api/tools/bulk/', {'ids': [tool.pk for tool in tools]},
+                               content_type='application/json')
+        self.assertEqual(self.received(), [('tools.deleted', {'ids': sorted(t.pk for t in tools)})])
+
+    def test_rollback_publishes_nothing(self):
+        """Test events wait for the transaction to commit"""
+        with self.captureOnCommitCallbacks(execute=False):
+            Tool.objects.create(name='Scribe', serial_number='SC-1')
+        self.assertEqual(self.received(), [])
+
+
+class BrokerTestCase(TestCase):
+    """Test subscription filtering, replay and the database backend"""
+    databases = {'default', 'events'}
+
+    def test_type_filter_and_replay(self):
+        """Test ?types= filtering and Last-Event-ID replay"""
+        broker = Broker()
+        first = broker.publish_local('tool.updated', {'id': 1})
+        broker.publish_local('tool.deleted', {'id': 2})
+        subscription = broker.subscribe(ThreadSubscription(broker, ['tool.deleted']),
+                                        last_event_id=first['id'] - 1)
+        self.assertEqual(subscription.get(0)['type'], 'tool.deleted')
+        self.assertIsNone(subscription.get(0))
+
+    def test_slow_subscriber_drops_oldest(self):
+        """Test a full queue drops the oldest event instead of blocking"""
+        broker = Broker()
+        subscription = broker.subscribe(ThreadSubscription(broker, maxsize=2))
+        for i in range(3):
+            broker.publish_local('tool.updated', {'id': i})
+        self.assertEqual(subscription.get(0)['data'], {'id': 1})
+        self.assertEqual(subscription.dropped, 1)
+
+    @override_settings(EVENTS={'BACKEND': 'database'})
+    def test_database_fan_out(self):
+        """Test events written by another worker reach local subscribers"""
+        broker = Broker()
+        poller = DatabasePoller(broker)
+        poller.poll()
+        subscription = broker.subscribe(ThreadSubscription(broker))
+        with self.captureOnCommitCallbacks(execute=True):
+            Tool.objects.create(name='Scribe', serial_number='SC-1')
+        self.assertEqual(Event.objects.get().type, 'tool.created')
+        poller.poll()
+        event = subscription.get(0)
+        self.assertEqual(event['id'], Event.objects.get().id)
+        self.assertEqual(event['data']['serial_number'], 'SC-1')
+
+    def test_events_kept_out_of_default_database(self):
+        """Test the events table lives only in the events SQLite database"""
+        self.assertEqual(router.db_for_write(Event), 'events')
+        self.assertEqual(router.db_for_read(Event), 'events')
+        self.assertEqual(connections['events'].vendor, 'sqlite')
+        self.assertIn('events_event', connections['events'].introspection.table_names())
+        self.assertNotIn('events_event', connections['default'].introspection.table_names())
+        self.assertNotIn('tools_tool', connections['events'].introspection.table_names())
+
+
+@override_settings(EVENTS={'HEARTBEAT': 0.05})
+class EventStreamTestCase(TestCase):
+    """Test the streaming endpoint under WSGI and ASGI"""
+
+    def test_wsgi_stream(self):
+        """Test the stream sends retry, heartbeats and events"""
+        response = Client().get('/api/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = iter(response.streaming_content)
+        self.assertEqual(next(chunks), b'retry: 3000\n\n')
+        self.assertEqual(next(chunks), b': keepalive\n\n')
+        get_broker().publish_local('tool.updated', {'id': 7})
+        self.assertEqual(parse(next(chunks)), ('tool.updated', {'id': 7}))
+        response.close()
+
+    def test_asgi_stream(self):
+        """Test the stream runs as a coroutine under ASGI"""
+        async def read():
+            response = await AsyncClient().get('/api/events/?types=tool.deleted')
+            chunks = aiter(response.streaming_content)
+            self.assertEqual(await anext(chunks), b'retry: 3000\n\n')
+            get_broker().publish_local('tool.updated', {'id': 1})
+            get_broker().publish_local('tool.deleted', {'id': 2})
+            while (chunk := await anext(chunks)) == b': keepalive\n\n':
+                pass
+            await chunks.aclose()
+            return parse(chunk)
+        self.assertEqual(async_to_sync(read)(), ('tool.deleted', {'id': 2}))
+
+    def test_invalid_last_event_id(self):
+        """Test a malformed Last-Event-ID is rejected"""
+        response = Client().get('/api/events/', HTTP_LAST_EVENT_ID='abc')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,86 @@
+"""
+Tests for the streaming CSV and NDJSON exports
+"""
+import csv
+import io
+import json
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from employees.models import Employee
+from tools.models import Tool
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+class ExportTestCase(TestCase):
+    """Test exports stream every row with joined workcenter names"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name='Tool Crib', location='Bay 1', supervisor='Pat')
+        Tool.objects.create(name='Caliper', serial_number='CAL-1', calibrated=True, location=self.crib,
+                            description='Digital, "0-150mm", 0.01 resolution')
+        Tool.objects.create(name='Bore Gauge', serial_number='BG-1')
+        Employee.objects.create(name='Sam Lee', employee_id='E1', department='QA',
+                                email='sam@example.com', first_name='Sam', last_name='Lee')
+
+    def test_tools_csv(self):
+        """Test the tools CSV has a header, quoted values and the workcenter name"""
+        response = self.client.get('/api/tools/export.csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('filename="tools.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+        self.assertEqual(len(rows), 2)
+        caliper = next(row for row in rows if row['serial_number'] == 'CAL-1')
+        self.assertEqual(caliper['location_name'], 'Tool Crib')
+        self.assertEqual(caliper['description'], 'Digital, "0-150mm", 0.01 resolution')
+        gauge = next(row for row in rows if row['serial_number'] == 'BG-1')
+        self.assertEqual(gauge['location_name'], '')
+
+    def test_tools_ndjson(self):
+        """Test the NDJSON export has one JSON object per line"""
+        response = self.client.get('/api/tools/export.ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        records = [json.loads(line) for line in content(response).splitlines()]
+        self.assertEqual(len(records), 2)
+        caliper = next(record for record in records if record['serial_number'] == 'CAL-1')
+        self.assertEqual(caliper['location_name'], 'Tool Crib')
+        self.assertIs(caliper['calibrated'], True)
+        self.assertIn('T', caliper['updated_at'])
+
+    def test_employees_and_workcenters(self):
+        """Test employees and workcenters export too"""
+        employees = list(csv.DictReader(io.StringIO(content(self.client.get('/api/employees/export.csv')))))
+        self.assertEqual(employees[0]['email'], 'sam@example.com')
+        line = content(self.client.get('/api/workcenters/export.ndjson')).strip()
+        self.assertEqual(json.loads(line)['supervisor'], 'Pat')
+
+    def test_unknown_format(self):
+        """Test an unsupported export format is a 404"""
+        self.assertEqual(self.client.get('/api/tools/export.xml').status_code, 404)
+
+    def test_single_joined_query(self):
+        """Test the export reads tools and workcenter names in one query"""
+        for i in range(50):
+            Tool.objects.create(name=f'Tool {i}', serial_number=f'T-{i}', location=self.crib)
+        with CaptureQueriesContext(connection) as queries:
+            content(self.client.get('/api/tools/export.csv'))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('JOIN', queries[0]['sql'])
+
+    def test_chunked_stream(self):
+        """Test large exports are sent in several chunks"""
+        Tool.objects.bulk_create([Tool(name=f'Tool {i}', serial_number=f'T-{i}') for i in range(4500)])
+        response = self.client.get('/api/tools/export.ndjson')
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(chunk.count(b'\n') for chunk in chunks), 4502)
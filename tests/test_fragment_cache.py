@@ -0,0 +1,54 @@
+"""
+Tests for per-tool fragment caching in tool_list.html
+"""
+from io import StringIO
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from tools.models import Tool
+from workcenters.models import WorkCenter
+
+FRAGMENT_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'template_fragments': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                           'LOCATION': 'fragment-tests'},
+}
+
+
+@override_settings(CACHES=FRAGMENT_CACHES)
+class ToolCardFragmentTestCase(TestCase):
+    """Test tool cards re-render only when the tool changes"""
+
+    def setUp(self):
+        caches['template_fragments'].clear()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        self.tool = Tool.objects.create(name='Thread Gauge', serial_number='TG-1', location=self.crib)
+
+    def test_card_served_from_cache(self):
+        """Test an unchanged tool's card is not re-rendered"""
+        self.client.get('/tools/')
+        # Change the row without bumping updated_at: the cached card stays
+        Tool.objects.filter(pk=self.tool.pk).update(name='Changed Behind The Cache')
+        self.assertContains(self.client.get('/tools/'), 'Thread Gauge')
+
+    def test_changed_tool_re_renders(self):
+        """Test saving a tool re-renders its card"""
+        self.client.get('/tools/')
+        self.tool.name = 'Thread Pitch Gauge'
+        self.tool.save()
+        self.assertContains(self.client.get('/tools/'), 'Thread Pitch Gauge')
+
+    def test_workcenter_rename_re_renders(self):
+        """Test renaming a workcenter re-renders the cards showing it"""
+        self.client.get('/tools/')
+        self.crib.name = 'Main Crib'
+        self.crib.save()
+        self.assertContains(self.client.get('/tools/'), 'Main Crib')
+
+    def test_benchmark_command(self):
+        """Test the render benchmark reports each measurement"""
+        out = StringIO()
+        call_command('bench_tool_list', tools=20, repeat=1, stdout=out)
+        self.assertIn('fragment cache, warm', out.getvalue())
+        self.assertIn('no fragment cache', out.getvalue())
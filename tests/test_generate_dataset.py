@@ -0,0 +1,88 @@
+"""
+Tests for the generate_dataset management command
+"""
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, Client
+from django.utils import timezone
+from employees.models import Employee
+from tools.management.commands.generate_dataset import build_tools
+from tools.models import Tool
+from tools.serial_cache import get_serial_cache
+from workcenters.models import WorkCenter
+
+
+def generate(**options):
+    call_command('generate_dataset', stdout=StringIO(), stderr=StringIO(), **options)
+
+
+def snapshot():
+    return list(Tool.objects.order_by('pk').values_list(
+        'pk', 'name', 'serial_number', 'calibrated', 'location_id', 'description'))
+
+
+class GenerateDatasetTestCase(TestCase):
+    """Test synthetic data is generated in bulk and deterministically"""
+
+    def test_counts(self):
+        """Test the requested number of rows is created"""
+        generate(tools=1200, employees=150, workcenters=12, batch_size=500)
+        self.assertEqual(Tool.objects.count(), 1200)
+        self.assertEqual(Employee.objects.count(), 150)
+        self.assertEqual(WorkCenter.objects.count(), 12)
+        self.assertEqual(Tool.objects.values('serial_number').distinct().count(), 1200)
+        self.assertFalse(Tool.objects.exclude(location__isnull=True).filter(location_id__gt=12).exists())
+
+    def test_deterministic(self):
+        """Test the same seed gives the same data whatever the batch size"""
+        generate(tools=300, employees=10, workcenters=5, seed=7, batch_size=100)
+        first = snapshot()
+        generate(tools=300, employees=10, workcenters=5, seed=7, batch_size=128, clear=True)
+        self.assertEqual(snapshot(), first)
+        generate(tools=300, employees=10, workcenters=5, seed=8, batch_size=100, clear=True)
+        self.assertNotEqual(snapshot(), first)
+
+    def test_partitions_are_independent(self):
+        """Test splitting a range across workers builds the same rows"""
+        now = timezone.now()
+        whole = build_tools(42, 1, 201, now, 5)
+        halves = build_tools(42, 1, 101, now, 5) + build_tools(42, 101, 201, now, 5)
+        self.assertEqual(len(whole), 200)
+        self.assertEqual([(t.name, t.location_id, t.last_checked_in) for t in halves],
+                         [(t.name, t.location_id, t.last_checked_in) for t in whole])
+
+    def test_refuses_to_mix_with_existing_data(self):
+        """Test existing rows need --clear"""
+        WorkCenter.objects.create(name='Existing')
+        with self.assertRaises(CommandError):
+            generate(tools=10)
+        generate(tools=10, workcenters=2, employees=0, clear=True)
+        self.assertFalse(WorkCenter.objects.filter(name='Existing').exists())
+
+    def test_clear_resets_sync_clients(self):
+        """Test clients synced before --clear are sent a reset, not a delta"""
+        generate(tools=20, employees=2, workcenters=2)
+        client = Client()
+        token = client.get('/api/sync/').json()['token']
+        serial = Tool.objects.first().serial_number
+        client.get(f'/api/tools/by-serial/{serial}/')
+
+        generate(tools=10, employees=2, workcenters=2, seed=9, clear=True)
+        data = client.get(f'/api/sync/?since={token}').json()
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['tools']['updated']), 10)
+        self.assertIsNone(get_serial_cache().get(serial))
+
+    def test_new_rows_after_generation(self):
+        """Test ordinary inserts still get fresh ids afterwards"""
+        generate(tools=50, employees=5, workcenters=2)
+        tool = Tool.objects.create(name='Manual', serial_number='MANUAL-1')
+        self.assertEqual(tool.pk, 51)
+
+    def test_workers_fall_back_on_sqlite(self):
+        """Test --workers runs in one process on SQLite"""
+        err = StringIO()
+        call_command('generate_dataset', tools=20, workers=4, stdout=StringIO(), stderr=err)
+        self.assertIn('1 worker', err.getvalue())
+        self.assertEqual(Tool.objects.count(), 20)
@@ -0,0 +1,128 @@
+"""
+Tests for the liveness and readiness probes
+"""
+import json
+import time
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from db_backends.pervasive.pool import close_all_pools, get_pool
+from events.broker import DatabasePoller, get_broker
+from events.models import Event
+from toolprogram.health import state
+from tools.api import check_database_connection
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+
+# The tests run the health check themselves
+@override_settings(HEALTH={'BACKGROUND': False})
+class HealthTestCase(TestCase):
+    """Test probes answer from the last background check"""
+    databases = {'default', 'events'}
+
+    def setUp(self):
+        self.client = Client()
+        state.reset()
+        self.addCleanup(state.reset)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(queries), 0)
+        return response
+
+    def test_liveness(self):
+        """Test /healthz answers without touching the database"""
+        response = self.get('/healthz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    def test_not_ready_before_first_check(self):
+        """Test /readyz is 503 until the first check has run, while status endpoints report starting"""
+        response = self.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'starting')
+        response = self.get('/api/db-status/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'starting')
+        response = check_database_connection(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['status'], 'starting')
+
+    def test_ready(self):
+        """Test a passing check makes the worker ready, without probes running queries"""
+        state.refresh()
+        for _ in range(3):
+            response = self.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['status'], 'ok')
+        self.assertTrue(data['databases']['default']['ok'])
+        self.assertIsNone(data['events'])
+        self.assertEqual(self.get('/api/db-status/').json()['status'], 'connected')
+
+    @patch('django.db.backends.base.base.BaseDatabaseWrapper.cursor')
+    def test_database_down(self, mock_cursor):
+        """Test a failed check makes the worker unavailable"""
+        mock_cursor.side_effect = OperationalError('Database connection failed')
+        state.refresh()
+        mock_cursor.side_effect = None
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        data = response.json()
+        self.assertEqual(data['status'], 'unavailable')
+        self.assertIn('Database connection failed', data['reasons'][0])
+
+        response = self.client.get('/api/db-status/')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()['status'], 'error')
+
+    def test_stale_check(self):
+        """Test a check stuck longer than MAX_AGE makes the worker unavailable"""
+        state.refresh()
+        state.checked_at = time.time() - 60
+        with override_settings(HEALTH={'BACKGROUND': False, 'MAX_AGE': 30.0}):
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('60s ago', response.json()['reasons'][0])
+
+    def test_pool_saturation(self):
+        """Test a nearly exhausted pool degrades readiness but keeps the worker in rotation"""
+        self.addCleanup(close_all_pools)
+        pool = get_pool(('erp', 'DSN=test'), FakeConnection, max_size=2)
+        connections = [pool.acquire(), pool.acquire()]
+        for pooled in connections:
+            self.addCleanup(pool.release, pooled)
+        state.refresh()
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['status'], 'degraded')
+        self.assertEqual(data['pools']['erp']['in_use'], 2)
+        self.assertEqual(data['pools']['erp']['utilisation'], 1.0)
+
+    def test_event_lag(self):
+        """Test events the poller hasn't dispatched are reported as lag"""
+        poller = DatabasePoller(get_broker())
+        poller.poll()
+        event = Event.objects.create(type='tool.updated', data={})
+        Event.objects.filter(pk=event.pk).update(created_at=event.created_at.replace(year=2000))
+        poller.is_alive = lambda: True
+        with patch('toolprogram.health.get_poller', return_value=poller):
+            state.refresh()
+            response = self.client.get('/readyz')
+        data = response.json()
+        self.assertEqual(data['status'], 'degraded')
+        self.assertGreater(data['events']['lag_seconds'], 30)
+
+        poller.poll()
+        with patch('toolprogram.health.get_poller', return_value=poller):
+            state.refresh()
+        self.assertEqual(self.client.get('/readyz').json()['events']['lag_seconds'], 0.0)
@@ -0,0 +1,139 @@
+"""
+Tests for paginated, filtered HTML list views and the tool cards fragment
+"""
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from employees.models import Employee
+from tools.models import Tool
+from tools.views import ToolsListView
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class ToolListPaginationTestCase(TestCase):
+    """Test the tool list pages by keyset and loads only the card columns"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        self.lathe = WorkCenter.objects.create(name='Lathe Cell')
+        Tool.objects.bulk_create([
+            Tool(name=f'Tool {i:03d}', serial_number=f'SN-{i:03d}', calibrated=bool(i % 2),
+                 location=self.crib if i % 3 else self.lathe, description='x' * 500)
+            for i in range(120)
+        ])
+        self.page_size = ToolsListView.paginate_by
+
+    def test_first_page(self):
+        """Test the first page holds one page of cards and a next link"""
+        response = self.client.get('/tools/')
+        self.assertEqual(len(response.context['object_list']), self.page_size)
+        self.assertIsNotNone(response.context['next_query'])
+        self.assertIsNone(response.context['previous_query'])
+        self.assertContains(response, 'data-cards-url="/tools/cards/?cursor=')
+
+    def test_walk_all_pages(self):
+        """Test following next links visits every tool once, in order"""
+        names = []
+        query = ''
+        while query is not None:
+            response = self.client.get(f'/tools/cards/?{query}')
+            self.assertEqual(response.status_code, 200)
+            names.extend(tool.name for tool in response.context['object_list'])
+            query = response.context['next_query']
+        self.assertEqual(names, sorted(Tool.objects.values_list('name', flat=True)))
+
+    def test_previous_link(self):
+        """Test the previous link returns to the first page"""
+        first = self.client.get('/tools/')
+        second = self.client.get(f"/tools/?{first.context['next_query']}")
+        back = self.client.get(f"/tools/?{second.context['previous_query']}")
+        self.assertEqual(list(back.context['object_list']), list(first.context['object_list']))
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is a 404"""
+        self.assertEqual(self.client.get('/tools/?cursor=bogus').status_code, 404)
+
+    def test_single_query_without_count(self):
+        """Test the cards fragment loads tools and locations in one query, with no COUNT"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/tools/cards/')
+        # Skip the response cache's version check
+        sql = [query['sql'] for query in queries.captured_queries if 'sync_tableversion' not in query['sql']]
+        self.assertEqual(len(sql), 1, sql)
+        self.assertIn('JOIN', sql[0])
+        self.assertNotIn('COUNT(', sql[0])
+        # The description is loaded as a preview, not in full
+        self.assertIn('SUBSTR', sql[0].upper())
+
+    def test_description_preview(self):
+        """Test cards show a truncated description"""
+        response = self.client.get('/tools/')
+        self.assertContains(response, 'x' * 49 + '…')
+        self.assertNotContains(response, 'x' * 51)
+
+    def test_filters(self):
+        """Test filtering by workcenter and calibration status"""
+        response = self.client.get(f'/tools/cards/?location={self.lathe.pk}&calibrated=true')
+        tools = response.context['object_list']
+        self.assertTrue(tools)
+        for tool in tools:
+            self.assertEqual(tool.location_id, self.lathe.pk)
+            self.assertTrue(tool.calibrated)
+
+    def test_filters_carried_to_next_page(self):
+        """Test the next page keeps the filters"""
+        response = self.client.get('/tools/?calibrated=false')
+        self.assertIn('calibrated=false', response.context['next_query'])
+        second = self.client.get(f"/tools/?{response.context['next_query']}")
+        self.assertTrue(all(not tool.calibrated for tool in second.context['object_list']))
+
+    def test_search_uses_page_numbers(self):
+        """Test ranked search results fall back to page-number pagination"""
+        response = self.client.get('/tools/?q=tool')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertIn('page=2', response.context['next_query'])
+
+    def test_invalid_filter_ignored(self):
+        """Test an unknown workcenter leaves the list unfiltered"""
+        response = self.client.get('/tools/?location=999999')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['object_list']), self.page_size)
+
+    def test_no_matches(self):
+        """Test filters matching nothing show the filtered empty state"""
+        empty = WorkCenter.objects.create(name='Empty Cell')
+        response = self.client.get(f'/tools/?location={empty.pk}')
+        self.assertContains(response, 'No Tools Match These Filters')
+
+
+class OtherListPaginationTestCase(TestCase):
+    """Test the employee and workcenter lists are paginated"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+
+    def test_employee_pages(self):
+        """Test the employee list pages with a next link"""
+        Employee.objects.bulk_create([
+            Employee(name=f'E{i}', employee_id=str(i), department='Ops', email=f'e{i}@example.com',
+                     first_name=f'First{i:03d}', last_name='Smith')
+            for i in range(60)
+        ])
+        response = self.client.get('/employees/')
+        self.assertEqual(len(response.context['object_list']), 50)
+        second = self.client.get(f"/employees/?{response.context['next_query']}")
+        self.assertEqual(len(second.context['object_list']), 10)
+        self.assertIsNone(second.context['next_query'])
+
+    def test_workcenter_pages(self):
+        """Test the workcenter list pages with a next link"""
+        WorkCenter.objects.bulk_create([WorkCenter(name=f'WC {i:03d}') for i in range(55)])
+        response = self.client.get('/workcenters/')
+        self.assertContains(response, 'Next &raquo;')
+        second = self.client.get(f"/workcenters/?{response.context['next_query']}")
+        self.assertEqual(len(second.context['object_list']), 5)
@@ -0,0 +1,171 @@
+"""
+Tests for the import_tools management command
+"""
+import csv
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from tools.importer import ToolImporter
+from tools.models import Tool
+from tools.signals import tools_bulk_changed
+from workcenters.models import WorkCenter
+
+HEADER = 'name,serial_number,calibrated,last_checked_in,description,location_name\n'
+
+
+class ImportToolsTestCase(TestCase):
+    """Test CSV rows are validated and upserted on serial_number"""
+
+    def setUp(self):
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        self.existing = Tool.objects.create(name='Old Name', serial_number='SN-1', calibrated=False)
+        self.files = []
+
+    def tearDown(self):
+        for path in self.files:
+            os.remove(path)
+
+    def write_csv(self, body):
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+        handle.write(body)
+        handle.close()
+        self.files.append(handle.name)
+        return handle.name
+
+    def run_import(self, body, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_tools', self.write_csv(body), *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_and_updates(self):
+        """Test new serials are created and existing ones updated"""
+        out, _ = self.run_import(
+            HEADER
+            + 'New Name,SN-1,yes,2024-05-01 08:00,Refurbished,Tool Crib\n'
+            + 'Height Gauge,SN-2,false,,,\n'
+        )
+        self.assertIn('Imported 2 tools (1 new, 1 updated)', out)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.name, 'New Name')
+        self.assertTrue(self.existing.calibrated)
+        self.assertEqual(self.existing.location, self.crib)
+        self.assertEqual(self.existing.last_checked_in.year, 2024)
+        self.assertEqual(Tool.objects.get(serial_number='SN-2').location, None)
+
+    def test_blank_cells_keep_values(self):
+        """Test blank or missing cells leave an existing tool's values alone"""
+        self.existing.calibrated = True
+        self.existing.description = 'Granite, grade A'
+        self.existing.location = self.crib
+        self.existing.save()
+        self.run_import(HEADER + 'New Name,SN-1,,,,\n')
+        self.run_import('name,serial_number\nNewer Name,SN-1\n')
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.name, 'Newer Name')
+        self.assertTrue(self.existing.calibrated)
+        self.assertEqual(self.existing.description, 'Granite, grade A')
+        self.assertEqual(self.existing.location, self.crib)
+
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            self.run_import(HEADER + 'Newest Name,SN-1,no,,,\n')
+        self.existing.refresh_from_db()
+        self.assertFalse(self.existing.calibrated)
+        self.assertEqual(self.existing.description, 'Granite, grade A')
+
+    def test_rejected_rows(self):
+        """Test invalid rows are reported and skipped"""
+        rejects = self.write_csv('')
+        out, err = self.run_import(
+            HEADER
+            + 'No Serial,,true,,,\n'
+            + 'Bad Flag,SN-3,maybe,,,\n'
+            + 'Nowhere,SN-4,true,,,Unknown Cell\n'
+            + 'Good,SN-5,true,,,\n',
+            '--rejects', rejects,
+        )
+        self.assertIn('rejected 3', out)
+        self.assertIn('Line 2: serial_number is required', err)
+        self.assertIn('Unknown workcenter "Unknown Cell"', err)
+        self.assertEqual(list(Tool.objects.filter(serial_number__in=['SN-3', 'SN-4', 'SN-5'])
+                              .values_list('serial_number', flat=True)), ['SN-5'])
+        with open(rejects, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['line'] for row in rows], ['2', '3', '4'])
+        self.assertEqual(rows[1]['calibrated'], 'maybe')
+
+    def test_create_workcenters(self):
+        """Test --create-workcenters adds unknown workcenters once"""
+        self.run_import(HEADER + 'A,SN-6,,,,Paint Line\nB,SN-7,,,,Paint Line\n', '--create-workcenters')
+        self.assertEqual(WorkCenter.objects.filter(name='Paint Line').count(), 1)
+        self.assertEqual(Tool.objects.filter(location__name='Paint Line').count(), 2)
+
+    def test_dry_run(self):
+        """Test --dry-run counts without writing"""
+        out, _ = self.run_import(HEADER + 'New Name,SN-1,,,,\nFresh,SN-8,,,,\n', '--dry-run')
+        self.assertIn('Would import 2 tools (1 new, 1 updated)', out)
+        self.assertFalse(Tool.objects.filter(serial_number='SN-8').exists())
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.name, 'Old Name')
+
+    def test_duplicate_serial_in_file(self):
+        """Test the later row wins when a serial repeats"""
+        self.run_import(HEADER + 'First,SN-9,,,,\nSecond,SN-9,,,,\n')
+        self.assertEqual(Tool.objects.get(serial_number='SN-9').name, 'Second')
+
+    def test_round_trip_export(self):
+        """Test a CSV from /api/tools/export.csv imports back unchanged"""
+        self.existing.location = self.crib
+        self.existing.save()
+        response = self.client.get('/api/tools/export.csv')
+        exported = b''.join(response.streaming_content).decode('utf-8')
+        out, _ = self.run_import(exported)
+        self.assertIn('(0 new, 1 updated)', out)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.location, self.crib)
+
+    def test_queries_per_batch(self):
+        """Test each batch costs a fixed number of queries, not one per row"""
+        def rows(prefix, count):
+            return HEADER + ''.join(f'Tool {i},{prefix}-{i},,,,Tool Crib\n' for i in range(count))
+
+        with CaptureQueriesContext(connection) as one_batch:
+            ToolImporter(batch_size=100).run(StringIO(rows('A', 100)))
+        with CaptureQueriesContext(connection) as three_batches:
+            ToolImporter(batch_size=100).run(StringIO(rows('B', 300)))
+        # One workcenter lookup, then the same queries for every batch
+        self.assertEqual(len(three_batches) - 1, 3 * (len(one_batch) - 1))
+
+    def test_fallback_without_upsert(self):
+        """Test backends without ON CONFLICT (e.g. Pervasive) update then insert"""
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            out, _ = self.run_import(HEADER + 'Renamed,SN-1,,,,\nAdded,SN-10,,,,\n')
+        self.assertIn('(1 new, 1 updated)', out)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.name, 'Renamed')
+        self.assertTrue(Tool.objects.filter(serial_number='SN-10').exists())
+
+    def test_bulk_changed_signal(self):
+        """Test created and updated ids are announced"""
+        received = []
+
+        def receiver(sender, action, ids=None, **kwargs):
+            received.append((action, ids))
+
+        tools_bulk_changed.connect(receiver, sender=Tool)
+        try:
+            self.run_import(HEADER + 'Renamed,SN-1,,,,\nAdded,SN-11,,,,\n')
+        finally:
+            tools_bulk_changed.disconnect(receiver, sender=Tool)
+        added = Tool.objects.get(serial_number='SN-11')
+        self.assertEqual(received, [('update', [self.existing.pk]), ('create', [added.pk])])
+
+    def test_missing_file(self):
+        """Test an unreadable file is a command error"""
+        with self.assertRaises(CommandError):
+            call_command('import_tools', '/nonexistent/tools.csv', stdout=StringIO())
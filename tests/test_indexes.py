@@ -0,0 +1,60 @@
+"""
+Tests for the lookup indexes and the explain_indexes command
+"""
+from io import StringIO
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from tools.management.commands.explain_indexes import plan_problems
+from tools.models import Tool
+
+
+class LookupIndexTestCase(TestCase):
+    """Test the hot queries are served by indexes"""
+
+    def test_explain_indexes(self):
+        """Test every hot query plan seeks an index"""
+        out = StringIO()
+        call_command('explain_indexes', stdout=out)
+        self.assertIn('All hot queries use an index', out.getvalue())
+
+    def test_full_scan_detected(self):
+        """Test a plan that reads the whole table is reported"""
+        self.assertEqual(plan_problems('2 0 0 SCAN tools_tool'), ['full scan of tools_tool'])
+        self.assertEqual(plan_problems('2 0 0 SCAN tools_tool USING INDEX tools_tool_name_id_idx'), [])
+        self.assertEqual(plan_problems('9 0 0 USE TEMP B-TREE FOR ORDER BY', is_page=True),
+                         ['sort without an index'])
+
+    def test_serial_number_unique(self):
+        """Test two tools cannot share a serial number"""
+        Tool.objects.create(name='Micrometer', serial_number='MIC-1')
+        with self.assertRaises(IntegrityError):
+            Tool.objects.create(name='Other Micrometer', serial_number='MIC-1')
+
+
+class SerialNumberMigrationTestCase(TransactionTestCase):
+    """Test the unique serial migration refuses to run over duplicates"""
+    before = [('tools', '0003_alter_tool_options')]
+    after = [('tools', '0004_alter_tool_last_checked_in_alter_tool_serial_number_and_more')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_serials_reported(self):
+        """Test duplicates are named instead of failing on the constraint"""
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        Tool = executor.loader.project_state(self.before).apps.get_model('tools', 'Tool')
+        Tool.objects.create(name='Bore Gauge', serial_number='BG-7')
+        Tool.objects.create(name='Bore Gauge (ERP copy)', serial_number='BG-7')
+
+        executor.loader.build_graph()
+        with self.assertRaisesMessage(RuntimeError, "'BG-7' x2"):
+            executor.migrate(self.after)
+
+        Tool.objects.filter(name='Bore Gauge (ERP copy)').delete()
+        executor.loader.build_graph()
+        executor.migrate(self.after)
@@ -96,6 +96,7 @@ class InitializationTestCase(TestCase):
 
 class MigrationTestCase(TestCase):
     """Test database migrations"""
+    databases = {'default', 'events'}
     
     def test_migrations_applied(self):
         """Test that migrations can be applied without errors"""
@@ -0,0 +1,147 @@
+"""
+Tests for the Prometheus /metrics endpoint
+"""
+import json
+import os
+import re
+import tempfile
+import time
+
+from django.test import TestCase, Client, override_settings
+from db_backends.pervasive.pool import close_all_pools, get_pool
+from tools.models import Tool
+from toolprogram.cache import stats as response_cache_stats
+from toolprogram.metrics import registry
+from tests import clear_caches
+
+
+class FakeConnection:
+    def close(self):
+        pass
+
+
+def parse(text):
+    """Return {series: value} for every sample line"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            series, value = line.rsplit(' ', 1)
+            samples[series] = float(value)
+    return samples
+
+
+class MetricsTestCase(TestCase):
+    """Test request, query, cache and pool metrics"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        registry.reset()
+        response_cache_stats.reset()
+        Tool.objects.create(name='Caliper', serial_number='C-1')
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_requests_labelled_by_url_name(self):
+        """Test requests are counted by resolved URL name, never the raw path"""
+        tool = Tool.objects.get()
+        self.client.get('/api/tools/')
+        self.client.get('/api/tools/')
+        self.client.get(f'/tools/{tool.pk}/')
+        self.client.get('/no-such-page/')
+        samples = parse(self.scrape())
+
+        self.assertEqual(samples['toolprogram_http_requests_total{method="GET",status="200",view="tool-list"}'], 2)
+        self.assertEqual(
+            samples['toolprogram_http_requests_total{method="GET",status="200",view="tools:tool_detail"}'], 1)
+        self.assertEqual(
+            samples['toolprogram_http_requests_total{method="GET",status="404",view="unresolved"}'], 1)
+        self.assertEqual(
+            samples['toolprogram_http_request_duration_seconds_count{method="GET",view="tool-list"}'], 2)
+        self.assertFalse(any(str(tool.pk) + '/' in series for series in samples))
+
+    def test_histogram_buckets(self):
+        """Test buckets are cumulative, ascending and end with +Inf"""
+        self.client.get('/api/tools/')
+        text = self.scrape()
+        buckets = re.findall(
+            r'^toolprogram_http_request_duration_seconds_bucket\{method="GET",view="tool-list",le="([^"]+)"\} (\d+)$',
+            text, re.MULTILINE)
+        bounds = [float(le) for le, _ in buckets]
+        counts = [int(count) for _, count in buckets]
+        self.assertEqual(bounds, sorted(bounds))
+        self.assertEqual(buckets[-1][0], '+Inf')
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], 1)
+
+    def test_queries_per_alias(self):
+        """Test query counts and durations are recorded per database alias"""
+        self.client.get('/api/tools/')
+        self.client.get('/')
+        samples = parse(self.scrape())
+        self.assertEqual(samples['toolprogram_db_queries_per_request_count{alias="default"}'], 2)
+        # The landing page runs none
+        self.assertEqual(samples['toolprogram_db_queries_per_request_bucket{alias="default",le="0"}'], 1)
+        queries = samples['toolprogram_db_queries_per_request_sum{alias="default"}']
+        self.assertGreater(queries, 0)
+        self.assertEqual(samples['toolprogram_db_query_duration_seconds_count{alias="default"}'], queries)
+
+    def test_cache_hit_ratios(self):
+        """Test response cache lookups and hit ratio by group"""
+        for outcome in ['hits', 'hits', 'hits', 'misses']:
+            response_cache_stats.record('tools', outcome)
+        samples = parse(self.scrape())
+        self.assertEqual(samples['toolprogram_response_cache_requests_total{group="tools",outcome="hits"}'], 3)
+        self.assertEqual(samples['toolprogram_response_cache_hit_ratio{group="tools"}'], 0.75)
+        self.assertIn('toolprogram_serial_cache_entries', samples)
+
+    def test_pool_utilisation(self):
+        """Test Pervasive pool connections and utilisation"""
+        self.addCleanup(close_all_pools)
+        pool = get_pool(('erp', 'DSN=test'), FakeConnection, max_size=4)
+        connection = pool.acquire()
+        self.addCleanup(pool.release, connection)
+        samples = parse(self.scrape())
+        self.assertEqual(samples['toolprogram_db_pool_connections{alias="erp",state="in_use"}'], 1)
+        self.assertEqual(samples['toolprogram_db_pool_max_connections{alias="erp"}'], 4)
+        self.assertEqual(samples['toolprogram_db_pool_utilisation{alias="erp"}'], 0.25)
+
+
+class MultiprocessMetricsTestCase(TestCase):
+    """Test samples written by several workers are added up"""
+
+    def setUp(self):
+        clear_caches()
+        registry.reset()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(METRICS={'MULTIPROCESS_DIR': self.directory.name, 'FLUSH_INTERVAL': 5.0})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write_worker(self, pid, requests, in_use, age=0.0):
+        path = os.path.join(self.directory.name, f'{pid}.json')
+        with open(path, 'w') as f:
+            json.dump({
+                'counters': [['http_requests_total',
+                              [['method', 'GET'], ['status', '200'], ['view', 'tool-list']], requests]],
+                'histograms': [],
+                'gauges': [['db_pool_connections', [['alias', 'default'], ['state', 'in_use']], in_use]],
+            }, f)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+
+    def test_workers_aggregated(self):
+        """Test counters add up across workers; stale workers' gauges are dropped"""
+        self.write_worker(1000001, requests=5, in_use=2)
+        self.write_worker(1000002, requests=7, in_use=3, age=60)
+        client = Client()
+        client.get('/api/tools/')
+        samples = parse(client.get('/metrics').content.decode())
+        self.assertEqual(samples['toolprogram_http_requests_total{method="GET",status="200",view="tool-list"}'], 13)
+        self.assertEqual(samples['toolprogram_db_pool_connections{alias="default",state="in_use"}'], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, f'{os.getpid()}.json')))
@@ -6,6 +6,7 @@ from django.contrib.auth.models import User
 from tools.models import Tool
 from employees.models import Employee
 from workcenters.models import WorkCenter
+from tests import clear_caches
 
 
 class SimpleModelTestCase(TestCase):
@@ -13,6 +14,7 @@ class SimpleModelTestCase(TestCase):
     
     def setUp(self):
         """Set up test data"""
+        clear_caches()
         self.workcenter = WorkCenter.objects.create(
             name="Test WorkCenter",
             location="Test Location",
@@ -53,6 +55,7 @@ class SimpleViewTestCase(TestCase):
     
     def setUp(self):
         """Set up test client and data"""
+        clear_caches()
         self.client = Client()
         
         self.workcenter = WorkCenter.objects.create(
@@ -105,6 +108,7 @@ class SimpleAPITestCase(TestCase):
     
     def setUp(self):
         """Set up test client and authentication"""
+        clear_caches()
         self.client = Client()
         
         # Create user and login
@@ -161,6 +165,7 @@ class SimpleCRUDTestCase(TestCase):
     
     def setUp(self):
         """Set up test client"""
+        clear_caches()
         self.client = Client()
         
         self.workcenter = WorkCenter.objects.create(
@@ -0,0 +1,102 @@
+"""
+Tests for keyset (cursor) pagination on the REST API
+"""
+import json
+from base64 import urlsafe_b64encode
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from tools.models import Tool
+from employees.models import Employee
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Test ?pagination=keyset walks every row exactly once"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        # Duplicate names exercise the id tiebreaker
+        for i in range(25):
+            Tool.objects.create(name=f"Tool {i % 7}", serial_number=f"KP-{i:03d}")
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append(data)
+            url = data['next']
+        return pages
+
+    def test_default_is_page_number(self):
+        """Test existing clients still get page-number responses"""
+        response = self.client.get('/api/tools/')
+        data = response.json()
+        self.assertEqual(data['count'], 25)
+        self.assertEqual(len(data['results']), 20)
+
+    def test_walk_forward(self):
+        """Test following next links returns every tool in order"""
+        pages = self.walk('/api/tools/?pagination=keyset&page_size=4')
+        self.assertEqual(len(pages), 7)
+        self.assertNotIn('count', pages[0])
+
+        ids = [tool['id'] for page in pages for tool in page['results']]
+        expected = list(Tool.objects.order_by('name', 'pk').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_walk_backward(self):
+        """Test previous links return the same pages in reverse"""
+        pages = self.walk('/api/tools/?pagination=keyset&page_size=4')
+        self.assertIsNone(pages[0]['previous'])
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(response.json()['results'], pages[-2]['results'])
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual(response.json()['results'], pages[1]['results'])
+
+    def test_deep_page_uses_no_offset_or_count(self):
+        """Test a cursor page seeks on the sort key instead of counting"""
+        pages = self.walk('/api/tools/?pagination=keyset&page_size=10')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(pages[1]['next'])
+        # Skip the ETag's version check
+        sql = ' '.join(query['sql'] for query in queries.captured_queries
+                       if 'sync_tableversion' not in query['sql'])
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get('/api/tools/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_values_checked(self):
+        """Test cursor values that don't fit the ordering fields are a 404, not a 500"""
+        for position in [['T1', 'abc'], ['T1', {'a': 1}], [['T1'], 1], ['T1', None]]:
+            cursor = urlsafe_b64encode(json.dumps({'r': 0, 'p': position}).encode()).decode()
+            with self.subTest(position=position):
+                self.assertEqual(self.client.get(f'/api/tools/?cursor={cursor}').status_code, 404)
+                self.assertEqual(self.client.get(f'/tools/?cursor={cursor}').status_code, 404)
+
+    def test_employees_ordered_by_name(self):
+        """Test employees page on last_name, first_name, id"""
+        for last, first in [('Smith', 'Ann'), ('Jones', 'Bob'), ('Smith', 'Al'), ('Smith', 'Al')]:
+            Employee.objects.create(name=f"{first} {last}", first_name=first, last_name=last,
+                                    employee_id='E', department='QA', email='e@example.com')
+        pages = self.walk('/api/employees/?pagination=keyset&page_size=1')
+        names = [(e['last_name'], e['first_name']) for page in pages for e in page['results']]
+        self.assertEqual(names, [('Jones', 'Bob'), ('Smith', 'Al'), ('Smith', 'Al'), ('Smith', 'Ann')])
+
+    def test_workcenters(self):
+        """Test workcenters support keyset pagination"""
+        for name in ['Welding', 'Assembly', 'CNC']:
+            WorkCenter.objects.create(name=name)
+        pages = self.walk('/api/workcenters/?pagination=keyset&page_size=2')
+        names = [wc['name'] for page in pages for wc in page['results']]
+        self.assertEqual(names, ['Assembly', 'CNC', 'Welding'])
@@ -0,0 +1,255 @@
+"""
+Tests for the Pervasive backend and its connection pool, run against a fake
+pyodbc module so they work without the ODBC driver installed.
+"""
+import importlib
+import sys
+import threading
+import types
+from collections import namedtuple
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+
+class FakeError(Exception):
+    pass
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = []
+        self.rows = [(1,)]
+
+    def execute(self, sql, params=None):
+        if self.connection.broken:
+            raise FakeError('Communications link failure')
+        self.executed.append((sql, params))
+        self.connection.executed.append((sql, params))
+        return self
+
+    def executemany(self, sql, param_list):
+        self.executed.append((sql, param_list))
+        return self
+
+    def fetchone(self):
+        return (42,)
+
+    def fetchall(self):
+        return self.rows
+
+    def tables(self, tableType=None):
+        Row = namedtuple('Row', 'table_name table_type')
+        self.rows = [Row('TOOLS', 'TABLE'), Row('X$File', 'SYSTEM TABLE'), Row('OPEN_ORDERS', 'VIEW')]
+        return self
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, connection_string, timeout=0):
+        self.connection_string = connection_string
+        self.autocommit = False
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        if self.broken:
+            raise FakeError('Communications link failure')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_fake_pyodbc():
+    module = types.ModuleType('pyodbc')
+    module.connections = []
+
+    def connect(connection_string, timeout=0):
+        connection = FakeConnection(connection_string, timeout)
+        module.connections.append(connection)
+        return connection
+
+    module.connect = connect
+    module.Error = FakeError
+    for name in ('InterfaceError', 'DatabaseError', 'DataError', 'OperationalError',
+                 'IntegrityError', 'InternalError', 'ProgrammingError', 'NotSupportedError'):
+        setattr(module, name, type(name, (FakeError,), {}))
+    module.SQL_DBMS_VER = 18
+    return module
+
+
+def settings_dict(**options):
+    return {
+        'ENGINE': 'db_backends.pervasive',
+        'NAME': 'NdustrOS',
+        'HOST': 'PLATSRVR',
+        'PORT': '1583',
+        'USER': 'NDUSTROS',
+        'PASSWORD': 'secret',
+        'OPTIONS': {'driver': 'Pervasive ODBC Interface', **options},
+        'TIME_ZONE': None,
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'AUTOCOMMIT': True,
+        'ATOMIC_REQUESTS': False,
+        'TEST': {},
+    }
+
+
+class PervasiveBackendTestCase(SimpleTestCase):
+    """Exercise DatabaseWrapper through the fake pyodbc module"""
+
+    def setUp(self):
+        self.pyodbc = make_fake_pyodbc()
+        patcher = patch.dict(sys.modules, {'pyodbc': self.pyodbc})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sys.modules.pop('db_backends.pervasive.base', None)
+        self.base = importlib.import_module('db_backends.pervasive.base')
+        self.addCleanup(sys.modules.pop, 'db_backends.pervasive.base', None)
+        self.addCleanup(self.base.connection_pool.close_all_pools)
+
+    def make_wrapper(self, alias='pervasive_test', **options):
+        return self.base.DatabaseWrapper(settings_dict(**options), alias=alias)
+
+    def test_connection_string(self):
+        """Test settings are turned into a Pervasive ODBC connection string"""
+        wrapper = self.make_wrapper(extra_params='ServerName=IGNORED;Compress=1')
+        params = wrapper.get_connection_params()
+        self.assertEqual(
+            params['connection_string'],
+            'DRIVER={Pervasive ODBC Interface};ServerName=PLATSRVR;Port=1583;'
+            'DBQ=NdustrOS;UID=NDUSTROS;PWD=secret;Compress=1',
+        )
+
+    def test_cursor_converts_placeholders(self):
+        """Test %s placeholders are sent to pyodbc as qmarks"""
+        wrapper = self.make_wrapper()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT "name" FROM "tools_tool" WHERE "id" = %s AND "name" LIKE %s', [1, 'a%%'])
+        sql, params = self.pyodbc.connections[0].executed[-1]
+        self.assertEqual(sql, 'SELECT "name" FROM "tools_tool" WHERE "id" = ? AND "name" LIKE ?')
+        self.assertEqual(params, (1, 'a%%'))
+        wrapper.close()
+
+    def test_pool_reuses_connection_across_requests(self):
+        """Test closing a connection returns it to the pool for reuse"""
+        first = self.make_wrapper()
+        first.ensure_connection()
+        first.close()
+
+        # A second wrapper (e.g. another request thread) gets the same session
+        second = self.make_wrapper()
+        second.ensure_connection()
+        self.assertEqual(len(self.pyodbc.connections), 1)
+        self.assertIs(second.connection, self.pyodbc.connections[0])
+        self.assertFalse(self.pyodbc.connections[0].closed)
+        second.close()
+
+        stats = second.pool.stats()
+        self.assertEqual(stats['connects'], 1)
+        self.assertEqual(stats['reuses'], 1)
+        self.assertEqual(stats['idle'], 1)
+
+    def test_pool_disabled(self):
+        """Test OPTIONS['pool']=False opens and closes a session per connect"""
+        wrapper = self.make_wrapper(pool=False)
+        wrapper.ensure_connection()
+        wrapper.close()
+        wrapper.ensure_connection()
+        wrapper.close()
+        self.assertEqual(len(self.pyodbc.connections), 2)
+        self.assertTrue(all(c.closed for c in self.pyodbc.connections))
+
+    def test_pool_is_bounded(self):
+        """Test the pool refuses to open more than max_size connections"""
+        PoolTimeout = self.base.connection_pool.PoolTimeout
+
+        first = self.make_wrapper(pool={'max_size': 1, 'timeout': 0.01})
+        first.ensure_connection()
+        second = self.make_wrapper(pool={'max_size': 1, 'timeout': 0.01})
+        with self.assertRaises(PoolTimeout):
+            second.ensure_connection()
+        self.assertEqual(first.pool.stats()['timeouts'], 1)
+        first.close()
+
+    def test_unhealthy_connection_is_replaced(self):
+        """Test an idle connection failing its ping is discarded"""
+        wrapper = self.make_wrapper(pool={'health_check_interval': 0})
+        wrapper.ensure_connection()
+        wrapper.close()
+        self.pyodbc.connections[0].broken = True
+
+        wrapper.ensure_connection()
+        self.assertEqual(len(self.pyodbc.connections), 2)
+        self.assertIs(wrapper.connection, self.pyodbc.connections[1])
+        self.assertTrue(self.pyodbc.connections[0].closed)
+        wrapper.close()
+
+    def test_pool_rolls_back_on_release(self):
+        """Test a returned connection never carries an open transaction"""
+        wrapper = self.make_wrapper()
+        wrapper.ensure_connection()
+        wrapper.close()
+        self.assertEqual(self.pyodbc.connections[0].rollbacks, 1)
+
+    def test_fill_connects_outside_the_lock(self):
+        """Test requests are served while fill() waits on a slow connect"""
+        ConnectionPool = self.base.connection_pool.ConnectionPool
+        connecting = threading.Event()
+        release = threading.Event()
+
+        def connect():
+            # Only the fill is slow to connect
+            if threading.current_thread() is filler:
+                connecting.set()
+                release.wait(5)
+            return FakeConnection('DSN=test')
+
+        pool = ConnectionPool(connect, max_size=3, min_size=2)
+        filler = threading.Thread(target=pool.fill)
+        filler.start()
+        self.assertTrue(connecting.wait(5))
+        # The lock is free while the fill connects
+        self.assertEqual(pool.stats()['size'], 2)
+        pool.release(pool.acquire())
+        release.set()
+        filler.join(5)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['connects']), (3, 3))
+
+    def test_unknown_pool_option(self):
+        """Test misspelt pool options are reported"""
+        from django.core.exceptions import ImproperlyConfigured
+
+        wrapper = self.make_wrapper(pool={'maxsize': 3})
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.ensure_connection()
+
+    def test_operations(self):
+        """Test Pervasive-specific SQL generation"""
+        wrapper = self.make_wrapper()
+        self.assertEqual(wrapper.ops.quote_name('tools_tool'), '"tools_tool"')
+        self.assertEqual(wrapper.ops.quote_name('"tools_tool"'), '"tools_tool"')
+        self.assertEqual(wrapper.ops.date_extract_sql('year', '"last_checked_in"', ()),
+                         ('YEAR("last_checked_in")', ()))
+
+    def test_introspection_skips_dictionary_tables(self):
+        """Test X$ data dictionary tables are not reported as user tables"""
+        wrapper = self.make_wrapper()
+        with wrapper.cursor() as cursor:
+            tables = wrapper.introspection.get_table_list(cursor)
+        self.assertEqual([(t.name, t.type) for t in tables], [('TOOLS', 't'), ('OPEN_ORDERS', 'v')])
+        wrapper.close()
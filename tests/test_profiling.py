@@ -0,0 +1,141 @@
+"""
+Tests for the request profiling middleware
+"""
+import json
+import re
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.template import Context
+from django.template.base import Template
+from django.test import TestCase, Client, AsyncClient, override_settings
+from rest_framework.serializers import BaseSerializer
+from tools.models import Tool
+from toolprogram.profiling import RequestProfile, current, time_templates
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+def parse_server_timing(header):
+    """Return {name: (milliseconds, description)}"""
+    timings = {}
+    for part in header.split(', '):
+        name, *params = part.split(';')
+        values = dict(param.split('=', 1) for param in params)
+        timings[name] = (float(values['dur']), values.get('desc', '').strip('"'))
+    return timings
+
+
+class ProfilingMiddlewareTestCase(TestCase):
+    """Test Server-Timing and the log line for profiled requests"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        for i in range(3):
+            Tool.objects.create(name=f'Gauge {i}', serial_number=f'G-{i}', location=self.crib)
+        self.staff = User.objects.create_user('lead', password='pw', is_staff=True)
+        self.operator = User.objects.create_user('operator', password='pw')
+
+    def test_off_by_default(self):
+        """Test requests aren't profiled unless asked"""
+        response = self.client.get('/api/tools/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_staff_opt_in(self):
+        """Test staff users can profile one request with ?_profile=1 or a header"""
+        self.client.force_login(self.staff)
+        with self.assertLogs('toolprogram.profiling', 'INFO') as logs:
+            response = self.client.get('/api/tools/?_profile=1')
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(set(timings), {'db', 'serializer', 'template', 'app', 'total'})
+        self.assertGreater(timings['serializer'][0], 0)
+        self.assertRegex(timings['db'][1], r'^\d+ queries$')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'tool-list')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['queries'], int(timings['db'][1].split()[0]))
+        self.assertEqual(logs.records[0].profile, record)
+
+        with self.assertLogs('toolprogram.profiling', 'INFO'):
+            response = self.client.get('/workcenters/', HTTP_X_PROFILE='1')
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertGreater(timings['template'][0], 0)
+        self.assertEqual(timings['serializer'][0], 0)
+
+    def test_non_staff_ignored(self):
+        """Test other users can't see timings"""
+        self.client.force_login(self.operator)
+        self.assertNotIn('Server-Timing', self.client.get('/api/tools/?_profile=1'))
+        self.client.logout()
+        self.assertNotIn('Server-Timing', self.client.get('/api/tools/', HTTP_X_PROFILE='1'))
+
+    @override_settings(PROFILING={'ENABLED': True})
+    def test_enabled_for_everyone(self):
+        """Test PROFILING['ENABLED'] profiles anonymous requests too"""
+        with self.assertLogs('toolprogram.profiling', 'INFO'):
+            response = self.client.get(f'/api/workcenters/{self.crib.pk}/')
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(timings['db'][1], '3 queries')
+        total = timings['total'][0]
+        parts = sum(timings[name][0] for name in ('db', 'serializer', 'template', 'app'))
+        self.assertAlmostEqual(parts, total, delta=0.5)
+
+    def test_only_profiled_renders_timed(self):
+        """Test Template.render is wrapped once at startup and times only the profiled context"""
+        render = Template.render
+        self.assertTrue(hasattr(render, '__wrapped__'))
+        time_templates()
+        self.assertIs(Template.render, render)
+        self.assertEqual(BaseSerializer.data.fget.__module__, 'rest_framework.serializers')
+
+        profile = RequestProfile()
+        token = current.set(profile)
+        try:
+            # Another thread starts with an empty context: an unprofiled request
+            thread = threading.Thread(target=Template('{{ x }}').render, args=(Context({'x': 1}),))
+            thread.start()
+            thread.join()
+            self.assertEqual(profile.spans['template'], 0)
+            Template('{{ x }}').render(Context({'x': 1}))
+            self.assertGreater(profile.spans['template'], 0)
+        finally:
+            current.reset(token)
+
+    @override_settings(PROFILING={'TEMPLATES': False})
+    def test_templates_option(self):
+        """Test PROFILING['TEMPLATES'] off leaves Template.render alone at startup"""
+        with mock.patch('toolprogram.profiling.time_templates') as time_templates_mock:
+            apps.get_app_config('toolprogram').ready()
+        time_templates_mock.assert_not_called()
+
+    @override_settings(PROFILING={'ENABLED': True})
+    def test_async(self):
+        """Test queries are timed when served through the ASGI handler"""
+        with self.assertLogs('toolprogram.profiling', 'INFO'):
+            response = async_to_sync(AsyncClient().get)('/api/tools/')
+        self.assertEqual(response.status_code, 200)
+        timings = parse_server_timing(response['Server-Timing'])
+        self.assertGreater(int(re.match(r'\d+', timings['db'][1]).group()), 0)
+
+
+class RequestProfileTestCase(TestCase):
+    """Test spans exclude the queries they run"""
+
+    def test_nested_spans_and_queries(self):
+        """Test a nested span is folded into the outer one, minus query time"""
+        profile = RequestProfile()
+        with profile.wrap_connections():
+            with profile.span('serializer'):
+                with profile.span('template'):
+                    Tool.objects.count()
+        profile.finish()
+        self.assertEqual(profile.queries, 1)
+        self.assertEqual(profile.spans['template'], 0.0)
+        self.assertGreaterEqual(profile.spans['serializer'], 0.0)
+        self.assertLessEqual(profile.spans['serializer'] + profile.db, profile.total)
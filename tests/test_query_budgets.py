@@ -0,0 +1,127 @@
+"""
+Tests that every route stays within its declared query budget at two
+dataset sizes (see toolprogram.budgets)
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from sync.views import encode_token
+from tools.models import Tool
+from toolprogram.budgets import get_query_budget
+from toolprogram.health import state as health_state
+from tests import clear_caches
+
+# (tools, employees, workcenters); both sizes fill more than one page
+SIZES = [(60, 30, 4), (240, 120, 16)]
+
+# Routes that can't be measured with one GET
+SKIPPED_NAMESPACES = {'admin'}
+SKIPPED_NAMES = {'events'}  # Server-sent events never finish streaming
+
+# DRF's browsable API root only reverses URLs
+UNBUDGETED_NAMES = {'api-root'}
+
+# Query strings each route is requested with; routes not listed get none
+QUERY_STRINGS = {
+    'sync': ['', 'since={since}'],
+    'tool-list': ['', 'pagination=keyset', 'fields=id,name,serial_number'],
+    'tool-search': ['q=mitutoyo'],
+    'workcenter-list': ['', 'expand='],
+    'tool_list': ['', 'location=1&calibrated=false', 'q=mitutoyo'],
+}
+
+
+def handles_get(callback):
+    actions = getattr(callback, 'actions', None)
+    return actions is None or 'get' in actions
+
+
+def iter_routes(patterns=None, namespace=None):
+    """Yield (URL name, kwarg names, callback) for every named GET route"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            if entry.namespace in SKIPPED_NAMESPACES:
+                continue
+            inner = namespace
+            if entry.namespace:
+                inner = f'{namespace}:{entry.namespace}' if namespace else entry.namespace
+            for name, kwargs, callback in iter_routes(entry.url_patterns, inner):
+                yield name, kwargs | set(entry.pattern.regex.groupindex), callback
+        elif isinstance(entry, URLPattern) and entry.name and entry.name not in SKIPPED_NAMES:
+            kwargs = set(entry.pattern.regex.groupindex)
+            if 'format' in kwargs or not handles_get(entry.callback):
+                continue  # Skip the router's .json suffix copies and POST-only actions
+            name = f'{namespace}:{entry.name}' if namespace else entry.name
+            yield name, kwargs, entry.callback
+
+
+# The tests run the health check themselves
+@override_settings(HEALTH={'BACKGROUND': False})
+class QueryBudgetTestCase(TestCase):
+    """Test GET query counts are within budget and don't grow with the data"""
+    # The health routes check every database
+    databases = {'default', 'events'}
+
+    def setUp(self):
+        clear_caches()
+
+    def requests(self):
+        """Yield (URL name, URL, callback) for every route and query string"""
+        values = {
+            'pk': 1,
+            'serial': Tool.objects.values_list('serial_number', flat=True).get(pk=1),
+            'since': encode_token(timezone.now() - timedelta(hours=1)),
+        }
+        for name, kwargs, callback in iter_routes():
+            url = reverse(name, kwargs={key: values[key] for key in kwargs})
+            for query in QUERY_STRINGS.get(name.split(':')[-1], ['']):
+                yield name, f'{url}?{query.format(**values)}' if query else url, callback
+
+    def measure(self):
+        client = Client()
+        counts = {}
+        for name, url, callback in self.requests():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            # The sync token changes between runs; key on its position
+            counts[(name, url.split('?since=')[0])] = (url, callback, response.status_code, len(queries))
+        return counts
+
+    def test_every_route_declares_a_budget(self):
+        """Test no GET route is missing a query budget"""
+        missing = sorted({name for name, _, callback in iter_routes()
+                          if get_query_budget(callback) is None
+                          and name.split(':')[-1] not in UNBUDGETED_NAMES})
+        self.assertEqual(missing, [])
+
+    def test_queries_within_budget_and_constant(self):
+        """Test each route's query count is within budget at both sizes"""
+        # Health routes report the background check; tests run it directly
+        health_state.refresh()
+        self.addCleanup(health_state.reset)
+        runs = []
+        for tools, employees, workcenters in SIZES:
+            call_command('generate_dataset', tools=tools, employees=employees,
+                         workcenters=workcenters, clear=True, stdout=StringIO())
+            runs.append(self.measure())
+
+        small, large = runs
+        self.assertEqual(set(small), set(large))
+        for key, (url, callback, status, count) in large.items():
+            with self.subTest(url=url):
+                self.assertLess(status, 400)
+                self.assertEqual(count, small[key][3], f'{key[0]} queries grow with the row count')
+                budget = get_query_budget(callback)
+                if budget is not None:
+                    self.assertLessEqual(count, budget, f'{key[0]} is over its budget of {budget}')
@@ -0,0 +1,128 @@
+"""
+Tests for the signal-invalidated response cache
+"""
+from django.core.cache import cache, caches
+from django.test import TestCase, Client, override_settings
+from employees.models import Employee
+from toolprogram.cache import stats
+from tools.models import Tool
+from workcenters.models import WorkCenter
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                      'LOCATION': 'response-cache-tests'}}
+
+
+@override_settings(CACHES=LOCMEM)
+class ResponseCacheTestCase(TestCase):
+    """Test list pages and API collections are cached until their models change"""
+
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        self.tool = Tool.objects.create(name='Surface Plate', serial_number='SP-1', location=self.crib)
+
+    def test_api_collection_cached(self):
+        """Test a repeated API list is served without list queries"""
+        first = self.client.get('/api/tools/').json()
+        with self.assertNumQueries(1):  # The ETag version check only
+            second = self.client.get('/api/tools/').json()
+        self.assertEqual(first, second)
+        self.assertEqual(stats.snapshot()['tools']['hits'], 1)
+
+    def test_html_list_cached(self):
+        """Test a repeated list page is served without the page queries"""
+        self.client.get('/tools/')
+        with self.assertNumQueries(1):  # The Tool and WorkCenter versions
+            response = self.client.get('/tools/')
+        self.assertContains(response, 'Surface Plate')
+
+    def test_keyed_by_query(self):
+        """Test different query strings are cached separately"""
+        self.client.get('/api/tools/?fields=id,name')
+        data = self.client.get('/api/tools/').json()
+        self.assertIn('serial_number', data['results'][0])
+
+    def test_save_invalidates(self):
+        """Test saving a tool invalidates tool and workcenter collections"""
+        self.client.get('/api/tools/')
+        self.client.get('/api/workcenters/')
+        self.tool.name = 'Granite Surface Plate'
+        self.tool.save()
+        self.assertEqual(self.client.get('/api/tools/').json()['results'][0]['name'], 'Granite Surface Plate')
+        workcenter = self.client.get('/api/workcenters/').json()['results'][0]
+        self.assertEqual(workcenter['tools'][0]['name'], 'Granite Surface Plate')
+
+    def test_delete_and_bulk_invalidate(self):
+        """Test deletes and bulk writes invalidate the tool pages"""
+        self.client.get('/tools/')
+        self.client.delete(f'/api/tools/bulk/?ids={self.tool.pk}')
+        self.assertNotContains(self.client.get('/tools/'), 'Surface Plate')
+
+    def test_invalidation_is_per_group(self):
+        """Test an employee change leaves tool pages cached"""
+        self.client.get('/api/tools/')
+        Employee.objects.create(name='Ann Lee', first_name='Ann', last_name='Lee',
+                                employee_id='E1', department='QA', email='ann@example.com')
+        self.client.get('/api/tools/')
+        self.assertEqual(stats.snapshot()['tools']['hits'], 1)
+
+    def test_stats_endpoint(self):
+        """Test hit/miss counters are exposed"""
+        self.client.get('/employees/')
+        self.client.get('/employees/')
+        data = self.client.get('/api/cache-stats/').json()
+        self.assertEqual(data['groups']['employees']['hits'], 1)
+        self.assertEqual(data['groups']['employees']['misses'], 1)
+        self.assertEqual(data['groups']['employees']['hit_ratio'], 0.5)
+
+
+WORKERS = {
+    'default': LOCMEM['default'],
+    'worker-a': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-a'},
+    'worker-b': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-b'},
+}
+
+
+@override_settings(CACHES=WORKERS)
+class SeparateWorkerCacheTestCase(TestCase):
+    """Test workers with their own local-memory caches never serve stale bodies"""
+
+    def setUp(self):
+        for alias in WORKERS:
+            caches[alias].clear()
+        self.client = Client()
+        self.tool = Tool.objects.create(name='Sine Bar', serial_number='SB-1')
+
+    def get(self, worker, url, **headers):
+        with override_settings(RESPONSE_CACHE={'ALIAS': worker, 'TIMEOUT': 300}):
+            return self.client.get(url, **headers)
+
+    def test_write_seen_by_other_worker(self):
+        """Test a write handled by one worker is seen by the other's cache"""
+        etag = self.get('worker-a', '/api/tools/')['ETag']
+        self.get('worker-b', '/api/tools/')
+        self.get('worker-b', '/tools/')
+
+        with override_settings(RESPONSE_CACHE={'ALIAS': 'worker-a', 'TIMEOUT': 300}):
+            self.client.patch(f'/api/tools/{self.tool.pk}/', {'name': 'Sine Plate'},
+                              content_type='application/json')
+
+        response = self.get('worker-b', '/api/tools/')
+        self.assertEqual(response.json()['results'][0]['name'], 'Sine Plate')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.get('worker-b', '/api/tools/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertContains(self.get('worker-b', '/tools/'), 'Sine Plate')
+
+    def test_bulk_write_seen_by_other_worker(self):
+        """Test a bulk update through one worker moves the other off its cached page"""
+        self.get('worker-b', '/tools/')
+
+        with override_settings(RESPONSE_CACHE={'ALIAS': 'worker-a', 'TIMEOUT': 300}):
+            self.client.patch('/api/tools/bulk/', [{'id': self.tool.pk, 'name': 'Sine Plate'}],
+                              content_type='application/json')
+
+        self.assertContains(self.get('worker-b', '/tools/'), 'Sine Plate')
+        with self.assertNumQueries(1):  # The Tool and WorkCenter versions
+            self.assertContains(self.get('worker-b', '/tools/'), 'Sine Plate')
@@ -7,6 +7,7 @@ from django.contrib.auth.models import User
 from tools.models import Tool
 from employees.models import Employee
 from workcenters.models import WorkCenter
+from tests import clear_caches
 
 
 class ModelSanityTestCase(TestCase):
@@ -14,6 +15,7 @@ class ModelSanityTestCase(TestCase):
     
     def setUp(self):
         """Set up test data"""
+        clear_caches()
         self.workcenter = WorkCenter.objects.create(
             name="Test WorkCenter",
             location="Test Location",
@@ -75,6 +77,7 @@ class URLSanityTestCase(TestCase):
     
     def setUp(self):
         """Set up test client"""
+        clear_caches()
         self.client = Client()
         
         # Create test data
@@ -146,6 +149,7 @@ class APISanityTestCase(TestCase):
     
     def setUp(self):
         """Set up test data and authenticated user"""
+        clear_caches()
         self.client = Client()
         
         # Create user and login
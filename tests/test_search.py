@@ -0,0 +1,97 @@
+"""
+Tests for full-text tool search
+"""
+from django.test import TestCase, Client
+from tools.models import Tool
+from tools.search import MAX_LIMIT, fts_match_expression, search_terms
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class ToolSearchTestCase(TestCase):
+    """Test /api/tools/search/ and the tool list search box"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        Tool.objects.create(name='Digital Caliper', serial_number='PD-2024-001',
+                            description='Measures outside and inside diameters')
+        Tool.objects.create(name='Torque Wrench', serial_number='TW-100',
+                            description='Calibrated torque for caliper mounting bolts')
+        Tool.objects.create(name='Height Gauge', serial_number='HG-7',
+                            description='Granite surface plate gauge')
+
+    def search(self, q, **params):
+        response = self.client.get('/api/tools/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [tool['name'] for tool in response.json()['results']]
+
+    def test_ranked_results(self):
+        """Test a name match ranks above a description match"""
+        self.assertEqual(self.search('caliper'), ['Digital Caliper', 'Torque Wrench'])
+
+    def test_prefix_match(self):
+        """Test partial words and serials match"""
+        self.assertEqual(self.search('gaug'), ['Height Gauge'])
+        self.assertEqual(self.search('PD-20'), ['Digital Caliper'])
+
+    def test_all_terms_required(self):
+        """Test every term must match"""
+        self.assertEqual(self.search('torque bolts'), ['Torque Wrench'])
+        self.assertEqual(self.search('torque granite'), [])
+
+    def test_index_follows_writes(self):
+        """Test updates, bulk updates and deletes are reflected in results"""
+        tool = Tool.objects.get(serial_number='HG-7')
+        tool.name = 'Bore Gauge'
+        tool.save()
+        self.assertEqual(self.search('bore'), ['Bore Gauge'])
+        self.assertEqual(self.search('height'), [])
+
+        Tool.objects.filter(pk=tool.pk).update(description='Dial bore indicator')
+        self.assertEqual(self.search('indicator'), ['Bore Gauge'])
+
+        tool.delete()
+        self.assertEqual(self.search('bore'), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Test FTS operators in the input are searched literally"""
+        self.assertEqual(self.search('"caliper OR NEAR('), [])
+        self.assertEqual(fts_match_expression(['a"b']), '"a""b"*')
+        self.assertEqual(search_terms('- caliper --'), ['caliper'])
+
+    def test_requires_query(self):
+        """Test q is required"""
+        response = self.client.get('/api/tools/search/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_limit_and_fields(self):
+        """Test limit caps results and sparse fieldsets apply"""
+        response = self.client.get('/api/tools/search/', {'q': 'caliper', 'limit': 1, 'fields': 'id,name'})
+        results = response.json()['results']
+        self.assertEqual(results, [{'id': Tool.objects.get(name='Digital Caliper').pk, 'name': 'Digital Caliper'}])
+
+    def test_list_view_search_box(self):
+        """Test the tool list filters on ?q="""
+        response = self.client.get('/tools/', {'q': 'wrench'})
+        self.assertContains(response, 'Torque Wrench')
+        self.assertNotContains(response, 'Height Gauge')
+        self.assertContains(response, 'value="wrench"')
+
+        response = self.client.get('/tools/', {'q': 'nothing-like-this'})
+        self.assertContains(response, 'No Tools Match')
+
+    def test_filters_applied_before_ranking(self):
+        """Test a filtered search ranks within the filter, not the global top matches"""
+        crib = WorkCenter.objects.create(name='Tool Crib')
+        cell = WorkCenter.objects.create(name='Cell 1')
+        # Better matches elsewhere fill the first MAX_LIMIT hits
+        Tool.objects.bulk_create([
+            Tool(name=f'Caliper Caliper {i}', serial_number=f'CC-{i}', location=cell)
+            for i in range(MAX_LIMIT + 10)
+        ])
+        Tool.objects.create(name='Crib Gauge', serial_number='CG-1', location=crib,
+                            description='Checks caliper jaws')
+        response = self.client.get('/tools/', {'q': 'caliper', 'location': crib.pk})
+        self.assertContains(response, 'Crib Gauge')
+        self.assertNotContains(response, 'Caliper Caliper')
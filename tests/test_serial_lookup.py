@@ -0,0 +1,101 @@
+"""
+Tests for the barcode scanner lookup at /api/tools/by-serial/<serial>/
+"""
+from unittest.mock import patch
+from django.test import TestCase, Client
+from tools.models import Tool
+from tools.serial_cache import LRUCache, get_serial_cache
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class SerialLookupTestCase(TestCase):
+    """Test scans are served from the cache and invalidated on change"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        get_serial_cache().clear()
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        self.tool = Tool.objects.create(name='Dial Indicator', serial_number='DI-42', location=self.crib)
+
+    def scan(self, serial='DI-42'):
+        return self.client.get(f'/api/tools/by-serial/{serial}/')
+
+    def test_minimal_payload(self):
+        """Test the payload carries only what a scanner shows"""
+        response = self.scan()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'id': self.tool.pk, 'name': 'Dial Indicator', 'serial_number': 'DI-42',
+            'calibrated': False, 'location': {'id': self.crib.pk, 'name': 'Tool Crib'},
+        })
+
+    def test_warm_scans_skip_database(self):
+        """Test repeated scans of a serial run no queries"""
+        self.assertEqual(self.scan()['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            for _ in range(50):
+                response = self.scan()
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_unknown_serial(self):
+        """Test an unknown serial returns 404"""
+        self.assertEqual(self.scan('NOPE').status_code, 404)
+
+    def test_save_invalidates(self):
+        """Test saving a tool drops its cached entry, including a renamed serial"""
+        self.scan()
+        self.tool.calibrated = True
+        self.tool.serial_number = 'DI-43'
+        self.tool.save()
+        self.assertEqual(self.scan('DI-42').status_code, 404)
+        self.assertTrue(self.scan('DI-43').json()['calibrated'])
+
+    def test_delete_invalidates(self):
+        """Test deleting a tool drops its cached entry"""
+        self.scan()
+        self.tool.delete()
+        self.assertEqual(self.scan().status_code, 404)
+
+    def test_bulk_paths_invalidate(self):
+        """Test bulk assignment and bulk delete drop cached entries"""
+        cell = WorkCenter.objects.create(name='Cell 2')
+        self.scan()
+        self.client.post('/api/tools/assign_to_workcenter/',
+                         {'workcenter_id': cell.pk, 'tool_ids': [self.tool.pk]},
+                         content_type='application/json')
+        self.assertEqual(self.scan().json()['location']['name'], 'Cell 2')
+
+        self.client.delete(f'/api/tools/bulk/?ids={self.tool.pk}')
+        self.assertEqual(self.scan().status_code, 404)
+
+    def test_workcenter_rename_invalidates(self):
+        """Test renaming a workcenter refreshes the embedded name"""
+        self.scan()
+        self.crib.name = 'Main Crib'
+        self.crib.save()
+        self.assertEqual(self.scan().json()['location']['name'], 'Main Crib')
+
+
+class LRUCacheTestCase(TestCase):
+    """Test the LRU cache's eviction and expiry"""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted first"""
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_entries_expire(self):
+        """Test entries older than the TTL are misses"""
+        cache = LRUCache(max_size=2, ttl=5)
+        with patch('tools.serial_cache.time.monotonic', return_value=100.0):
+            cache.set('a', 1)
+        with patch('tools.serial_cache.time.monotonic', return_value=106.0):
+            self.assertIsNone(cache.get('a'))
@@ -0,0 +1,170 @@
+"""
+Tests for the slow-query log and the slow_queries report
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from tools.models import Tool
+from toolprogram.slow_queries import fingerprint, log_slow_query, normalize
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class SlowQueryLogTestCase(TestCase):
+    """Test queries over the threshold are logged with their context"""
+
+    def setUp(self):
+        clear_caches()
+        handle, self.path = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        crib = WorkCenter.objects.create(name='Tool Crib')
+        Tool.objects.create(name='Caliper', serial_number='C-1', location=crib)
+
+    def settings(self, threshold):
+        return override_settings(SLOW_QUERIES={'THRESHOLD_MS': threshold, 'LOG_FILE': self.path})
+
+    def entries(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_fast_queries_not_logged(self):
+        """Test nothing is written below the threshold"""
+        with self.settings(10000):
+            self.client.get('/api/tools/')
+        self.assertEqual(self.entries(), [])
+
+    def test_slow_query_entry(self):
+        """Test an entry holds params, the calling code and the SQLite plan"""
+        with self.settings(0.0001), self.assertLogs('toolprogram.slow_queries', 'WARNING'):
+            list(Tool.objects.filter(serial_number='C-1'))
+        entry = self.entries()[-1]
+        self.assertIn('tools_tool', entry['sql'])
+        self.assertEqual(entry['params'], ['C-1'])
+        self.assertEqual(entry['alias'], 'default')
+        self.assertEqual(entry['fingerprint'], fingerprint(entry['sql']))
+        self.assertTrue(entry['frames'][0].startswith('tests/test_slow_queries.py:'))
+        self.assertIn('SEARCH tools_tool USING INDEX', entry['plan'])
+
+    def test_view_frames(self):
+        """Test queries run by a request point at the view or serializer"""
+        with self.settings(0.0001), self.assertLogs('toolprogram.slow_queries', 'WARNING'):
+            Client().get('/api/workcenters/')
+        frames = [frame for entry in self.entries() for frame in entry['frames']]
+        self.assertTrue(any(frame.startswith('workcenters/serializers.py') for frame in frames))
+
+    def test_writes_not_explained(self):
+        """Test only reads are explained"""
+        with self.settings(0.0001), self.assertLogs('toolprogram.slow_queries', 'WARNING'):
+            Tool.objects.filter(serial_number='C-1').update(calibrated=True)
+        entry = self.entries()[-1]
+        self.assertTrue(entry['sql'].startswith('UPDATE'))
+        self.assertIsNone(entry['plan'])
+
+    def test_query_results_intact(self):
+        """Test the EXPLAIN doesn't disturb the cursor being read"""
+        with self.settings(0.0001), self.assertLogs('toolprogram.slow_queries', 'WARNING'):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT name FROM tools_tool')
+                self.assertEqual(cursor.fetchall(), [('Caliper',)])
+
+
+class ReconnectTestCase(TransactionTestCase):
+    """Test the hook survives connections opened mid-request (CONN_MAX_AGE=0)"""
+
+    def setUp(self):
+        clear_caches()
+        handle, self.path = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        connection.ensure_connection()
+        self.original = connection.connection
+        self.opened = []
+        self.addCleanup(self.restore)
+
+    def restore(self):
+        for raw in self.opened:
+            raw.close()
+        connection.connection = self.original
+
+    def request_with_reconnect(self):
+        # Forget the open connection so the request connects again
+        # (closing would drop the in-memory test database)
+        connection.connection = None
+        Client().get('/api/tools/')
+        self.opened.append(connection.connection)
+
+    def test_request_wrappers_not_leaked(self):
+        """Test only the hook is left after requests whose connection opens inside them"""
+        connection.execute_wrappers.remove(log_slow_query)  # A connection never opened before
+        settings = override_settings(SLOW_QUERIES={'THRESHOLD_MS': 0.0001, 'LOG_FILE': self.path})
+        with settings, self.assertLogs('toolprogram.slow_queries', 'WARNING'):
+            for _ in range(3):
+                self.request_with_reconnect()
+                self.assertEqual(connection.execute_wrappers, [log_slow_query])
+        with open(self.path) as f:
+            self.assertTrue(any('tools_tool' in json.loads(line)['sql'] for line in f))
+
+
+class FingerprintTestCase(TestCase):
+    """Test normalisation groups queries that differ only in values"""
+
+    def test_normalize(self):
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE a = 'x''y' AND b = 42 AND c IN (%s, %s,  %s)"),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)',
+        )
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id IN (%s)'),
+                         fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'))
+        self.assertNotEqual(fingerprint('SELECT * FROM t'), fingerprint('SELECT * FROM u'))
+
+
+class SlowQueriesReportTestCase(TestCase):
+    """Test the slow_queries command aggregates the log"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def write(self, sql, duration, caller='tools/views.py:10 in list', time='2026-01-01T00:00:00+00:00'):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({
+                'time': time, 'alias': 'default', 'vendor': 'sqlite', 'duration_ms': duration,
+                'fingerprint': fingerprint(sql), 'sql': sql, 'params': [1], 'many': False,
+                'frames': [caller], 'plan': 'SCAN tools_tool',
+            }) + '\n')
+
+    def report(self, *args):
+        out = StringIO()
+        call_command('slow_queries', '--file', self.path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_grouped_by_fingerprint(self):
+        """Test queries differing only in values form one row, sorted by total time"""
+        self.write('SELECT * FROM tools_tool WHERE id = 1', 600)
+        self.write('SELECT * FROM tools_tool WHERE id = 2', 900)
+        self.write('SELECT * FROM employees_employee', 1000, caller='employees/views.py:5 in list')
+        with open(self.path, 'a') as f:
+            f.write('{"torn')
+        output = self.report()
+        self.assertIn('3 slow queries, 2 fingerprints', output)
+        rows = [line for line in output.splitlines() if line[:12] in (
+            fingerprint('SELECT * FROM tools_tool WHERE id = 1'), fingerprint('SELECT * FROM employees_employee'))]
+        self.assertEqual(rows[0].split()[1:5], ['2', '1500', '750.0', '900.0'])
+        self.assertEqual(rows[1].split()[1], '1')
+
+        output = self.report('--sort', 'max', '--plans')
+        self.assertLess(output.index('employees_employee'), output.index('tools_tool'))
+        self.assertIn('SCAN tools_tool', output)
+
+    def test_hours_and_clear(self):
+        """Test --hours skips old entries and --clear empties the log"""
+        self.write('SELECT 1', 700)
+        self.assertIn('No slow queries', self.report('--hours', '1', '--clear'))
+        self.assertEqual(os.path.getsize(self.path), 0)
@@ -8,6 +8,7 @@ from tools.models import Tool
 from employees.models import Employee
 from workcenters.models import WorkCenter
 import json
+from tests import clear_caches
 
 
 class CRUDSmokeTestCase(TestCase):
@@ -15,6 +16,7 @@ class CRUDSmokeTestCase(TestCase):
     
     def setUp(self):
         """Set up test data"""
+        clear_caches()
         self.client = Client()
         
         # Create user for authentication
@@ -139,6 +141,7 @@ class APISmokeTestCase(TestCase):
     
     def setUp(self):
         """Set up test data and authentication"""
+        clear_caches()
         self.client = Client()
         
         # Create user and login
@@ -248,6 +251,7 @@ class NavigationSmokeTestCase(TestCase):
     
     def setUp(self):
         """Set up test client and data"""
+        clear_caches()
         self.client = Client()
         
         # Create test data
@@ -0,0 +1,179 @@
+"""
+Tests for delta sync at /api/sync/
+"""
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.utils import timezone
+from employees.models import Employee
+from sync.models import Tombstone
+from sync.views import encode_cursor, encode_token
+from tools.models import Tool
+from workcenters.models import WorkCenter
+from tests import clear_caches
+
+
+class SyncAPITestCase(TestCase):
+    """Test /api/sync/ returns only changes since a token"""
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.crib = WorkCenter.objects.create(name='Tool Crib')
+        self.tools = [Tool.objects.create(name=f'Gauge {i}', serial_number=f'SY-{i}', location=self.crib)
+                      for i in range(5)]
+        self.employee = Employee.objects.create(name='Ann Lee', first_name='Ann', last_name='Lee',
+                                                employee_id='E1', department='QA', email='ann@example.com')
+        # Make the fixture rows older than any token issued during the test
+        an_hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        for model in (Tool, Employee, WorkCenter):
+            model.objects.update(updated_at=an_hour_ago)
+
+    def sync(self, **params):
+        response = self.client.get('/api/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_initial_sync_is_full_reset(self):
+        """Test a sync without a token returns every row"""
+        data = self.sync()
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['tools']['updated']), 5)
+        self.assertEqual(len(data['employees']['updated']), 1)
+        self.assertEqual(data['workcenters']['updated'][0]['name'], 'Tool Crib')
+        self.assertNotIn('tools', data['workcenters']['updated'][0])
+
+    def test_delta_after_token(self):
+        """Test only created, updated and deleted rows are returned"""
+        token = self.sync()['token']
+
+        self.tools[0].calibrated = True
+        self.tools[0].save()
+        new_tool = Tool.objects.create(name='Probe', serial_number='SY-NEW')
+        deleted_pk = self.tools[1].pk
+        self.tools[1].delete()
+
+        data = self.sync(since=token)
+        self.assertFalse(data['reset'])
+        self.assertEqual(sorted(t['id'] for t in data['tools']['updated']),
+                         sorted([self.tools[0].pk, new_tool.pk]))
+        self.assertEqual(data['tools']['deleted'], [deleted_pk])
+        self.assertEqual(data['employees'], {'updated': [], 'deleted': []})
+
+    def test_no_changes(self):
+        """Test a steady-state sync returns empty deltas"""
+        token = self.sync()['token']
+        data = self.sync(since=token, models='tools')
+        self.assertEqual(data['tools'], {'updated': [], 'deleted': []})
+        self.assertNotIn('employees', data)
+
+    def test_bulk_writes_are_synced(self):
+        """Test bulk update, bulk assign and bulk delete show up in deltas"""
+        token = self.sync()['token']
+        cell = WorkCenter.objects.create(name='Cell 1')
+        self.client.patch('/api/tools/bulk/', [{'id': self.tools[0].pk, 'calibrated': True}],
+                          content_type='application/json')
+        self.client.post('/api/tools/assign_to_workcenter/',
+                         {'workcenter_id': cell.pk, 'filter': {'serial_numbers': ['SY-2']}},
+                         content_type='application/json')
+        self.client.delete(f'/api/tools/bulk/?ids={self.tools[3].pk}')
+
+        data = self.sync(since=token, models='tools')
+        self.assertEqual(sorted(t['id'] for t in data['tools']['updated']),
+                         [self.tools[0].pk, self.tools[2].pk])
+        self.assertEqual(data['tools']['deleted'], [self.tools[3].pk])
+
+    def test_workcenter_rename_resends_its_tools(self):
+        """Test tools embedding a renamed workcenter are resent"""
+        token = self.sync()['token']
+        self.crib.name = 'Main Crib'
+        self.crib.save()
+        data = self.sync(since=token)
+        self.assertEqual(len(data['tools']['updated']), 5)
+        self.assertEqual(data['tools']['updated'][0]['location']['name'], 'Main Crib')
+
+    def test_workcenter_edit_keeps_its_tools(self):
+        """Test saving a workcenter without renaming it doesn't resend its tools"""
+        token = self.sync()['token']
+        self.crib.description = 'Second floor'
+        self.crib.save()
+        self.crib.save(update_fields=['description'])
+        self.assertEqual(self.sync(since=token)['tools']['updated'], [])
+
+    @override_settings(SYNC={'PAGE_SIZE': 2})
+    def test_reset_paged(self):
+        """Test a reset arrives in keyset pages that share one token"""
+        data = self.sync()
+        token = data['token']
+        ids = [t['id'] for t in data['tools']['updated']]
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(len(data['employees']['updated']), 1)
+        while data['next']:
+            # Rows written mid-reset come in the next delta instead
+            Tool.objects.filter(pk=self.tools[0].pk).update(calibrated=True, updated_at=timezone.now())
+            data = self.sync(cursor=data['next'])
+            self.assertTrue(data['reset'])
+            self.assertEqual(data['token'], token)
+            self.assertNotIn('employees', data)
+            ids += [t['id'] for t in data['tools']['updated']]
+        self.assertEqual(ids, sorted(t.pk for t in self.tools))
+        self.assertEqual([t['id'] for t in self.sync(since=token)['tools']['updated']], [self.tools[0].pk])
+
+    @override_settings(SYNC={'PAGE_SIZE': 2})
+    def test_delta_paged(self):
+        """Test a delta arrives in (updated_at, id) pages that share one token"""
+        token = self.sync()['token']
+        new_tool = Tool.objects.create(name='Probe', serial_number='SY-NEW')
+        # Rows saved in the same microsecond must not be skipped
+        Tool.objects.filter(pk__in=[self.tools[0].pk, self.tools[1].pk, new_tool.pk]).update(
+            updated_at=timezone.now())
+        deleted_pks = [tool.pk for tool in self.tools[2:]]
+        for tool in self.tools[2:]:
+            tool.delete()
+
+        data = self.sync(since=token)
+        issued = data['token']
+        updated, deleted = [], []
+        while True:
+            self.assertFalse(data['reset'])
+            self.assertEqual(data['token'], issued)
+            self.assertLessEqual(len(data['tools']['updated']), 2)
+            updated += [t['id'] for t in data['tools']['updated']]
+            deleted += data['tools']['deleted']
+            if not data['next']:
+                break
+            data = self.sync(cursor=data['next'])
+        self.assertEqual(sorted(updated), sorted([self.tools[0].pk, self.tools[1].pk, new_tool.pk]))
+        self.assertEqual(sorted(deleted), deleted_pks)
+
+    def test_invalid_cursor(self):
+        """Test tampered reset and delta cursors are rejected"""
+        token = encode_token(timezone.now())
+        for cursor in ['nope', encode_cursor(token, {}), encode_cursor(token, {'parts': 1}),
+                       encode_cursor(token, {'tools': 'x'}), encode_cursor('yesterday', {'tools': 1}),
+                       encode_cursor(token, {'tools': {'u': [1]}}, token),
+                       encode_cursor(token, {'tools': {'x': [1, 2]}}, token),
+                       encode_cursor(token, {'tools': {'u': [1, 2]}}, 'yesterday')]:
+            self.assertEqual(self.client.get('/api/sync/', {'cursor': cursor}).status_code, 400)
+
+    def test_expired_token_resets(self):
+        """Test a token older than the tombstone retention forces a reset"""
+        old = encode_token(timezone.now() - datetime.timedelta(days=365))
+        data = self.sync(since=old)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['tools']['updated']), 5)
+
+    def test_invalid_request(self):
+        """Test malformed tokens and unknown models are rejected"""
+        self.assertEqual(self.client.get('/api/sync/', {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sync/', {'models': 'parts'}).status_code, 400)
+
+    def test_purge_tombstones(self):
+        """Test old tombstones are purged"""
+        self.tools[0].delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - datetime.timedelta(days=90))
+        recent_pk = self.tools[1].pk
+        self.tools[1].delete()
+        call_command('purge_tombstones', stdout=StringIO())
+        self.assertEqual(list(Tombstone.objects.values_list('object_id', flat=True)), [recent_pk])
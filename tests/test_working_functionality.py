@@ -10,6 +10,7 @@ from django.apps import apps
 from tools.models import Tool
 from employees.models import Employee
 from workcenters.models import WorkCenter
+from tests import clear_caches
 
 
 class InitializationTestCase(TestCase):
@@ -41,6 +42,7 @@ class ModelTestCase(TestCase):
     
     def setUp(self):
         """Set up test data"""
+        clear_caches()
         self.workcenter = WorkCenter.objects.create(
             name="Test WorkCenter",
             location="Test Location",
@@ -142,6 +144,7 @@ class BasicViewTestCase(TestCase):
     
     def setUp(self):
         """Set up test client"""
+        clear_caches()
         self.client = Client()
     
     def test_root_redirect(self):
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class ToolprogramConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'toolprogram'
+
+    def ready(self):
+        from .profiling import get_option, time_templates
+        from .slow_queries import install
+        connection_created.connect(install)
+        if get_option('TEMPLATES'):
+            time_templates()
@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'toolprogram.settings')
+# Read by settings.py: persistent connections default off under ASGI
+os.environ.setdefault('DJANGO_ASGI', '1')
 
 application = get_asgi_application()
+
+from toolprogram.warmup import warm_up_on_boot  # noqa: E402  (needs settings loaded)
+
+warm_up_on_boot()
@@ -0,0 +1,33 @@
+"""
+Declared query budgets: the most queries a view may run for one GET,
+however many rows the tables hold.
+
+Class-based views set ``query_budget``; viewsets set ``query_budgets``
+keyed by action name; function views use the ``query_budget`` decorator.
+``tests/test_query_budgets.py`` requests every route at two dataset sizes
+and fails when a count exceeds its budget or grows with the data.
+"""
+
+
+def query_budget(limit):
+    """Declare the query budget of a function view"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def get_query_budget(callback, method='get'):
+    """
+    Return the budget declared for a resolved URL ``callback`` when
+    handling ``method``, or None when the view declares none.
+    """
+    view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    if view_class is None:
+        return getattr(callback, 'query_budget', None)
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        # A router route: budgets are per viewset action
+        action = actions.get(method.lower())
+        return getattr(view_class, 'query_budgets', {}).get(action)
+    return getattr(view_class, 'query_budget', None)
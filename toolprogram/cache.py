@@ -0,0 +1,126 @@
+"""
+Response cache for list pages and API collections.
+
+Entries are keyed by cache group, the request URL and the generations of
+the tables the response is built from: the ``sync.models.TableVersion``
+counters that the post_save, post_delete and ``tools_bulk_changed``
+receivers in ``sync.signals`` bump on every write. The counters live in
+the database, so a write handled by one worker moves every worker to new
+keys whatever the cache backend, and reading them is one indexed lookup.
+Stale entries are never read again and simply age out. Only the tables a
+group renders (see ``GROUP_MODELS``) take part, so an employee change
+leaves the tool pages cached. The viewsets reuse the generations their
+ETag was built from, so a cache hit costs that one lookup.
+"""
+import hashlib
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from sync.conditional import table_versions
+
+# Cache groups and the models whose rows appear in them
+GROUP_MODELS = {
+    'tools': ['tools.tool', 'workcenters.workcenter'],
+    'employees': ['employees.employee'],
+    'workcenters': ['workcenters.workcenter', 'tools.tool'],
+}
+
+KEY_PREFIX = 'respcache'
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE', {}).get('ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'RESPONSE_CACHE', {}).get('TIMEOUT', 300)
+
+
+class CacheStats:
+    """Per-process hit/miss counters by cache group"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def record(self, group, outcome):
+        with self._lock:
+            self._counts[group][outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            groups = {group: dict(counts) for group, counts in self._counts.items()}
+        for counts in groups.values():
+            lookups = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else None
+        return groups
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+def group_versions(group):
+    """Return the generations of every table rendered by ``group``"""
+    return table_versions([apps.get_model(label) for label in GROUP_MODELS[group]])
+
+
+def response_key(group, request, versions, variant=''):
+    url = request.build_absolute_uri()
+    fingerprint = repr((url, variant, list(versions.values())))
+    return f'{KEY_PREFIX}:{group}:{hashlib.sha1(fingerprint.encode()).hexdigest()}'
+
+
+class CachedListViewMixin:
+    """Serve a ListView's rendered page from the response cache"""
+    cache_group = None
+
+    def get(self, request, *args, **kwargs):
+        # Pages carrying flash messages are per-visitor; render them fresh
+        if len(get_messages(request)):
+            return super().get(request, *args, **kwargs)
+        cache = get_cache()
+        key = response_key(self.cache_group, request, group_versions(self.cache_group))
+        content = cache.get(key)
+        if content is not None:
+            stats.record(self.cache_group, 'hits')
+            return HttpResponse(content)
+        stats.record(self.cache_group, 'misses')
+        response = super().get(request, *args, **kwargs)
+        response.render()
+        if response.status_code == 200:
+            cache.set(key, response.content, get_timeout())
+        return response
+
+
+class CachedListMixin:
+    """Serve a viewset's serialized list from the response cache"""
+    cache_group = None
+
+    def get_table_versions(self):
+        # ConditionalGetMixin overrides this with the versions behind its ETag
+        return group_versions(self.cache_group)
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = response_key(self.cache_group, request, self.get_table_versions(),
+                           request.accepted_media_type)
+        data = cache.get(key)
+        if data is not None:
+            stats.record(self.cache_group, 'hits')
+            return Response(data)
+        stats.record(self.cache_group, 'misses')
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, get_timeout())
+        return response
@@ -0,0 +1,200 @@
+"""
+Liveness and readiness probes.
+
+``/healthz`` answers from memory: the process is up and serving requests.
+``/readyz`` says whether this worker can do useful work. It reports the
+result of a background thread that checks every database every
+``HEALTH['INTERVAL']`` seconds, so probes never open a connection or wait
+on one however often the load balancer sends them, plus the Pervasive
+pool utilisation and how far this worker's event poller is behind.
+
+Readiness is ``unavailable`` (503) when a database failed its last check
+or the last result is older than ``HEALTH['MAX_AGE']`` (the check itself
+is stuck on an unreachable server), and ``degraded`` (200, still in
+rotation) when a pool is nearly exhausted or events lag.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.http import JsonResponse
+from django.utils import timezone
+
+from db_backends.pervasive.pool import all_pools
+from events.broker import get_poller
+from toolprogram.budgets import query_budget
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKGROUND': True,
+    'INTERVAL': 10.0,
+    'MAX_AGE': 30.0,
+    'POOL_SATURATION': 0.9,
+    'MAX_EVENT_LAG': 30.0,
+}
+
+
+def get_option(name):
+    return getattr(settings, 'HEALTH', {}).get(name, DEFAULTS[name])
+
+
+class HealthState:
+    """The latest background check results, shared by every request thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._databases = {}
+        self._events = None
+        self.checked_at = None
+
+    def reset(self):
+        with self._lock:
+            self._databases = {}
+            self._events = None
+            self.checked_at = None
+
+    def refresh(self):
+        """Check every database and the event poller; runs off the request path"""
+        databases = {alias: check_database(alias) for alias in connections}
+        events = check_events()
+        with self._lock:
+            self._databases = databases
+            self._events = events
+            self.checked_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._databases), self._events, self.checked_at
+
+
+state = HealthState()
+
+
+def check_database(alias):
+    connection = connections[alias]
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+        error = None
+    except Exception as e:
+        error = str(e)
+    duration = (time.perf_counter() - started) * 1000
+    return {'ok': error is None, 'duration_ms': round(duration, 2), 'error': error}
+
+
+def check_events():
+    """How long the oldest event this worker hasn't dispatched has waited"""
+    poller = get_poller()
+    if poller is None:
+        return None  # Local backend: events are dispatched as they're published
+    if not poller.is_alive():
+        return {'alive': False, 'last_id': poller.last_id, 'lag_seconds': None}
+    lag = None
+    if poller.last_id is not None:
+        from events.models import Event
+
+        oldest = (Event.objects.filter(id__gt=poller.last_id).order_by('id')
+                  .values_list('created_at', flat=True).first())
+        lag = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    return {'alive': True, 'last_id': poller.last_id, 'lag_seconds': lag}
+
+
+def check_forever():
+    while get_option('BACKGROUND'):
+        try:
+            state.refresh()
+        except Exception:
+            logger.exception('Health check failed')
+        finally:
+            close_old_connections()
+        time.sleep(get_option('INTERVAL'))
+
+
+_checker_pid = None
+_checker_lock = threading.Lock()
+
+
+def ensure_checker():
+    """Start this process's check thread (again after a fork)"""
+    global _checker_pid
+    if not get_option('BACKGROUND') or _checker_pid == os.getpid():
+        return
+    with _checker_lock:
+        if _checker_pid != os.getpid():
+            thread = threading.Thread(target=check_forever, name='health-check', daemon=True)
+            thread.start()
+            _checker_pid = os.getpid()
+
+
+def pool_stats():
+    pools = {}
+    for (alias, _), pool in all_pools().items():
+        stats = pool.stats()
+        stats['utilisation'] = round(stats['in_use'] / stats['max_size'], 3)
+        pools[alias] = stats
+    return pools
+
+
+def database_status(alias='default'):
+    """The last check of ``alias``: its result and age, or None if not checked yet"""
+    ensure_checker()
+    databases, _, checked_at = state.snapshot()
+    if checked_at is None or alias not in databases:
+        return None
+    return dict(databases[alias], age_seconds=round(time.time() - checked_at, 3))
+
+
+def readiness():
+    """Return (status, report) from the last check and the pools' counters"""
+    ensure_checker()
+    databases, events, checked_at = state.snapshot()
+    pools = pool_stats()
+    report = {
+        'checked_at': (datetime.fromtimestamp(checked_at, dt_timezone.utc).isoformat()
+                       if checked_at else None),
+        'age_seconds': round(time.time() - checked_at, 3) if checked_at else None,
+        'databases': databases,
+        'pools': pools,
+        'events': events,
+        'reasons': [],
+    }
+    reasons = report['reasons']
+    if checked_at is None:
+        reasons.append('Databases not checked yet')
+        return 'starting', report
+    if report['age_seconds'] > get_option('MAX_AGE'):
+        reasons.append(f"Last database check was {report['age_seconds']:.0f}s ago")
+        return 'unavailable', report
+    failed = [alias for alias, result in databases.items() if not result['ok']]
+    if failed:
+        reasons.extend(f"Database {alias}: {databases[alias]['error']}" for alias in failed)
+        return 'unavailable', report
+
+    for alias, stats in pools.items():
+        if stats['utilisation'] >= get_option('POOL_SATURATION'):
+            reasons.append(f"Pool {alias} {stats['in_use']}/{stats['max_size']} in use")
+    if events is not None:
+        if not events['alive']:
+            reasons.append('Event poller stopped')
+        elif events['lag_seconds'] is not None and events['lag_seconds'] > get_option('MAX_EVENT_LAG'):
+            reasons.append(f"Events {events['lag_seconds']:.0f}s behind")
+    return ('degraded' if reasons else 'ok'), report
+
+
+@query_budget(0)
+def liveness_view(request):
+    return JsonResponse({'status': 'ok'})
+
+
+@query_budget(0)
+def readiness_view(request):
+    status, report = readiness()
+    code = 503 if status in ('starting', 'unavailable') else 200
+    return JsonResponse({'status': status, **report}, status=code)
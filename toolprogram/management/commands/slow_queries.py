@@ -0,0 +1,116 @@
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from toolprogram.slow_queries import get_option, normalize
+
+SORT_KEYS = {
+    'total': lambda group: group['total_ms'],
+    'count': lambda group: group['count'],
+    'max': lambda group: group['max_ms'],
+    'mean': lambda group: group['total_ms'] / group['count'],
+}
+
+
+def read_entries(lines, since=None):
+    """Parse slow-query log lines, skipping torn or older ones"""
+    for line in lines:
+        try:
+            entry = json.loads(line)
+            logged = datetime.fromisoformat(entry['time'])
+        except (ValueError, KeyError, TypeError):
+            continue
+        if since is None or logged >= since:
+            yield entry
+
+
+def group_entries(entries):
+    """Aggregate entries by SQL fingerprint, keeping the latest example"""
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'sql': normalize(entry['sql']),
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'callers': Counter(),
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        group['callers'][entry['frames'][0] if entry.get('frames') else 'unknown'] += 1
+        group['latest'] = entry
+    return list(groups.values())
+
+
+class Command(BaseCommand):
+    help = 'Summarise the slow-query log by SQL fingerprint, slowest in total first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Slow-query log (default SLOW_QUERIES["LOG_FILE"])')
+        parser.add_argument('--top', type=int, default=20, help='Fingerprints to show')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total')
+        parser.add_argument('--hours', type=float, help='Only queries logged in the last N hours')
+        parser.add_argument('--plans', action='store_true',
+                            help='Show the latest SQL, parameters, callers and plan of each fingerprint')
+        parser.add_argument('--clear', action='store_true', help='Empty the log after reporting')
+
+    def handle(self, *args, **options):
+        path = options['file'] or get_option('LOG_FILE')
+        if not path:
+            raise CommandError('No slow-query log: set SLOW_QUERIES["LOG_FILE"] or pass --file')
+        since = timezone.now() - timedelta(hours=options['hours']) if options['hours'] else None
+        try:
+            with open(path, encoding='utf-8') as lines:
+                groups = group_entries(read_entries(lines, since))
+        except FileNotFoundError:
+            groups = []
+        except OSError as e:
+            raise CommandError(f"Can't read {path}: {e}")
+
+        if not groups:
+            self.stdout.write(self.style.SUCCESS(f'No slow queries in {path}'))
+        else:
+            self.report(groups, options)
+
+        if options['clear']:
+            open(path, 'w').close()
+            self.stdout.write(f'Cleared {path}')
+
+    def report(self, groups, options):
+        groups.sort(key=SORT_KEYS[options['sort']], reverse=True)
+        total = sum(group['count'] for group in groups)
+        self.stdout.write(f"{total} slow queries, {len(groups)} fingerprints\n")
+        self.stdout.write(
+            f"{'fingerprint':<13} {'count':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}  caller"
+        )
+        for group in groups[:options['top']]:
+            caller, _ = group['callers'].most_common(1)[0]
+            self.stdout.write(
+                f"{group['fingerprint']:<13} {group['count']:>6} {group['total_ms']:>10.0f} "
+                f"{group['total_ms'] / group['count']:>9.1f} {group['max_ms']:>9.1f}  {caller}"
+            )
+            sql = group['sql'] if options['plans'] else group['sql'][:160]
+            self.stdout.write(f"    {sql}")
+            if options['plans']:
+                self.write_details(group)
+
+    def write_details(self, group):
+        latest = group['latest']
+        self.stdout.write(f"    latest: {latest['time']} {latest['duration_ms']:.1f} ms on {latest['alias']}")
+        self.stdout.write(f"    params: {json.dumps(latest.get('params'))}")
+        for caller, count in group['callers'].most_common(3):
+            self.stdout.write(f"    called {count}x from {caller}")
+        for frame in latest.get('frames', [])[1:]:
+            self.stdout.write(f"      via {frame}")
+        plan = latest.get('plan')
+        self.stdout.write('    plan:' if plan else f"    plan: none ({latest['vendor']})")
+        for line in (plan or '').splitlines():
+            self.stdout.write(f"      {line}")
+        self.stdout.write('')
@@ -0,0 +1,380 @@
+"""
+Prometheus metrics at ``/metrics``.
+
+``MetricsMiddleware`` counts requests and times them by resolved URL
+name (``tools:tool_list``, ``tool-assign-to-workcenter``; never the raw
+path, which would create a series per tool id), and records how many
+queries each request ran and how long each took, per database alias.
+The response cache, the serial cache and the Pervasive connection pools
+are read when the endpoint is scraped.
+
+Every worker process counts on its own. With several workers set
+``METRICS['MULTIPROCESS_DIR']`` to a directory they share: each worker
+writes its counts there every ``FLUSH_INTERVAL`` seconds and the worker
+answering the scrape adds them up. Counts of exited workers are kept, so
+counters never go backwards; their gauges are dropped once their file
+goes stale. Empty the directory before the server starts.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from db_backends.pervasive.pool import all_pools
+from tools.serial_cache import get_serial_cache
+
+from .budgets import query_budget
+from .cache import stats as response_cache_stats
+from .profiling import wrap_connections
+
+DEFAULTS = {
+    'MULTIPROCESS_DIR': None,
+    'FLUSH_INTERVAL': 5.0,
+}
+
+PREFIX = 'toolprogram_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+QUERY_DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'Requests handled, by URL name, method and status', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Time to the response headers, by URL name and method', LATENCY_BUCKETS),
+    'db_queries_per_request': (
+        'histogram', 'Queries run by one request, by database alias', QUERY_COUNT_BUCKETS),
+    'db_query_duration_seconds': (
+        'histogram', 'Query execution time, by database alias', QUERY_DURATION_BUCKETS),
+    'response_cache_requests_total': (
+        'counter', 'Response cache lookups, by cache group and outcome', None),
+    'response_cache_hit_ratio': (
+        'gauge', 'Share of response cache lookups that hit, by cache group', None),
+    'serial_cache_requests_total': (
+        'counter', 'Serial lookup cache lookups, by outcome', None),
+    'serial_cache_hit_ratio': (
+        'gauge', 'Share of serial lookup cache lookups that hit', None),
+    'serial_cache_entries': (
+        'gauge', 'Entries held by the serial lookup caches', None),
+    'db_pool_connections': (
+        'gauge', 'Pooled database connections, by alias and state', None),
+    'db_pool_max_connections': (
+        'gauge', 'Pooled connections allowed, by alias', None),
+    'db_pool_utilisation': (
+        'gauge', 'Share of the pool in use, by alias', None),
+    'db_pool_waits_total': (
+        'counter', 'Connection requests that waited for a free connection, by alias', None),
+    'db_pool_timeouts_total': (
+        'counter', 'Connection requests that timed out waiting, by alias', None),
+}
+
+
+def get_option(name):
+    return getattr(settings, 'METRICS', {}).get(name, DEFAULTS[name])
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    """This process's counters and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [count per bucket..., +Inf, sum]
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self.counters[name, label_key(labels)] += amount
+
+    def observe(self, name, labels, values):
+        """Add each of ``values`` to the histogram ``name``"""
+        buckets = METRICS[name][2]
+        with self._lock:
+            histogram = self.histograms.get((name, label_key(labels)))
+            if histogram is None:
+                histogram = self.histograms[name, label_key(labels)] = [0] * (len(buckets) + 1) + [0.0]
+            for value in values:
+                histogram[bisect.bisect_left(buckets, value)] += 1
+                histogram[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, labels, list(values)]
+                               for (name, labels), values in self.histograms.items()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+registry = Registry()
+
+
+def collect():
+    """Counters and gauges read from the caches and pools at scrape time"""
+    counters = []
+    gauges = []
+    for group, counts in response_cache_stats.snapshot().items():
+        for outcome in ('hits', 'misses'):
+            counters.append(['response_cache_requests_total',
+                             label_key({'group': group, 'outcome': outcome}), counts[outcome]])
+
+    serial = get_serial_cache().stats()
+    for outcome in ('hits', 'misses'):
+        counters.append(['serial_cache_requests_total', label_key({'outcome': outcome}), serial[outcome]])
+    gauges.append(['serial_cache_entries', (), serial['size']])
+
+    for (alias, _), pool in all_pools().items():
+        pool_stats = pool.stats()
+        for state in ('in_use', 'idle'):
+            gauges.append(['db_pool_connections', label_key({'alias': alias, 'state': state}),
+                           pool_stats[state]])
+        gauges.append(['db_pool_max_connections', label_key({'alias': alias}), pool_stats['max_size']])
+        for name, key in (('db_pool_waits_total', 'waits'), ('db_pool_timeouts_total', 'timeouts')):
+            counters.append([name, label_key({'alias': alias}), pool_stats[key]])
+    return counters, gauges
+
+
+def process_sample():
+    """Everything this process contributes to a scrape"""
+    sample = registry.snapshot()
+    counters, gauges = collect()
+    sample['counters'].extend(counters)
+    sample['gauges'] = gauges
+    return sample
+
+
+# ----- multi-process aggregation -----
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+
+def flush(directory):
+    """Write this process's sample, replacing the file atomically"""
+    path = Path(directory) / f'{os.getpid()}.json'
+    temporary = path.with_suffix('.tmp')
+    with _flush_lock:
+        temporary.write_text(json.dumps(process_sample()))
+        os.replace(temporary, path)
+
+
+def flush_forever():
+    global _flusher_pid
+    while True:
+        directory = get_option('MULTIPROCESS_DIR')
+        if not directory:
+            # Switched off since (e.g. a settings override ended)
+            with _flusher_lock:
+                _flusher_pid = None
+            return
+        try:
+            flush(directory)
+        except OSError:
+            pass  # Try again next interval
+        time.sleep(get_option('FLUSH_INTERVAL'))
+
+
+def ensure_flusher():
+    """Start this process's flush thread (again after a fork)"""
+    global _flusher_pid
+    directory = get_option('MULTIPROCESS_DIR')
+    if not directory or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid != os.getpid():
+            os.makedirs(directory, exist_ok=True)
+            thread = threading.Thread(target=flush_forever, name='metrics-flush', daemon=True)
+            thread.start()
+            _flusher_pid = os.getpid()
+
+
+def load_samples(directory):
+    """Every worker's sample; gauges only from workers that flushed lately"""
+    stale_before = time.time() - 3 * get_option('FLUSH_INTERVAL')
+    samples = []
+    for path in Path(directory).glob('*.json'):
+        try:
+            sample = json.loads(path.read_text())
+            fresh = path.stat().st_mtime >= stale_before
+        except (OSError, ValueError):
+            continue
+        if not fresh:
+            sample['gauges'] = []
+        samples.append(sample)
+    return samples
+
+
+# ----- exposition -----
+
+def merge(samples):
+    counters = defaultdict(float)
+    gauges = defaultdict(float)
+    histograms = {}
+    for sample in samples:
+        for name, labels, value in sample['counters']:
+            counters[name, tuple(map(tuple, labels))] += value
+        for name, labels, value in sample['gauges']:
+            gauges[name, tuple(map(tuple, labels))] += value
+        for name, labels, values in sample['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(histograms[key], values)]
+            else:
+                histograms[key] = list(values)
+    add_ratios(counters, gauges)
+    return counters, gauges, histograms
+
+
+def add_ratios(counters, gauges):
+    """Hit ratios and pool utilisation, from the totals of every worker"""
+    lookups = defaultdict(lambda: [0.0, 0.0])
+    for (name, labels), value in counters.items():
+        if name in ('response_cache_requests_total', 'serial_cache_requests_total'):
+            ratio = name.replace('requests_total', 'hit_ratio')
+            rest = tuple(label for label in labels if label[0] != 'outcome')
+            missed = dict(labels)['outcome'] == 'misses'
+            lookups[ratio, rest][missed] += value
+    for key, (hits, misses) in lookups.items():
+        if hits + misses:
+            gauges[key] = hits / (hits + misses)
+
+    for (name, labels), value in list(gauges.items()):
+        if name == 'db_pool_max_connections' and value:
+            in_use = gauges.get(('db_pool_connections', tuple(sorted(labels + (('state', 'in_use'),)))), 0)
+            gauges['db_pool_utilisation', labels] = in_use / value
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render(samples):
+    """Prometheus text format for the merged ``samples``"""
+    counters, gauges, histograms = merge(samples)
+    series = defaultdict(list)
+    for store in (counters, gauges):
+        for (name, labels), value in sorted(store.items()):
+            series[name].append(f'{PREFIX}{name}{format_labels(labels)} {format_value(value)}')
+    for (name, labels), values in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(METRICS[name][2] + (float('inf'),), values):
+            cumulative += count
+            series[name].append(f"{PREFIX}{name}_bucket{format_labels(labels, [('le', format_value(bound))])} "
+                                f"{cumulative}")
+        series[name].append(f'{PREFIX}{name}_sum{format_labels(labels)} {format_value(values[-1])}')
+        series[name].append(f'{PREFIX}{name}_count{format_labels(labels)} {cumulative}')
+
+    lines = []
+    for name, (kind, help_text, _) in METRICS.items():
+        lines.append(f'# HELP {PREFIX}{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}{name} {kind}')
+        lines.extend(series.get(name, []))
+    return '\n'.join(lines) + '\n'
+
+
+@query_budget(0)
+def metrics_view(request):
+    directory = get_option('MULTIPROCESS_DIR')
+    if directory:
+        # Fresh numbers for this worker; the others flush on their own
+        os.makedirs(directory, exist_ok=True)
+        flush(directory)
+        samples = load_samples(directory)
+    else:
+        samples = [process_sample()]
+    return HttpResponse(render(samples), content_type=CONTENT_TYPE)
+
+
+# ----- collection -----
+
+class RequestQueries:
+    """Queries run by one request, per database alias"""
+
+    def __init__(self):
+        self.durations = defaultdict(list)
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations[context['connection'].alias].append(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """Count and time every request; goes first in ``MIDDLEWARE``"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        ensure_flusher()
+        started = time.perf_counter()
+        queries = RequestQueries()
+        with wrap_connections(queries.record_query):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def __acall__(self, request):
+        ensure_flusher()
+        started = time.perf_counter()
+        queries = RequestQueries()
+        # Queries of sync views run on the request's sync thread
+        stack = await sync_to_async(wrap_connections)(queries.record_query)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    def record(self, request, response, seconds, queries):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unresolved'
+        registry.inc('http_requests_total', {
+            'view': view, 'method': request.method, 'status': str(response.status_code),
+        })
+        registry.observe('http_request_duration_seconds', {'view': view, 'method': request.method}, [seconds])
+        for alias in connections:
+            durations = queries.durations.get(alias, [])
+            registry.observe('db_queries_per_request', {'alias': alias}, [len(durations)])
+            registry.observe('db_query_duration_seconds', {'alias': alias}, durations)
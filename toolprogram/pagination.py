@@ -0,0 +1,355 @@
+"""
+Pagination shared by the REST API viewsets and the HTML list views.
+
+Page-number pagination needs a COUNT(*) and an OFFSET that grows with the
+page number, so deep pages get slower the further a client scrolls. Keyset
+pagination instead remembers the sort key of the last row it returned and
+asks for rows after it, which an index on the ordering columns answers in
+constant time regardless of depth.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import attrgetter
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Q
+from django.http import Http404
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+Cursor = namedtuple('Cursor', ['reverse', 'position'])
+
+
+def supports_keyset(queryset):
+    """Whether ``queryset`` is ordered on plain field names only"""
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+    return all(isinstance(field, str) for field in ordering)
+
+
+def keyset_ordering(queryset):
+    """
+    Return the queryset's ordering (falling back to ``Meta.ordering``) with
+    the primary key appended as a tiebreaker, so every row has a unique
+    position.
+    """
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+    for field in ordering:
+        if not isinstance(field, str):
+            raise ImproperlyConfigured(
+                'Keyset pagination only supports field-name ordering, got %r.' % (field,)
+            )
+    pk_names = {'pk', queryset.model._meta.pk.attname, queryset.model._meta.pk.name}
+    if not any(field.lstrip('-') in pk_names for field in ordering):
+        # Follow the direction of the last column so an index on
+        # (name, id) or (name DESC, id DESC) can be scanned in one pass.
+        descending = bool(ordering) and ordering[-1].startswith('-')
+        ordering.append('-pk' if descending else 'pk')
+    return ordering
+
+
+def reverse_ordering(ordering):
+    return [field[1:] if field.startswith('-') else '-' + field for field in ordering]
+
+
+def keyset_filter(ordering, position):
+    """
+    Build the filter selecting rows strictly after ``position`` in
+    ``ordering``: ``a > x OR (a = x AND b > y) OR ...``.
+
+    The expansion is ANDed with ``a >= x`` so the database can turn the
+    leading column into an index range scan.
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    lookups = ['lt' if field.startswith('-') else 'gt' for field in ordering]
+
+    after = Q()
+    for index, (field, lookup) in enumerate(zip(fields, lookups)):
+        clause = Q(**{field: value for field, value in zip(fields[:index], position)})
+        clause &= Q(**{'%s__%s' % (field, lookup): position[index]})
+        after |= clause
+    return Q(**{'%s__%se' % (fields[0], lookups[0]): position[0]}) & after
+
+
+def json_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def keyset_position(instance, ordering):
+    """Return the JSON-serialisable sort key of ``instance``."""
+    position = []
+    for field in ordering:
+        name = field.lstrip('-')
+        if isinstance(instance, dict):
+            value = instance[name]
+        else:
+            value = attrgetter(name.replace('__', '.'))(instance)
+        position.append(json_value(value))
+    return position
+
+
+def ordering_field(model, name):
+    """The model field an ordering entry such as ``location__name`` sorts on"""
+    *relations, last = name.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.pk if last == 'pk' else model._meta.get_field(last)
+
+
+def encode_cursor(cursor):
+    position = [json_value(value) for value in cursor.position]
+    payload = json.dumps({'r': int(cursor.reverse), 'p': position}, separators=(',', ':'))
+    return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(encoded, ordering, model):
+    """
+    Decode an opaque cursor, converting its position to the ordering
+    fields' types; raise ValueError if it doesn't fit ``ordering``.
+    """
+    try:
+        payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        cursor = Cursor(reverse=bool(payload.get('r')), position=payload['p'])
+    except (TypeError, KeyError, AttributeError) as e:
+        raise ValueError(str(e))
+    if not isinstance(cursor.position, list) or len(cursor.position) != len(ordering):
+        raise ValueError('Cursor does not match the ordering')
+    position = []
+    for field, value in zip(ordering, cursor.position):
+        # A tampered cursor must not reach the WHERE clause as a 500
+        if value is None or not isinstance(value, (str, int, float, bool)):
+            raise ValueError('Invalid cursor value %r' % (value,))
+        try:
+            position.append(ordering_field(model, field.lstrip('-')).to_python(value))
+        except ValidationError as e:
+            raise ValueError(str(e))
+    return cursor._replace(position=position)
+
+
+def paginate_keyset(queryset, ordering, cursor, page_size):
+    """
+    Fetch one page of ``queryset`` after (or, for a reverse cursor, before)
+    the cursor position. Return ``(rows, has_next, has_previous)`` with the
+    rows always in forward order.
+    """
+    reverse = cursor is not None and cursor.reverse
+    direction = reverse_ordering(ordering) if reverse else ordering
+    queryset = queryset.order_by(*direction)
+    if cursor is not None:
+        queryset = queryset.filter(keyset_filter(direction, cursor.position))
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+        return rows, True, has_more
+    return rows, has_more, cursor is not None
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque-cursor pagination ordered on the model's ``Meta.ordering`` plus
+    the primary key, e.g. ``(name, id)`` for tools and
+    ``(last_name, first_name, id)`` for employees.
+
+    Unlike DRF's ``CursorPagination`` the cursor carries the full sort key,
+    so there is no offset component and ties on ``name`` are handled by the
+    ``id`` tiebreaker.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    pagination_query_param = 'pagination'
+
+    def get_ordering(self, request, queryset, view):
+        return keyset_ordering(queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+
+        self.page, self.has_next, self.has_previous = paginate_keyset(
+            queryset, self.ordering, self.cursor, self.page_size
+        )
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return decode_cursor(encoded, self.ordering, self.model)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        return replace_query_param(self.base_url, self.cursor_query_param, encode_cursor(cursor))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Nothing precedes a reverse cursor any more: restart at the top.
+            url = remove_query_param(self.base_url, self.cursor_query_param)
+            return replace_query_param(url, self.pagination_query_param, 'keyset')
+        return self.encode_cursor(Cursor(reverse=False, position=keyset_position(self.page[-1], self.ordering)))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Past the last row: page backwards from where the cursor was.
+            return self.encode_cursor(Cursor(reverse=True, position=self.cursor.position))
+        return self.encode_cursor(Cursor(reverse=True, position=keyset_position(self.page[0], self.ordering)))
+
+
+class SelectablePagination(PageNumberPagination):
+    """
+    Page-number pagination by default; keyset pagination when the request
+    asks for it with ``?pagination=keyset`` or carries a ``cursor``.
+
+    Existing clients keep receiving ``count``/``next``/``previous`` pages,
+    while clients walking large tables opt in to constant-time deep pages.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    keyset_class = KeysetPagination
+    pagination_query_param = keyset_class.pagination_query_param
+
+    def wants_keyset(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == 'keyset'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.wants_keyset(request):
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.page_size
+            page = self.keyset.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.keyset.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        return parameters + [
+            {
+                'name': self.pagination_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "keyset" for cursor-based pagination.',
+                'schema': {'type': 'string', 'enum': ['keyset']},
+            },
+            {
+                'name': self.keyset_class.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': str(self.keyset_class.cursor_query_description),
+                'schema': {'type': 'string'},
+            },
+        ]
+
+
+class KeysetListViewMixin:
+    """
+    Paginate a ``ListView`` by keyset: ``?cursor=`` continues after the
+    last row of the previous page, so deep pages cost the same as the
+    first and no COUNT(*) is run.
+
+    Querysets ordered on expressions (e.g. search rank) can't be keyset
+    paginated and fall back to Django's ``?page=`` pagination. Either way
+    the context carries ``next_query``/``previous_query``, the query
+    strings of the neighbouring pages (None at either end).
+    """
+    paginate_by = 50
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not supports_keyset(queryset):
+            return super().paginate_queryset(queryset, page_size)
+
+        ordering = keyset_ordering(queryset)
+        cursor = None
+        encoded = self.request.GET.get(self.cursor_query_param)
+        if encoded:
+            try:
+                cursor = decode_cursor(encoded, ordering, queryset.model)
+            except ValueError:
+                raise Http404('Invalid cursor')
+
+        rows, has_next, has_previous = paginate_keyset(queryset, ordering, cursor, page_size)
+        self.next_query = self.previous_query = None
+        if has_next:
+            # Nothing precedes an empty reverse page: restart at the top
+            self.next_query = self.cursor_query(
+                Cursor(False, keyset_position(rows[-1], ordering)) if rows else None
+            )
+        if has_previous:
+            position = keyset_position(rows[0], ordering) if rows else cursor.position
+            self.previous_query = self.cursor_query(Cursor(True, position))
+        return (None, None, rows, has_next or has_previous)
+
+    def cursor_query(self, cursor):
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        if cursor is None:
+            params.pop(self.cursor_query_param, None)
+        else:
+            params[self.cursor_query_param] = encode_cursor(cursor)
+        return params.urlencode()
+
+    def page_query(self, number):
+        params = self.request.GET.copy()
+        params[self.page_kwarg] = number
+        return params.urlencode()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None:
+            context['next_query'] = self.page_query(page.next_page_number()) if page.has_next() else None
+            context['previous_query'] = (
+                self.page_query(page.previous_page_number()) if page.has_previous() else None
+            )
+        else:
+            context['next_query'] = getattr(self, 'next_query', None)
+            context['previous_query'] = getattr(self, 'previous_query', None)
+        return context
@@ -0,0 +1,229 @@
+"""
+Per-request profiling: where a slow request spent its time.
+
+``ProfilingMiddleware`` splits each profiled request into database time
+(every query, timed through ``connection.execute_wrapper``), serializer
+time, template rendering and the remainder, and reports them in a
+``Server-Timing`` header, which browser dev tools show under the
+request's timing tab, and in one JSON log line on the
+``toolprogram.profiling`` logger.
+
+Serializers are timed by ``ProfiledSerializerMixin``; ones without it
+count as "app" time. Django has no production hook around template
+rendering (``template_rendered`` is only sent under the test runner),
+so ``ToolprogramConfig.ready()`` wraps ``Template.render`` once at
+startup unless ``PROFILING['TEMPLATES']`` is off, in which case
+rendering counts as "app" time. The wrapper times a render only when
+the context it runs in belongs to a profiled request; every other
+render, on any thread, just reads a context variable and calls through.
+
+Queries run lazily while serializing or rendering count as database
+time only, so the parts add up to the total. The body of a streaming
+response is produced after the middleware returns and isn't covered.
+
+Every request is profiled when ``PROFILING['ENABLED']`` is set; otherwise
+staff users opt in per request with ``?_profile=1`` or ``X-Profile: 1``.
+"""
+import functools
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'TEMPLATES': True,
+    'QUERY_PARAM': '_profile',
+    'HEADER': 'X-Profile',
+}
+
+# The profile of the request being handled, if it is being profiled
+current = ContextVar('request_profile', default=None)
+
+
+def get_option(name):
+    return getattr(settings, 'PROFILING', {}).get(name, DEFAULTS[name])
+
+
+def wrap_connections(hook):
+    """
+    Install ``hook`` as an execute wrapper on every database connection of
+    this thread until the returned stack is closed
+    """
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(hook))
+    return stack
+
+
+class RequestProfile:
+    """Timings gathered while handling one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.spans = {'serializer': 0.0, 'template': 0.0}
+        self.active = None
+        self.total = None
+
+    def record_query(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook timing every query"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+    def wrap_connections(self):
+        """Time queries on every database until the returned stack closes"""
+        return wrap_connections(self.record_query)
+
+    @contextmanager
+    def span(self, name):
+        if self.active is not None:
+            # Nested (an {% include %}, a nested serializer): the
+            # outermost span already covers it
+            yield
+            return
+        self.active = name
+        db_before = self.db
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] += time.perf_counter() - started - (self.db - db_before)
+            self.active = None
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def timings(self):
+        """(name, milliseconds, description) for each part and the total"""
+        app = self.total - self.db - sum(self.spans.values())
+        return [
+            ('db', self.db * 1000, f'{self.queries} queries'),
+            ('serializer', self.spans['serializer'] * 1000, 'DRF serializers'),
+            ('template', self.spans['template'] * 1000, 'Template rendering'),
+            ('app', max(app, 0.0) * 1000, 'Everything else'),
+            ('total', self.total * 1000, None),
+        ]
+
+    def server_timing(self):
+        parts = []
+        for name, ms, description in self.timings():
+            part = f'{name};dur={ms:.1f}'
+            if description:
+                part += f';desc="{description}"'
+            parts.append(part)
+        return ', '.join(parts)
+
+
+def profiled(name):
+    """Decorate a method so calls made while profiling count towards ``name``"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            profile = current.get()
+            if profile is None:
+                return method(*args, **kwargs)
+            with profile.span(name):
+                return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfiledSerializerMixin:
+    """Count the serializer's output towards the profile's serializer time"""
+
+    @profiled('serializer')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
+
+
+_templates_timed = False
+
+
+def time_templates():
+    """
+    Wrap ``Template.render`` to time profiled renders. Called once from
+    ``ToolprogramConfig.ready()``, before any request is served.
+    """
+    global _templates_timed
+    if not _templates_timed:
+        Template.render = profiled('template')(Template.render)
+        _templates_timed = True
+
+
+class ProfilingMiddleware:
+    """Add ``Server-Timing`` to profiled requests and log their breakdown"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def requested(self, request):
+        """Whether the request asks to be profiled"""
+        return (request.GET.get(get_option('QUERY_PARAM')) == '1'
+                or request.headers.get(get_option('HEADER')) == '1')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not get_option('ENABLED') and not (self.requested(request) and request.user.is_staff):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = current.set(profile)
+        try:
+            with profile.wrap_connections():
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.report(request, response, profile)
+
+    async def __acall__(self, request):
+        if not get_option('ENABLED'):
+            if not self.requested(request) or not (await request.auser()).is_staff:
+                return await self.get_response(request)
+
+        profile = RequestProfile()
+        token = current.set(profile)
+        # Sync views and their queries run on the request's sync thread,
+        # so the query wrapper is installed on that thread's connections
+        stack = await sync_to_async(profile.wrap_connections)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            current.reset(token)
+        return self.report(request, response, profile)
+
+    def report(self, request, response, profile):
+        profile.finish()
+        response['Server-Timing'] = profile.server_timing()
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': profile.queries,
+        }
+        for name, ms, _ in profile.timings():
+            record[f'{name}_ms'] = round(ms, 2)
+        logger.info(json.dumps(record), extra={'profile': record})
+        return response
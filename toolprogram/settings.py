@@ -42,15 +42,22 @@ INSTALLED_APPS = [
     'tools',
     'employees',
     'workcenters',
+    'sync',
+    'events',
     'rest_framework',  # Add Django REST Framework
+    'toolprogram',
 ]
 
 MIDDLEWARE = [
+    # First, so request latency covers every other middleware
+    'toolprogram.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # After authentication: staff users may opt in per request
+    'toolprogram.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -74,6 +81,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'toolprogram.wsgi.application'
 
+# Check each database and fill Pervasive pools up to min_size when a
+# worker loads wsgi.py/asgi.py, not on its first request (with gunicorn
+# --preload, pools are filled in each worker right after it forks)
+DB_WARM_UP = config('DB_WARM_UP', default=True, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -81,19 +93,41 @@ WSGI_APPLICATION = 'toolprogram.wsgi.application'
 # Environment-based database configuration
 DATABASE_ENV = config('DATABASE_ENV', default='local')  # 'local', 'production'
 
+# Connection persistence (seconds a connection is kept between requests;
+# 0 closes it after every request). The Pervasive pool already reuses ODBC
+# sessions across requests, so it defaults to 0 there: a persistent
+# connection would pin a pooled session to one thread. The SQLite
+# databases default to 0 under ASGI too (asgi.py sets DJANGO_ASGI): sync
+# code runs on executor threads there, and a connection left open on one
+# is never closed or reused reliably, which is why Django says to turn
+# persistent connections off in async mode. CONN_HEALTH_CHECKS pings a
+# reused connection before the request that first uses it.
+# `manage.py bench_connections` shows what reuse saves on this server.
+ASGI = config('DJANGO_ASGI', default=False, cast=bool)
 if DATABASE_ENV == 'production':
     DATABASES = {
         'default': {
-            'ENGINE': 'mssql',
+            'ENGINE': 'db_backends.pervasive',
             'NAME': config('NDUSTROS_DB', default='NdustrOS'),
             'HOST': config('NDUSTROS_SERVER', default='PLATSRVR'),
             'PORT': config('NDUSTROS_PORT', default='1583'),
             'USER': config('NDUSTROS_USER', default=''),
             'PASSWORD': config('NDUSTROS_PASS', default=''),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
             'OPTIONS': {
                 'driver': config('NDUSTROS_DRIVER', default='Pervasive ODBC Interface'),
                 'dsn': '',
-                'extra_params': f"ServerName={config('NDUSTROS_SERVER', default='PLATSRVR')};Port={config('NDUSTROS_PORT', default='1583')};DBQ={config('NDUSTROS_DB', default='NdustrOS')}"
+                'extra_params': f"ServerName={config('NDUSTROS_SERVER', default='PLATSRVR')};Port={config('NDUSTROS_PORT', default='1583')};DBQ={config('NDUSTROS_DB', default='NdustrOS')}",
+                # Per-worker pool of ODBC sessions shared across requests
+                'pool': {
+                    'max_size': config('NDUSTROS_POOL_SIZE', default=5, cast=int),
+                    'min_size': config('NDUSTROS_POOL_MIN_SIZE', default=0, cast=int),
+                    'timeout': config('NDUSTROS_POOL_TIMEOUT', default=30.0, cast=float),
+                    'max_idle': config('NDUSTROS_POOL_MAX_IDLE', default=600.0, cast=float),
+                    'max_lifetime': config('NDUSTROS_POOL_MAX_LIFETIME', default=3600.0, cast=float),
+                    'health_check_interval': config('NDUSTROS_POOL_HEALTH_CHECK_INTERVAL', default=30.0, cast=float),
+                },
             },
         }
     }
@@ -102,9 +136,69 @@ else:  # local/sqlite (default)
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0 if ASGI else 600, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
         }
     }
 
+# The /api/events/ database fan-out (EVENTS['BACKEND'] = 'database') has
+# its own SQLite file on every environment, so the workers' poller threads
+# never query Pervasive (events.routers.EventsRouter). WAL lets every
+# worker read while one writes. Create it with
+# `python manage.py migrate --database events`.
+DATABASES['events'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': config('EVENTS_DB_PATH', default=str(BASE_DIR / 'events.sqlite3')),
+    'CONN_MAX_AGE': config('EVENTS_DB_CONN_MAX_AGE', default=0 if ASGI else 600, cast=int),
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'init_command': 'PRAGMA journal_mode=WAL;',
+    },
+}
+DATABASE_ROUTERS = ['events.routers.EventsRouter']
+
+
+# Cache: 'locmem' (per process, default), 'file' or 'database'. The
+# database backend needs `python manage.py createcachetable` once.
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'toolprogram'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache',
+             config('CACHE_LOCATION', default=str(BASE_DIR / '.cache'))),
+    'database': ('django.core.cache.backends.db.DatabaseCache',
+                 config('CACHE_LOCATION', default='django_cache')),
+}
+# Rendered tool cards ({% cache %} in tool_list.html); keys carry the
+# tool's updated_at, so entries never go stale and only need evicting.
+FRAGMENT_CACHE_BACKEND = config('FRAGMENT_CACHE_BACKEND', default=CACHE_BACKEND)
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=86400, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': CACHE_BACKENDS[CACHE_BACKEND][1],
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    },
+    'template_fragments': {
+        'BACKEND': CACHE_BACKENDS[FRAGMENT_CACHE_BACKEND][0],
+        'LOCATION': (CACHE_BACKENDS[FRAGMENT_CACHE_BACKEND][1] + '-fragments'
+                     if FRAGMENT_CACHE_BACKEND != 'database'
+                     else CACHE_BACKENDS[FRAGMENT_CACHE_BACKEND][1]),
+        'TIMEOUT': FRAGMENT_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': config('FRAGMENT_CACHE_MAX_ENTRIES', default=50000, cast=int),
+        },
+    },
+}
+
+# Cached list pages and API collections (see toolprogram/cache.py)
+RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -158,6 +252,88 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Page numbers by default; ?pagination=keyset for constant-time deep pages
+    'DEFAULT_PAGINATION_CLASS': 'toolprogram.pagination.SelectablePagination',
     'PAGE_SIZE': 20
 }
+
+# Per-process LRU cache behind /api/tools/by-serial/<serial>/
+TOOL_SERIAL_CACHE = {
+    'MAX_SIZE': config('TOOL_SERIAL_CACHE_SIZE', default=4096, cast=int),
+    'TTL': config('TOOL_SERIAL_CACHE_TTL', default=300.0, cast=float),
+}
+
+# /api/events/ fan-out: 'local' for a single worker process, 'database'
+# to share events between workers through the events_event table in the
+# 'events' SQLite database
+EVENTS = {
+    'BACKEND': config('EVENTS_BACKEND', default='local'),
+    'POLL_INTERVAL': config('EVENTS_POLL_INTERVAL', default=0.5, cast=float),
+    'HEARTBEAT': config('EVENTS_HEARTBEAT', default=15.0, cast=float),
+}
+
+# /api/sync/ deletion records; older since tokens get a full reset, sent
+# PAGE_SIZE rows per collection at a time
+SYNC = {
+    'TOMBSTONE_RETENTION_DAYS': config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int),
+    'PAGE_SIZE': config('SYNC_PAGE_SIZE', default=1000, cast=int),
+}
+
+# Server-Timing and a JSON log line per request (toolprogram/profiling.py):
+# for every request when enabled, otherwise for staff users who pass
+# ?_profile=1 or an X-Profile: 1 header. TEMPLATES wraps Template.render
+# once at startup to time rendering; off, it counts as app time.
+PROFILING = {
+    'ENABLED': config('PROFILING_ENABLED', default=False, cast=bool),
+    'TEMPLATES': config('PROFILING_TEMPLATES', default=True, cast=bool),
+    'QUERY_PARAM': '_profile',
+    'HEADER': 'X-Profile',
+}
+
+# Prometheus /metrics (toolprogram/metrics.py). With several worker
+# processes, point METRICS_MULTIPROCESS_DIR at a directory they all share
+# and empty it before the server starts.
+METRICS = {
+    'MULTIPROCESS_DIR': config('METRICS_MULTIPROCESS_DIR', default='') or None,
+    'FLUSH_INTERVAL': config('METRICS_FLUSH_INTERVAL', default=5.0, cast=float),
+}
+
+# Queries slower than THRESHOLD_MS are appended to LOG_FILE with their
+# parameters, calling code and plan (toolprogram/slow_queries.py);
+# `manage.py slow_queries` summarises the file. 0 turns the log off.
+SLOW_QUERIES = {
+    'THRESHOLD_MS': config('SLOW_QUERY_THRESHOLD_MS', default=500.0, cast=float),
+    'LOG_FILE': config('SLOW_QUERY_LOG', default=str(BASE_DIR / 'slow_queries.log')),
+    'EXPLAIN': config('SLOW_QUERY_EXPLAIN', default=True, cast=bool),
+}
+
+# /readyz and /api/db-status/ report a database check that a background
+# thread repeats every INTERVAL seconds (toolprogram/health.py), so load
+# balancer probes never open a connection themselves.
+HEALTH = {
+    'BACKGROUND': True,
+    'INTERVAL': config('HEALTH_CHECK_INTERVAL', default=10.0, cast=float),
+    'MAX_AGE': config('HEALTH_CHECK_MAX_AGE', default=30.0, cast=float),
+    'POOL_SATURATION': config('HEALTH_POOL_SATURATION', default=0.9, cast=float),
+    'MAX_EVENT_LAG': config('HEALTH_MAX_EVENT_LAG', default=30.0, cast=float),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'toolprogram.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'toolprogram.slow_queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
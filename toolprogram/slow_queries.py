@@ -0,0 +1,180 @@
+"""
+Slow-query log.
+
+Every database connection runs its queries through ``log_slow_query``
+(installed by ``connection_created``, so management commands and
+background threads are covered as well as requests). A query taking
+longer than ``SLOW_QUERIES['THRESHOLD_MS']`` is appended to
+``SLOW_QUERIES['LOG_FILE']`` as one JSON line holding its SQL, parameters,
+duration, the project code that ran it and the database's plan, and is
+logged as a warning on the ``toolprogram.slow_queries`` logger.
+``manage.py slow_queries`` groups the file by SQL fingerprint.
+
+Plans come from the backend's ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on
+SQLite). The Pervasive backend has none (its plans are written on the
+server by ``SET QRYPLAN``), so its entries carry no plan.
+"""
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'THRESHOLD_MS': 0,  # 0 turns the log off
+    'LOG_FILE': None,
+    'EXPLAIN': True,
+}
+
+# Project frames recorded per query, innermost first
+STACK_DEPTH = 4
+# Longest parameter value kept in the log
+MAX_PARAM_LENGTH = 200
+
+_write_lock = threading.Lock()
+_this_file = Path(__file__).resolve()
+
+
+def get_option(name):
+    return getattr(settings, 'SLOW_QUERIES', {}).get(name, DEFAULTS[name])
+
+
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDERS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """SQL with literals and parameters as ``?`` and IN lists collapsed"""
+    sql = STRING.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDERS.sub('(...)', sql)
+    return SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize(sql).encode()).hexdigest()[:12]
+
+
+def loggable(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + '…'
+
+
+def loggable_params(params, many):
+    if params is None:
+        return None
+    if many:
+        # executemany: the first row stands for the rest
+        params = next(iter(params), None)
+        if params is None:
+            return None
+    if isinstance(params, dict):
+        return {key: loggable(value) for key, value in params.items()}
+    return [loggable(value) for value in params]
+
+
+def project_frames():
+    """Innermost frames of project code (views, serializers, commands)"""
+    root = str(settings.BASE_DIR)
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < STACK_DEPTH:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(root) and 'site-packages' not in filename
+                and Path(filename).resolve() != _this_file):
+            relative = filename[len(root):].lstrip('/\\')
+            frames.append(f'{relative}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return frames
+
+
+def format_plan(connection, rows):
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail): indent each step under its parent
+        depth = {0: -1}
+        lines = []
+        for step, parent, _, detail in rows:
+            depth[step] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[step] + detail)
+        return '\n'.join(lines)
+    return '\n'.join(' '.join(str(column) for column in row) for row in rows)
+
+
+def explain(connection, sql, params, many):
+    """The plan of a read query, or None when there is no plan to get"""
+    if many or not get_option('EXPLAIN') or not connection.features.supports_explaining_query_execution:
+        return None
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None  # Some databases run the statement they EXPLAIN
+    # A separate backend cursor: the caller still has to read the
+    # results of the query being explained, and this one isn't logged
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        return format_plan(connection, cursor.fetchall())
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        cursor.close()
+
+
+def write_entry(entry):
+    path = get_option('LOG_FILE')
+    if not path:
+        return
+    line = json.dumps(entry, default=str) + '\n'
+    with _write_lock:
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError:
+            logger.exception('Could not write the slow-query log %s', path)
+
+
+def log_slow_query(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook logging queries over the threshold"""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        threshold = get_option('THRESHOLD_MS')
+        if threshold and duration >= threshold:
+            connection = context['connection']
+            entry = {
+                'time': timezone.now().isoformat(),
+                'alias': connection.alias,
+                'vendor': connection.vendor,
+                'duration_ms': round(duration, 2),
+                'fingerprint': fingerprint(sql),
+                'sql': sql,
+                'params': loggable_params(params, many),
+                'many': many,
+                'frames': project_frames(),
+                'plan': explain(connection, sql, params, many),
+            }
+            write_entry(entry)
+            logger.warning('Slow query (%.0f ms) %s at %s', duration, entry['fingerprint'],
+                           entry['frames'][0] if entry['frames'] else 'unknown')
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver adding the hook to every connection"""
+    # First, not last: a connection opened mid-request already carries the
+    # request's wrappers (metrics, profiling), and ``execute_wrapper()``
+    # pops the last entry when it exits
+    if log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_query)
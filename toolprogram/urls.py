@@ -2,20 +2,38 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 from django.http import JsonResponse
-from django.db import connection
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.routers import DefaultRouter
 from tools.views import ToolViewSet, landing_page
 from employees.views import EmployeeViewSet
 from workcenters.views import WorkCenterViewSet
+from sync.views import SyncView
+from events.views import event_stream
+from toolprogram.budgets import query_budget
+from toolprogram.cache import stats as response_cache_stats
+from toolprogram.health import database_status, liveness_view, readiness_view
+from toolprogram.metrics import metrics_view
 
+@query_budget(0)
 def db_status_view(request):
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-        return JsonResponse({'status': 'connected', 'message': 'Database connection successful'})
-    except Exception as e:
-        return JsonResponse({'status': 'error', 'message': str(e)}, status=500)
+    # Answered from the background health check, not a query per request
+    result = database_status()
+    if result is None:
+        # Only /readyz keeps a starting worker out of rotation
+        return JsonResponse({'status': 'starting', 'message': 'Database not checked yet'})
+    if result['ok']:
+        return JsonResponse({'status': 'connected', 'message': 'Database connection successful',
+                             'age_seconds': result['age_seconds']})
+    return JsonResponse({'status': 'error', 'message': result['error'],
+                         'age_seconds': result['age_seconds']}, status=500)
+
+@query_budget(0)
+def cache_stats_view(request):
+    return JsonResponse({
+        'backend': settings.CACHES['default']['BACKEND'],
+        'groups': response_cache_stats.snapshot(),
+    })
 
 # Create a main API router
 api_router = DefaultRouter()
@@ -26,7 +44,13 @@ api_router.register(r'workcenters', WorkCenterViewSet)
 urlpatterns = [
     path('', landing_page, name='landing'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+    path('healthz', liveness_view, name='liveness'),
+    path('readyz', readiness_view, name='readiness'),
     path('api/db-status/', db_status_view, name='db-status'),
+    path('api/cache-stats/', cache_stats_view, name='cache-stats'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/events/', event_stream, name='events'),
     path('api/', include(api_router.urls)),
     path('tools/', include('tools.urls', namespace='tools')),
     path('employees/', include('employees.urls', namespace='employees')),
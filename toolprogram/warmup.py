@@ -0,0 +1,88 @@
+"""
+Open database connections when a worker starts.
+
+``wsgi.py`` and ``asgi.py`` call ``warm_up()`` once the application is
+loaded, so a database that can't be reached is logged at boot, and
+Pervasive pools are filled up to their ``min_size`` so the first request
+a worker serves doesn't pay for negotiating an ODBC session.
+
+The Django connections are closed again afterwards: with ``CONN_MAX_AGE``
+they would otherwise stay open in a process that may go on to fork
+workers (gunicorn ``--preload``), each of which would inherit the same
+socket. Pooled sessions can't be inherited either (the pool starts afresh
+in a forked child), so the sessions filled in a preloading parent would
+sit unused there. ``warm_up()`` therefore also registers fork hooks that
+close the parent's idle pooled sessions before each fork and fill the
+new worker's own pools after it.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+_fork_hooks_registered = False
+
+
+def pools():
+    """The connection pool of each database that has one"""
+    found = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            found[alias] = pool
+    return found
+
+
+def close_pools():
+    """Before a fork: the child can't use these sessions and must not inherit them"""
+    for pool in pools().values():
+        pool.close_all()
+
+
+def fill_pools():
+    """After a fork, in the child: fill its own pools as warm-up did"""
+    for alias, pool in pools().items():
+        try:
+            pool.fill()
+        except Exception:
+            logger.exception('Could not fill the connection pool of database %s', alias)
+
+
+def register_fork_hooks():
+    global _fork_hooks_registered
+    if not _fork_hooks_registered and hasattr(os, 'register_at_fork'):
+        os.register_at_fork(before=close_pools, after_in_child=fill_pools)
+        _fork_hooks_registered = True
+
+
+def warm_up(aliases=None):
+    """Connect each database; return {alias: milliseconds, or None on failure}"""
+    timings = {}
+    for alias in aliases or connections:
+        connection = connections[alias]
+        started = time.perf_counter()
+        try:
+            connection.ensure_connection()
+            pool = getattr(connection, 'pool', None)
+            if pool is not None:
+                pool.fill()
+        except Exception:
+            # Not fatal: requests connect as usual and /readyz reports it
+            logger.exception('Could not warm up database %s', alias)
+            timings[alias] = None
+            continue
+        timings[alias] = round((time.perf_counter() - started) * 1000, 2)
+    connections.close_all()
+    logger.info('Database warm-up: %s', timings)
+    register_fork_hooks()
+    return timings
+
+
+def warm_up_on_boot():
+    if getattr(settings, 'DB_WARM_UP', False):
+        warm_up()
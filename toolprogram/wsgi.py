@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'toolprogram.settings')
 
 application = get_wsgi_application()
+
+from toolprogram.warmup import warm_up_on_boot  # noqa: E402  (needs settings loaded)
+
+warm_up_on_boot()
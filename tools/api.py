@@ -1,22 +1,30 @@
 from django.http import JsonResponse
 from django.db import connections
-from django.db.utils import OperationalError
+
+from toolprogram.health import database_status
 
 def check_database_connection(request):
     """
     API endpoint to check database connection status
-    Returns a JSON response with connection status
+    Returns a JSON response with connection status, from the background
+    health check rather than a new connection per request
     """
     db_conn = connections['default']
-    try:
-        # Attempt a simple query to verify connection
-        db_conn.cursor()
+    result = database_status('default')
+    if result is None:
+        # The first background check hasn't finished; not a failure
+        return JsonResponse({
+            'status': 'starting',
+            'message': 'Database not checked yet',
+            'database': db_conn.settings_dict['ENGINE'],
+        })
 
-        # If we get here, connection is successful
+    if result['ok']:
         response_data = {
             'status': 'connected',
             'database': db_conn.settings_dict['ENGINE'],
             'name': db_conn.settings_dict['NAME'],
+            'age_seconds': result['age_seconds'],
         }
 
         # Additional info for non-SQLite databases
@@ -27,10 +35,10 @@ def check_database_connection(request):
             })
 
         return JsonResponse(response_data)
-    except OperationalError as e:
-        # Connection failed
-        return JsonResponse({
-            'status': 'error',
-            'message': str(e),
-            'database': db_conn.settings_dict['ENGINE'],
-        }, status=500)
+
+    # Connection failed
+    return JsonResponse({
+        'status': 'error',
+        'message': result['error'],
+        'database': db_conn.settings_dict['ENGINE'],
+    }, status=500)
@@ -0,0 +1,32 @@
+from django import forms
+from workcenters.models import WorkCenter
+
+CALIBRATION_CHOICES = [
+    ('', 'Any calibration'),
+    ('true', 'Calibrated'),
+    ('false', 'Needs calibration'),
+]
+
+
+class ToolFilterForm(forms.Form):
+    """Query-string filters for the tool list"""
+    location = forms.ModelChoiceField(
+        queryset=WorkCenter.objects.only('id', 'name'),
+        required=False,
+        empty_label='All workcenters',
+    )
+    calibrated = forms.NullBooleanField(
+        required=False,
+        widget=forms.Select(choices=CALIBRATION_CHOICES),
+    )
+
+    def filter(self, queryset):
+        """Apply the valid filters; invalid values are ignored"""
+        self.is_valid()
+        location = self.cleaned_data.get('location')
+        if location is not None:
+            queryset = queryset.filter(location=location)
+        calibrated = self.cleaned_data.get('calibrated')
+        if calibrated is not None:
+            queryset = queryset.filter(calibrated=calibrated)
+        return queryset
@@ -0,0 +1,205 @@
+"""
+Batched CSV import of tools, upserting on ``serial_number``.
+
+Rows are read one at a time and written in batches: each batch is one
+lookup of the serials it already holds plus one upsert, so a large file
+costs a few queries per thousand rows instead of several per row.
+
+A blank or missing cell leaves an existing tool's value alone; new tools
+get the field's default. Only ``name`` and ``serial_number`` are required.
+"""
+import csv
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from workcenters.models import WorkCenter
+
+from .models import Tool
+from .signals import tools_bulk_changed
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns written by each tool; anything else in the file (id, updated_at,
+# location_id from /api/tools/export.csv) is ignored.
+IMPORT_FIELDS = ['name', 'serial_number', 'calibrated', 'last_checked_in', 'description', 'location']
+
+# Header names accepted for the workcenter column
+LOCATION_COLUMNS = ['location_name', 'location', 'workcenter']
+
+# Columns a blank cell leaves unchanged on update, by model attribute
+KEEP_IF_BLANK = {'calibrated': 'calibrated', 'last_checked_in': 'last_checked_in',
+                 'description': 'description', 'location': 'location_id'}
+
+
+# Spreadsheet spellings of booleans, matched case-insensitively
+BOOLEAN_WORDS = {
+    'true': True, 't': True, 'yes': True, 'y': True, '1': True,
+    'false': False, 'f': False, 'no': False, 'n': False, '0': False,
+}
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.rejected = []  # (line number, row, error)
+        self.seconds = 0.0
+
+    @property
+    def imported(self):
+        return self.created + self.updated
+
+    @property
+    def rows_per_second(self):
+        return self.imported / self.seconds if self.seconds else 0.0
+
+
+class ToolImporter:
+    """
+    Validate CSV rows into unsaved ``Tool`` instances and upsert them.
+
+    Workcenters are matched by name from a map loaded once; unknown names
+    reject the row unless ``create_workcenters`` is set. When a serial
+    appears twice in one batch the later row wins.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, create_workcenters=False, dry_run=False):
+        self.batch_size = batch_size
+        self.create_workcenters = create_workcenters
+        self.dry_run = dry_run
+        self.workcenters = {}
+        for pk, name in WorkCenter.objects.order_by('-pk').values_list('pk', 'name'):
+            # Descending so duplicate names resolve to the oldest workcenter
+            self.workcenters[name] = pk
+        self.fields = {name: Tool._meta.get_field(name) for name in IMPORT_FIELDS if name != 'location'}
+
+    def resolve_location(self, name):
+        if not name:
+            return None
+        if name not in self.workcenters:
+            if not self.create_workcenters:
+                raise ValidationError(f'Unknown workcenter "{name}"')
+            if self.dry_run:
+                self.workcenters[name] = None
+            else:
+                self.workcenters[name] = WorkCenter.objects.create(name=name).pk
+        return self.workcenters[name]
+
+    def build_tool(self, row):
+        """
+        Return an unsaved Tool for ``row`` or raise ValidationError. Its
+        ``_blank_fields`` lists the columns left blank in the row.
+        """
+        values = {}
+        blank = set()
+        for name, model_field in self.fields.items():
+            raw = row.get(name)
+            raw = raw.strip() if isinstance(raw, str) else raw
+            if raw in (None, ''):
+                if name in ('name', 'serial_number'):
+                    raise ValidationError(f'{name} is required')
+                blank.add(name)
+                if name == 'calibrated':
+                    raw = False
+                elif name == 'description':
+                    raw = ''
+                else:
+                    raw = None
+            elif name == 'calibrated':
+                raw = BOOLEAN_WORDS.get(raw.lower(), raw)
+            try:
+                value = model_field.clean(raw, None)
+            except ValidationError as e:
+                raise ValidationError(f"{name}: {' '.join(e.messages)}")
+            if name == 'last_checked_in' and value is not None and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            values[name] = value
+        column = next((c for c in LOCATION_COLUMNS if c in row), None)
+        location = (row.get(column) or '').strip() if column else ''
+        if not location:
+            blank.add('location')
+        tool = Tool(location_id=self.resolve_location(location), **values)
+        tool._blank_fields = blank
+        return tool
+
+    def read(self, lines, result):
+        """Yield valid tools from CSV ``lines``, recording rejected rows"""
+        reader = csv.DictReader(lines)
+        for row in reader:
+            if None in row:
+                result.rejected.append((reader.line_num, row, 'Too many columns'))
+                continue
+            try:
+                yield self.build_tool(row)
+            except ValidationError as e:
+                result.rejected.append((reader.line_num, row, ' '.join(e.messages)))
+
+    def run(self, lines):
+        result = ImportResult()
+        started = time.perf_counter()
+        batch = {}
+        for tool in self.read(lines, result):
+            batch[tool.serial_number] = tool
+            if len(batch) >= self.batch_size:
+                self.write_batch(list(batch.values()), result)
+                batch = {}
+        if batch:
+            self.write_batch(list(batch.values()), result)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def write_batch(self, tools, result):
+        serials = [tool.serial_number for tool in tools]
+        current = {
+            row['serial_number']: row for row in
+            Tool.objects.filter(serial_number__in=serials).values('pk', 'serial_number', *KEEP_IF_BLANK.values())
+        }
+        existing = {serial: row['pk'] for serial, row in current.items()}
+        new_serials = [serial for serial in serials if serial not in existing]
+        result.created += len(new_serials)
+        result.updated += len(existing)
+        if self.dry_run:
+            return
+
+        # One upsert writes the same columns for every row, so carry the
+        # current values over for the cells left blank
+        for tool in tools:
+            row = current.get(tool.serial_number)
+            if row is not None:
+                for name in tool._blank_fields:
+                    attname = KEEP_IF_BLANK[name]
+                    setattr(tool, attname, row[attname])
+
+        update_fields = [name for name in IMPORT_FIELDS if name != 'serial_number'] + ['updated_at']
+        with transaction.atomic():
+            if connection.features.supports_update_conflicts_with_target:
+                Tool.objects.bulk_create(
+                    tools,
+                    update_conflicts=True,
+                    unique_fields=['serial_number'],
+                    update_fields=update_fields,
+                )
+            else:
+                # No INSERT ... ON CONFLICT (e.g. Pervasive): update the
+                # serials found above and insert the rest.
+                now = timezone.now()
+                updates = []
+                inserts = []
+                for tool in tools:
+                    tool.updated_at = now
+                    if tool.serial_number in existing:
+                        tool.pk = existing[tool.serial_number]
+                        updates.append(tool)
+                    else:
+                        inserts.append(tool)
+                Tool.objects.bulk_update(updates, update_fields, batch_size=self.batch_size)
+                Tool.objects.bulk_create(inserts, batch_size=self.batch_size)
+
+            if existing:
+                tools_bulk_changed.send(sender=Tool, action='update', ids=sorted(existing.values()))
+            if new_serials:
+                created = Tool.objects.filter(serial_number__in=new_serials).values_list('pk', flat=True)
+                tools_bulk_changed.send(sender=Tool, action='create', ids=sorted(created))
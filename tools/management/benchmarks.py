@@ -0,0 +1,11 @@
+"""
+Helpers shared by the bench_* management commands
+"""
+import math
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list"""
+    # Rounded first so 0.07 * 100 = 7.000000000000001 stays rank 7
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
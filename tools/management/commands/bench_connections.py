@@ -0,0 +1,112 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import load_backend
+
+from tools.management.benchmarks import percentile
+
+
+def fresh_connection(alias, pooled):
+    """A new wrapper for ``alias``; unpooled ones open a real connection each time"""
+    settings_dict = dict(connections.settings[alias])
+    if not pooled and 'pool' in settings_dict.get('OPTIONS', {}):
+        settings_dict['OPTIONS'] = dict(settings_dict['OPTIONS'], pool=False)
+    backend = load_backend(settings_dict['ENGINE'])
+    return backend.DatabaseWrapper(settings_dict, alias)
+
+
+def run_query(connection, sql):
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        cursor.fetchall()
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure what a request pays for its database connection: a new connection per request, '
+        'a pooled session (Pervasive) or a persistent connection (CONN_MAX_AGE), with and '
+        'without CONN_HEALTH_CHECKS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias')
+        parser.add_argument('--iterations', type=int, default=50, help='Simulated requests per strategy')
+        parser.add_argument('--sql', default='SELECT 1', help='The query each request runs')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections:
+            raise CommandError(f"Unknown database '{alias}'")
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        configured = connections[alias].settings_dict
+        self.stdout.write(
+            f"{alias} ({configured['ENGINE']}): CONN_MAX_AGE={configured['CONN_MAX_AGE']}, "
+            f"CONN_HEALTH_CHECKS={configured['CONN_HEALTH_CHECKS']}\n"
+        )
+        # "connect" is the connect for a new connection, the ping for a health-checked one
+        self.stdout.write(f"  {'strategy':<28} {'connect p50':>12} {'p95':>8} {'query p50':>10} "
+                          f"{'p95':>8} {'per request':>12}  (ms)")
+
+        results = {'new connection': self.measure_connect(alias, options, pooled=False)}
+        if getattr(fresh_connection(alias, pooled=True), 'pool', None) is not None:
+            results['pooled session'] = self.measure_connect(alias, options, pooled=True)
+        results['persistent'] = self.measure_persistent(alias, options, health_checks=False)
+        results['persistent + health check'] = self.measure_persistent(alias, options, health_checks=True)
+
+        for strategy, result in results.items():
+            self.stdout.write(
+                f"  {strategy:<28} {result['connect_p50_ms']:12.3f} {result['connect_p95_ms']:8.3f} "
+                f"{result['query_p50_ms']:10.3f} {result['query_p95_ms']:8.3f} {result['request_ms']:12.3f}"
+            )
+        baseline = results['new connection']['request_ms']
+        reused = results['persistent + health check']['request_ms']
+        if baseline:
+            self.stdout.write(
+                f"\nReusing connections saves {baseline - reused:.3f} ms per request "
+                f"({(baseline - reused) / baseline:.0%})"
+            )
+
+    def summarise(self, connects, queries):
+        connects, queries = sorted(connects), sorted(queries)
+        return {
+            'connect_p50_ms': percentile(connects, 0.5),
+            'connect_p95_ms': percentile(connects, 0.95),
+            'query_p50_ms': percentile(queries, 0.5),
+            'query_p95_ms': percentile(queries, 0.95),
+            'request_ms': statistics.mean(connects) + statistics.mean(queries),
+        }
+
+    def measure_connect(self, alias, options, pooled):
+        """Connect, query and close once per request, as with CONN_MAX_AGE=0"""
+        connects, queries = [], []
+        for _ in range(options['iterations']):
+            connection = fresh_connection(alias, pooled)
+            try:
+                connects.append(timed(connection.ensure_connection))
+                queries.append(timed(run_query, connection, options['sql']))
+            finally:
+                connection.close()
+        return self.summarise(connects, queries)
+
+    def measure_persistent(self, alias, options, health_checks):
+        """Reuse one connection; the health check pings it once per request"""
+        connection = fresh_connection(alias, pooled=True)
+        connects, queries = [], []
+        try:
+            connection.ensure_connection()
+            for _ in range(options['iterations']):
+                # What CONN_HEALTH_CHECKS runs on a reused connection
+                connects.append(timed(connection.is_usable) if health_checks else 0.0)
+                queries.append(timed(run_query, connection, options['sql']))
+        finally:
+            connection.close()
+        return self.summarise(connects, queries)
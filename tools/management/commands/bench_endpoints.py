@@ -0,0 +1,307 @@
+import json
+import platform
+import random
+import time
+import tracemalloc
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.utils import timezone
+
+from employees.models import Employee
+from sync.views import encode_token
+from tools.management.benchmarks import percentile
+from tools.models import Tool
+from toolprogram.health import state as health_state
+from workcenters.models import WorkCenter
+
+DEFAULT_SIZES = '10000,100000,1000000'
+DEFAULT_BASELINE = settings.BASE_DIR / 'benchmarks' / 'baseline.json'
+
+# A route is slower than its baseline when p95 grows by more than the
+# tolerance and by more than this many milliseconds (sub-millisecond
+# routes jitter by more than 25% between runs).
+NOISE_MS = 2.0
+
+# Issued by the transaction a writing route is rolled back in, which also
+# turns the view's own atomic() blocks into savepoints; not counted as the
+# route's queries
+ROLLBACK_STATEMENTS = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK')
+
+
+class Route:
+    """
+    One benchmarked request; ``path`` and ``body`` may be callables of the
+    dataset ids. Requests that write run in a transaction that is rolled
+    back, so every iteration, and every route after them, sees the same
+    rows.
+    """
+
+    def __init__(self, label, path, method='GET', body=None, status=200, iterations=None):
+        self.label = label
+        self.path = path
+        self.method = method
+        self.body = body
+        self.status = status
+        self.iterations = iterations  # Cap for slow routes such as full exports
+
+    @property
+    def writes(self):
+        return self.method != 'GET'
+
+    def request(self, ids, i):
+        path = self.path(ids, i) if callable(self.path) else self.path
+        body = self.body(ids, i) if callable(self.body) else self.body
+        return path, body
+
+
+def routes():
+    """Every route in toolprogram/urls.py except the admin and the endless /api/events/ stream"""
+    return [
+        Route('landing page', '/'),
+        Route('liveness', '/healthz'),
+        Route('readiness', '/readyz'),
+        Route('db status', '/api/db-status/'),
+        Route('cache stats', '/api/cache-stats/'),
+        Route('tool list', '/api/tools/'),
+        Route('tool list, deep page', lambda ids, i: f"/api/tools/?page={ids['last_page']}"),
+        Route('tool list, keyset', '/api/tools/?pagination=keyset'),
+        Route('tool list, sparse fields', '/api/tools/?fields=id,name,serial_number'),
+        Route('tool detail', lambda ids, i: f"/api/tools/{ids['tool'](i)}/"),
+        Route('tool by serial', lambda ids, i: f"/api/tools/by-serial/{ids['serial'](i)}/"),
+        Route('tool search', '/api/tools/search/?q=mitutoyo+micrometer'),
+        Route('tool create', '/api/tools/', 'POST', status=201, body=lambda ids, i: {
+            'name': 'Benchmark Caliper', 'serial_number': f"BENCH-{ids['run']}-{i}",
+            'location': ids['workcenter'](i),
+        }),
+        Route('tool assign', lambda ids, i: f"/api/tools/{ids['tool'](i)}/assign_to_workcenter/", 'POST',
+              body=lambda ids, i: {'workcenter_id': ids['workcenter'](i)}),
+        Route('tools bulk assign', '/api/tools/assign_to_workcenter/', 'POST',
+              body=lambda ids, i: {'workcenter_id': ids['workcenter'](i),
+                                   'tool_ids': [ids['tool'](i * 100 + n) for n in range(100)]}),
+        Route('tool export csv', '/api/tools/export.csv', iterations=3),
+        Route('employee list', '/api/employees/'),
+        Route('employee detail', lambda ids, i: f"/api/employees/{ids['employee'](i)}/"),
+        Route('workcenter list', '/api/workcenters/'),
+        Route('workcenter detail', lambda ids, i: f"/api/workcenters/{ids['workcenter'](i)}/"),
+        Route('sync, reset page', '/api/sync/'),
+        Route('sync, delta', lambda ids, i: f"/api/sync/?since={ids['sync_token']}"),
+        Route('tools page', '/tools/'),
+        Route('tools page, filtered',
+              lambda ids, i: f"/tools/?location={ids['workcenter'](i)}&calibrated=false"),
+        Route('tools page, search', '/tools/?q=mitutoyo'),
+        Route('tool detail page', lambda ids, i: f"/tools/{ids['tool'](i)}/"),
+        Route('employees page', '/employees/'),
+        Route('workcenters page', '/workcenters/'),
+        Route('workcenter detail page', lambda ids, i: f"/workcenters/{ids['workcenter'](i)}/"),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed test databases of increasing size and measure latency percentiles, query '
+        'counts and peak memory for every route, optionally against a stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma-separated tool counts')
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per route')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per route')
+        parser.add_argument('--routes', help='Only routes whose label contains one of these comma-separated words')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='bench-results.json', help='Write results to this JSON file')
+        parser.add_argument('--baseline', nargs='?', const=str(DEFAULT_BASELINE),
+                            help=f'Compare with a results file (default {DEFAULT_BASELINE})')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed p95 growth over the baseline before flagging a regression')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Keep the response and fragment caches on (measures cache hits)')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers')
+        if options['iterations'] < 2:
+            raise CommandError('--iterations must be at least 2')
+        selected = routes()
+        if options['routes']:
+            words = [word.strip().lower() for word in options['routes'].split(',')]
+            selected = [route for route in selected if any(word in route.label for word in words)]
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Can't read baseline {options['baseline']}: {e}")
+
+        results = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'database': connection.vendor,
+                'iterations': options['iterations'],
+                'cache': options['with_cache'],
+            },
+            'sizes': {},
+        }
+
+        caches = None if options['with_cache'] else {
+            alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'} for alias in settings.CACHES
+        }
+        setup_test_environment()
+        # Benchmark in a throwaway database, like manage.py test
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'], serialize=False,
+        )
+        try:
+            with override_settings(CACHES=caches) if caches else override_settings():
+                for size in sizes:
+                    results['sizes'][str(size)] = self.run_size(size, selected, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(f"Wrote {options['output']}")
+
+        if baseline is not None:
+            regressions = self.compare(results, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def seed(self, size, options):
+        started = time.perf_counter()
+        call_command(
+            'generate_dataset', tools=size, employees=max(10, size // 50),
+            workcenters=max(10, size // 2000), seed=options['seed'], clear=True, stdout=StringIO(),
+        )
+        return time.perf_counter() - started
+
+    def dataset_ids(self, options):
+        rng = random.Random(options['seed'])
+        tool_count = Tool.objects.count()
+        employees = Employee.objects.count()
+        workcenters = WorkCenter.objects.count()
+        # Request i always hits the same rows, so runs are comparable
+        picks = [rng.randint(1, tool_count) for _ in range(4096)]
+        return {
+            'run': int(time.time()),
+            'sync_token': encode_token(timezone.now()),
+            'last_page': max(1, tool_count // settings.REST_FRAMEWORK['PAGE_SIZE']),
+            'tool': lambda i: picks[i % len(picks)],
+            'serial': lambda i: Tool.objects.values_list('serial_number', flat=True).get(pk=picks[i % len(picks)]),
+            'employee': lambda i: 1 + (i * 7919) % employees,
+            'workcenter': lambda i: 1 + (i * 104729) % workcenters,
+        }
+
+    def run_size(self, size, selected, options):
+        self.stdout.write(f"\n{size:,} tools")
+        seconds = self.seed(size, options)
+        self.stdout.write(f"  seeded in {seconds:.1f}s")
+        ids = self.dataset_ids(options)
+        # Health routes report the last background check; have one to report
+        health_state.refresh()
+        client = Client()
+        self.stdout.write(f"  {'route':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KiB':>9}")
+        measured = {}
+        for route in selected:
+            measured[route.label] = result = self.measure(client, route, ids, options)
+            self.stdout.write(
+                f"  {route.label:<28} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+                f"{result['p99_ms']:9.2f} {result['queries']:8d} {result['peak_kib']:9.0f}"
+                + (f"  unexpected status {result['status']}" if result['status'] != route.status else '')
+            )
+        return measured
+
+    def send(self, client, method, path, body):
+        if method == 'GET':
+            response = client.get(path)
+        else:
+            response = client.generic(method, path, json.dumps(body), content_type='application/json')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def send_route(self, client, route, path, body):
+        """Send one request; undo whatever a writing route changed"""
+        if not route.writes:
+            return self.send(client, route.method, path, body)
+        with transaction.atomic():
+            response = self.send(client, route.method, path, body)
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, client, route, ids, options):
+        iterations = options['iterations']
+        warmup = options['warmup']
+        if route.iterations:
+            iterations = min(iterations, route.iterations)
+            warmup = min(warmup, 1)
+        timings = []
+        query_counts = []
+        status = None
+        for i in range(warmup + iterations):
+            # Resolve ids first so lookups like the serial aren't timed
+            path, body = route.request(ids, i)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                status = self.send_route(client, route, path, body).status_code
+                elapsed = time.perf_counter() - started
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+                query_counts.append(sum(
+                    1 for query in queries.captured_queries if not query['sql'].startswith(ROLLBACK_STATEMENTS)
+                ))
+
+        # Memory in a separate request: tracing slows everything it watches
+        path, body = route.request(ids, warmup + iterations)
+        tracemalloc.start()
+        try:
+            self.send_route(client, route, path, body)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'status': status,
+            'iterations': iterations,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': max(query_counts),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def compare(self, results, baseline, tolerance):
+        regressions = []
+        for size, routes_measured in results['sizes'].items():
+            for label, result in routes_measured.items():
+                before = baseline.get('sizes', {}).get(size, {}).get(label)
+                if before is None:
+                    continue
+                problems = []
+                growth = result['p95_ms'] - before['p95_ms']
+                if growth > NOISE_MS and result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                    problems.append(f"p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+                if result['queries'] > before['queries']:
+                    problems.append(f"queries {before['queries']} -> {result['queries']}")
+                if problems:
+                    regressions.append((size, label, problems))
+                    self.stdout.write(self.style.ERROR(f"  REGRESSION {label} @ {int(size):,}: {'; '.join(problems)}"))
+        return regressions
@@ -0,0 +1,81 @@
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from tools.models import Tool
+from workcenters.models import WorkCenter
+
+NO_FRAGMENT_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'},
+    'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Time rendering tools/tool_list.html with and without per-tool fragment caching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tools', type=int, default=20000, help='Number of tool cards to render')
+        parser.add_argument('--repeat', type=int, default=3, help='Renders per measurement (best is reported)')
+
+    def build_tools(self, count):
+        # Unsaved instances with ids: rendering needs no database rows
+        workcenters = [WorkCenter(pk=i, name=f'Workcenter {i}') for i in range(1, 21)]
+        now = timezone.now()
+        tools = []
+        for i in range(1, count + 1):
+            tool = Tool(pk=i, name=f'Tool {i}', serial_number=f'SN-{i:07d}', calibrated=bool(i % 3),
+                        last_checked_in=now, updated_at=now, location=workcenters[i % 20])
+            # ToolsListView annotates this preview instead of loading description
+            tool.description_preview = 'Carbide insert holder for finishing passes on hardened steel'
+            tools.append(tool)
+        return tools
+
+    def render(self, tools, request):
+        context = {'object_list': tools, 'tools': tools, 'q': '',
+                   'fragment_cache_timeout': 3600}
+        started = time.perf_counter()
+        render_to_string('tools/tool_list.html', context, request=request)
+        return time.perf_counter() - started
+
+    def best(self, tools, request, repeat, before=None):
+        timings = []
+        for _ in range(repeat):
+            if before:
+                before()
+            timings.append(self.render(tools, request))
+        return min(timings)
+
+    def handle(self, *args, **options):
+        tools = self.build_tools(options['tools'])
+        request = RequestFactory().get('/tools/')
+        repeat = options['repeat']
+        fragments = caches['template_fragments']
+
+        with override_settings(CACHES=NO_FRAGMENT_CACHE):
+            uncached = self.best(tools, request, repeat)
+
+        cold = self.best(tools, request, repeat, before=fragments.clear)
+        self.render(tools, request)
+        warm = self.best(tools, request, repeat)
+
+        # One card changes: only it re-renders
+        changed = tools[len(tools) // 2]
+        def touch():
+            changed.updated_at = timezone.now()
+        one_changed = self.best(tools, request, repeat, before=touch)
+
+        self.stdout.write(f"Rendering {len(tools)} tool cards (best of {repeat}):")
+        rows = [
+            ('no fragment cache', uncached),
+            ('fragment cache, cold', cold),
+            ('fragment cache, warm', warm),
+            ('fragment cache, 1 card changed', one_changed),
+        ]
+        for label, seconds in rows:
+            self.stdout.write(f"  {label:<32} {seconds * 1000:10.1f} ms  {uncached / seconds:6.1f}x")
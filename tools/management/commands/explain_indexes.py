@@ -0,0 +1,80 @@
+import datetime
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from employees.models import Employee
+from tools.models import Tool
+from workcenters.models import WorkCenter
+
+
+# Plan lines that mean a table is read without an index
+FULL_SCAN = re.compile(r'\bSCAN (\w+)$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+def hot_queries():
+    """
+    The queries the scanners, API and list pages run most often, as
+    (label, queryset, is_page). Lookups must seek an index; pages must
+    also read rows in index order instead of sorting the table.
+    """
+    since = timezone.now() - datetime.timedelta(days=7)
+    return [
+        ('tool by serial', Tool.objects.filter(serial_number='SN-0001'), False),
+        ('uncalibrated tools at workcenter',
+         Tool.objects.filter(location_id=1, calibrated=False), False),
+        ('recently checked in tools',
+         Tool.objects.filter(last_checked_in__gte=since).order_by('-last_checked_in')[:20], True),
+        ('tool list page', Tool.objects.order_by('name', 'id')[:20], True),
+        ('tool keyset page', Tool.objects.filter(name__gte='M').order_by('name', 'id')[:20], True),
+        ('employee by employee_id', Employee.objects.filter(employee_id='E100'), False),
+        ('employee by employee_number', Employee.objects.filter(employee_number='100'), False),
+        ('employee by email', Employee.objects.filter(email='someone@example.com'), False),
+        ('employee list page', Employee.objects.order_by('last_name', 'first_name', 'id')[:20], True),
+        ('workcenter by name', WorkCenter.objects.filter(name='Tool Crib'), False),
+        ('workcenter list page', WorkCenter.objects.order_by('name', 'id')[:20], True),
+    ]
+
+
+def plan_problems(plan, is_page=False):
+    """Return the reasons a query plan does not use an index"""
+    problems = []
+    for line in plan.splitlines():
+        match = FULL_SCAN.search(line.strip())
+        if match:
+            problems.append(f"full scan of {match.group(1)}")
+        if is_page and TEMP_SORT in line:
+            problems.append("sort without an index")
+    return problems
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN QUERY PLAN on the hot lookups and fail if any of them scans a table'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                f"explain_indexes reads SQLite query plans; the {connection.vendor} "
+                "backend is not supported"
+            )
+
+        failed = []
+        for label, queryset, is_page in hot_queries():
+            plan = queryset.explain()
+            problems = plan_problems(plan, is_page)
+            if problems:
+                failed.append(label)
+                self.stdout.write(self.style.ERROR(f"✗ {label}: {', '.join(problems)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✓ {label}"))
+            if options['verbosity'] > 1:
+                self.stdout.write(f"    {queryset.query}")
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if failed:
+            raise CommandError(f"{len(failed)} queries do not use an index: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index"))
@@ -0,0 +1,239 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from employees.models import Employee
+from sync.models import TableVersion, Tombstone
+from toolprogram.cache import get_cache
+from tools.models import Tool
+from tools.signals import tools_bulk_changed
+from workcenters.models import WorkCenter
+
+# Rows built and inserted per bulk_create; also the unit of work handed
+# to each worker process.
+DEFAULT_BATCH_SIZE = 5000
+
+FIRST_NAMES = [
+    'James', 'Maria', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David', 'Patricia', 'Carlos',
+    'Susan', 'Daniel', 'Jessica', 'Thomas', 'Sarah', 'Kevin', 'Karen', 'Brian', 'Nancy', 'Wei',
+    'Lisa', 'Anthony', 'Betty', 'Mark', 'Sandra', 'Luis', 'Ashley', 'Steven', 'Emily', 'Raj',
+    'Michelle', 'Andrew', 'Amanda', 'Joshua', 'Melissa', 'Hiroshi', 'Deborah', 'Ryan', 'Laura',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+    'Martinez', 'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson',
+    'Martin', 'Lee', 'Thompson', 'White', 'Harris', 'Clark', 'Lewis', 'Robinson', 'Walker', 'Chen',
+    'Young', 'Allen', 'King', 'Wright', 'Scott', 'Nguyen', 'Hill', 'Patel', 'Adams', 'Baker',
+]
+DEPARTMENTS = [
+    'CNC Machining', 'Assembly', 'Quality Control', 'Welding', 'Tool Crib', 'Maintenance',
+    'Grinding', 'Heat Treatment', 'Inspection', 'Shipping', 'Engineering', 'Management',
+]
+WORKCENTER_KINDS = [
+    ('CNC Machining', 'Computer numerical control machining for precision parts'),
+    ('Assembly Line', 'Product integration and final assembly'),
+    ('Quality Control', 'Quality assurance testing and inspection'),
+    ('Welding Shop', 'Welding and fabrication of metal components'),
+    ('Tool Crib', 'Central tool storage and distribution'),
+    ('Maintenance', 'Equipment maintenance and repair'),
+    ('Grinding Station', 'Surface and cylindrical grinding'),
+    ('Heat Treatment', 'Hardening, tempering and annealing'),
+    ('Manual Lathe', 'Manual turning of short-run parts'),
+    ('Milling Cell', 'Manual and CNC milling operations'),
+]
+TOOL_TYPES = [
+    'Micrometer', 'Caliper', 'Dial Indicator', 'Height Gauge', 'Go/No-Go Gauge', 'Thread Gauge',
+    'Pin Gauge', 'Ring Gauge', 'Torque Wrench', 'Pressure Gauge', 'Temperature Sensor',
+    'CMM Probe', 'Surface Roughness Tester', 'Hardness Tester', 'Flow Meter', 'Load Cell',
+    'Digital Scale', 'Oscilloscope', 'Multimeter', 'End Mill Set', 'Drill Bit Set', 'Impact Wrench',
+]
+MANUFACTURERS = ['Mitutoyo', 'Starrett', 'Brown & Sharpe', 'Mahr', 'Tesa', 'Fowler', 'Fluke', 'Insize']
+
+
+def row_rng(seed, kind, pk):
+    # Each row is seeded on its own id, so the data is the same whatever
+    # the batch size or number of workers.
+    return random.Random(f'{seed}:{kind}:{pk}')
+
+
+def build_workcenters(seed, start, stop, now):
+    rows = []
+    for pk in range(start, stop):
+        rng = row_rng(seed, 'workcenters', pk)
+        kind, description = WORKCENTER_KINDS[pk % len(WORKCENTER_KINDS)]
+        rows.append(WorkCenter(
+            pk=pk,
+            name=f'{kind} {pk:03d}',
+            location=f'Building {chr(65 + rng.randrange(8))} - Floor {rng.randint(1, 3)}',
+            supervisor=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            description=description,
+            updated_at=now,
+        ))
+    return rows
+
+
+def build_employees(seed, start, stop, now):
+    rows = []
+    for pk in range(start, stop):
+        rng = row_rng(seed, 'employees', pk)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        number = f'E{pk:06d}'
+        rows.append(Employee(
+            pk=pk,
+            name=f'{first} {last}',
+            first_name=first,
+            last_name=last,
+            employee_id=number,
+            employee_number=number,
+            department=rng.choice(DEPARTMENTS),
+            email=f'{first.lower()}.{last.lower()}.{pk}@company.com',
+            updated_at=now,
+        ))
+    return rows
+
+
+def build_tools(seed, start, stop, now, workcenter_count):
+    rows = []
+    for pk in range(start, stop):
+        rng = row_rng(seed, 'tools', pk)
+        manufacturer, tool_type = rng.choice(MANUFACTURERS), rng.choice(TOOL_TYPES)
+        model = f"{manufacturer[:3].upper()}-{rng.randint(100, 999)}{rng.choice('ABCXM')}"
+        # Most tools sit at a workcenter; most were checked in recently
+        location_id = rng.randint(1, workcenter_count) if workcenter_count and rng.random() < 0.8 else None
+        last_checked_in = None
+        if rng.random() < 0.7:
+            last_checked_in = now - timedelta(hours=rng.expovariate(1 / 72))
+        rows.append(Tool(
+            pk=pk,
+            name=f'{manufacturer} {tool_type}',
+            serial_number=f'{manufacturer[:3].upper()}-{pk:08d}',
+            calibrated=rng.random() < 0.85,
+            last_checked_in=last_checked_in,
+            description=f'{manufacturer} {tool_type} Model: {model}',
+            location_id=location_id,
+            updated_at=now,
+        ))
+    return rows
+
+
+BUILDERS = {
+    'workcenters': (WorkCenter, build_workcenters),
+    'employees': (Employee, build_employees),
+    'tools': (Tool, build_tools),
+}
+
+
+def write_partition(kind, seed, start, stop, now, *extra):
+    """Build and insert rows ``start``..``stop - 1``; return the row count"""
+    model, build = BUILDERS[kind]
+    rows = build(seed, start, stop, now, *extra)
+    with transaction.atomic():
+        model.objects.bulk_create(rows, batch_size=len(rows))
+    return len(rows)
+
+
+def init_worker():
+    # Forked workers must not share the parent's connection; spawned ones
+    # (Windows) need the app registry loaded.
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic synthetic dataset of workcenters, employees and tools'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tools', type=int, default=1000)
+        parser.add_argument('--employees', type=int, default=100)
+        parser.add_argument('--workcenters', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42, help='Same seed, same data')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Rows per bulk_create and per worker task')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes inserting partitions in parallel (not with SQLite)')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete existing tools, employees and workcenters first')
+
+    def handle(self, *args, **options):
+        for name in ('tools', 'employees', 'workcenters'):
+            if options[name] < 0:
+                raise CommandError(f'--{name} must not be negative')
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be at least 1')
+
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite allows one writer at a time; extra processes only wait
+            self.stderr.write('SQLite takes one writer at a time; using 1 worker')
+            workers = 1
+
+        models = [Tool, Employee, WorkCenter]
+        if options['clear']:
+            self.clear(models)
+        elif any(model.objects.exists() for model in models):
+            raise CommandError('Tables already hold data; pass --clear to replace it')
+
+        now = timezone.now()
+        started = time.perf_counter()
+        self.generate('workcenters', options['workcenters'], options, workers, now)
+        self.generate('employees', options['employees'], options, workers, now)
+        self.generate('tools', options['tools'], options, workers, now, options['workcenters'])
+        self.reset_sequences(models)
+
+        # bulk_create sends no signals: drop cached tool lookups and move
+        # the ETag versions (the signal moves the tools table's)
+        tools_bulk_changed.send(sender=Tool, action='create', ids=None)
+        TableVersion.bump(Employee, WorkCenter)
+
+        total = options['tools'] + options['employees'] + options['workcenters']
+        seconds = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {total:,} rows in {seconds:.1f}s ({total / seconds if seconds else 0:,.0f} rows/s)"
+        ))
+
+    def clear(self, models):
+        # Raw DELETEs: Model.delete() would load every row to send
+        # post_delete and write a sync tombstone for each. One reset
+        # marker stands in for the tombstones, so /api/sync/ clients
+        # replace their copies.
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model in models:
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+            Tombstone.mark_reset()
+            tools_bulk_changed.send(sender=Tool, action='delete', ids=None)
+            TableVersion.bump(Employee, WorkCenter)
+        # Responses are keyed on table versions, so none would match the
+        # new rows, but there is no reason to keep them around
+        get_cache().clear()
+
+    def generate(self, kind, count, options, workers, now, *extra):
+        if not count:
+            return
+        started = time.perf_counter()
+        batch = options['batch_size']
+        tasks = [(kind, options['seed'], start, min(start + batch, count + 1), now, *extra)
+                 for start in range(1, count + 1, batch)]
+        if workers == 1:
+            for task in tasks:
+                write_partition(*task)
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                for future in [pool.submit(write_partition, *task) for task in tasks]:
+                    future.result()
+        seconds = time.perf_counter() - started
+        self.stdout.write(f"  {kind:<12} {count:>10,} rows in {seconds:6.1f}s")
+
+    def reset_sequences(self, models):
+        # Rows were inserted with explicit ids; move sequences past them
+        statements = connection.ops.sequence_reset_sql(self.style, models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
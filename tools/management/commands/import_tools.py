@@ -0,0 +1,65 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tools.importer import DEFAULT_BATCH_SIZE, ToolImporter
+
+# Rejected rows echoed to the console; --rejects writes them all
+SHOW_REJECTED = 20
+
+
+class Command(BaseCommand):
+    help = 'Import tools from a CSV file, creating new serial numbers and updating existing ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV file with a header row, or - for stdin')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Rows written per upsert')
+        parser.add_argument('--create-workcenters', action='store_true',
+                            help='Create workcenters named in the file instead of rejecting the row')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate and count without writing')
+        parser.add_argument('--rejects', help='Write rejected rows, with an "error" column, to this CSV file')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        importer = ToolImporter(
+            batch_size=options['batch_size'],
+            create_workcenters=options['create_workcenters'],
+            dry_run=options['dry_run'],
+        )
+        if options['file'] == '-':
+            result = importer.run(sys.stdin)
+        else:
+            try:
+                # utf-8-sig drops the byte order mark Excel writes
+                with open(options['file'], newline='', encoding='utf-8-sig') as lines:
+                    result = importer.run(lines)
+            except OSError as e:
+                raise CommandError(f"Can't read {options['file']}: {e}")
+
+        for line, row, error in result.rejected[:SHOW_REJECTED]:
+            self.stderr.write(f"Line {line}: {error}")
+        if len(result.rejected) > SHOW_REJECTED:
+            self.stderr.write(f"... and {len(result.rejected) - SHOW_REJECTED} more rejected rows")
+        if options['rejects'] and result.rejected:
+            self.write_rejects(options['rejects'], result.rejected)
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.imported} tools ({result.created} new, {result.updated} updated) "
+            f"in {result.seconds:.2f}s, {result.rows_per_second:,.0f} rows/s; "
+            f"rejected {len(result.rejected)}"
+        ))
+
+    def write_rejects(self, path, rejected):
+        columns = ['line', 'error']
+        for _, row, _ in rejected:
+            columns.extend(name for name in row if name is not None and name not in columns)
+        with open(path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.DictWriter(out, columns, extrasaction='ignore')
+            writer.writeheader()
+            for line, row, error in rejected:
+                writer.writerow({**row, 'line': line, 'error': error})
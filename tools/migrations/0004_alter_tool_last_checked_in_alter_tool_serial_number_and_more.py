@@ -0,0 +1,57 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Duplicate serials listed in the error before it is cut short
+SHOWN_DUPLICATES = 20
+
+
+def check_serial_numbers_unique(apps, schema_editor):
+    # Tables loaded from the ERP can repeat a serial; adding the unique
+    # constraint would then fail with a bare IntegrityError, so name them.
+    Tool = apps.get_model('tools', 'Tool')
+    duplicates = list(
+        Tool.objects.using(schema_editor.connection.alias)
+        .values('serial_number').annotate(count=Count('id')).filter(count__gt=1)
+        .order_by('serial_number').values_list('serial_number', 'count')
+    )
+    if duplicates:
+        shown = ', '.join(f'{serial!r} x{count}' for serial, count in duplicates[:SHOWN_DUPLICATES])
+        if len(duplicates) > SHOWN_DUPLICATES:
+            shown += f', and {len(duplicates) - SHOWN_DUPLICATES} more'
+        raise RuntimeError(
+            f"Cannot make tools_tool.serial_number unique: {len(duplicates)} serial "
+            f"number(s) are shared by more than one tool ({shown}). Rename or "
+            "delete the duplicates, then run migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0003_alter_tool_options'),
+        ('workcenters', '0004_alter_workcenter_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tool',
+            name='last_checked_in',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(check_serial_numbers_unique, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tool',
+            name='serial_number',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['name', 'id'], name='tools_tool_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['location', 'calibrated'], name='tools_tool_loc_calib_idx'),
+        ),
+    ]
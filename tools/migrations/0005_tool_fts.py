@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# External-content FTS5 index over tools_tool, kept in sync by triggers
+# so bulk_create/update() and raw SQL writes are indexed too.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE tools_tool_fts USING fts5(
+        name, serial_number, description,
+        content='tools_tool', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER tools_tool_fts_insert AFTER INSERT ON tools_tool BEGIN
+        INSERT INTO tools_tool_fts(rowid, name, serial_number, description)
+        VALUES (new.id, new.name, new.serial_number, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tools_tool_fts_delete AFTER DELETE ON tools_tool BEGIN
+        INSERT INTO tools_tool_fts(tools_tool_fts, rowid, name, serial_number, description)
+        VALUES ('delete', old.id, old.name, old.serial_number, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tools_tool_fts_update
+    AFTER UPDATE OF name, serial_number, description ON tools_tool BEGIN
+        INSERT INTO tools_tool_fts(tools_tool_fts, rowid, name, serial_number, description)
+        VALUES ('delete', old.id, old.name, old.serial_number, old.description);
+        INSERT INTO tools_tool_fts(rowid, name, serial_number, description)
+        VALUES (new.id, new.name, new.serial_number, new.description);
+    END
+    """,
+    "INSERT INTO tools_tool_fts(tools_tool_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS tools_tool_fts_update",
+    "DROP TRIGGER IF EXISTS tools_tool_fts_delete",
+    "DROP TRIGGER IF EXISTS tools_tool_fts_insert",
+    "DROP TABLE IF EXISTS tools_tool_fts",
+]
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        # Only SQLite has FTS5; other backends use the LIKE fallback in tools.search
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tools", "0004_alter_tool_last_checked_in_alter_tool_serial_number_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(FTS_SQL), run_sqlite(DROP_SQL)),
+    ]
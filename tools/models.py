@@ -2,14 +2,21 @@ from django.db import models
 
 class Tool(models.Model):
     name = models.CharField(max_length=100)
-    serial_number = models.CharField(max_length=50)
+    serial_number = models.CharField(max_length=50, unique=True)
     calibrated = models.BooleanField(default=False)
-    last_checked_in = models.DateTimeField(null=True, blank=True)
+    last_checked_in = models.DateTimeField(null=True, blank=True, db_index=True)
     description = models.TextField(blank=True, default='')
     location = models.ForeignKey('workcenters.WorkCenter', on_delete=models.CASCADE, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Backs Meta.ordering and keyset pagination on (name, id)
+            models.Index(fields=['name', 'id'], name='tools_tool_name_id_idx'),
+            # "Uncalibrated tools at this workcenter"
+            models.Index(fields=['location', 'calibrated'], name='tools_tool_loc_calib_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.serial_number})"
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Full-text tool search.
+
+On SQLite the ``tools_tool_fts`` FTS5 table (see migration 0005) indexes
+name, serial_number and description and is kept in sync by triggers, so
+bulk writes and raw SQL are covered as well as the ORM. Other backends
+fall back to per-term ``icontains`` filters.
+"""
+from django.db import connection, connections
+from django.db.models import Case, IntegerField, Q, When
+
+FTS_TABLE = 'tools_tool_fts'
+
+# bm25 column weights: name, serial_number, description
+FTS_WEIGHTS = (10.0, 10.0, 1.0)
+
+# Triggers that mirror tools_tool writes into the FTS table. SQLite drops
+# them whenever a migration rebuilds tools_tool, so they are recreated
+# after every migrate by ensure_search_triggers().
+FTS_TRIGGERS = {
+    'tools_tool_fts_insert': """
+        CREATE TRIGGER tools_tool_fts_insert AFTER INSERT ON tools_tool BEGIN
+            INSERT INTO tools_tool_fts(rowid, name, serial_number, description)
+            VALUES (new.id, new.name, new.serial_number, new.description);
+        END
+    """,
+    'tools_tool_fts_delete': """
+        CREATE TRIGGER tools_tool_fts_delete AFTER DELETE ON tools_tool BEGIN
+            INSERT INTO tools_tool_fts(tools_tool_fts, rowid, name, serial_number, description)
+            VALUES ('delete', old.id, old.name, old.serial_number, old.description);
+        END
+    """,
+    'tools_tool_fts_update': """
+        CREATE TRIGGER tools_tool_fts_update
+        AFTER UPDATE OF name, serial_number, description ON tools_tool BEGIN
+            INSERT INTO tools_tool_fts(tools_tool_fts, rowid, name, serial_number, description)
+            VALUES ('delete', old.id, old.name, old.serial_number, old.description);
+            INSERT INTO tools_tool_fts(rowid, name, serial_number, description)
+            VALUES (new.id, new.name, new.serial_number, new.description);
+        END
+    """,
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def ensure_search_triggers(using='default', **kwargs):
+    """
+    post_migrate receiver that recreates missing FTS triggers and, if any
+    were missing, rebuilds the index from tools_tool.
+    """
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            [FTS_TABLE, *FTS_TRIGGERS],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing:
+            return  # Migration 0005 hasn't run yet
+        missing = [name for name in FTS_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name])
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def search_terms(query):
+    """Split a search box string into terms, dropping punctuation-only ones"""
+    return [term for term in query.split() if any(c.isalnum() for c in term)]
+
+
+def fts_match_expression(terms):
+    """
+    Build an FTS5 MATCH expression that ANDs the terms, each quoted so
+    user input can't inject query syntax and each prefix-matched so a
+    partial serial like ``PD-20`` finds ``PD-2024-001``.
+    """
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+def ranked_tool_ids(query, limit=DEFAULT_LIMIT, queryset=None):
+    """
+    Return the ids of the best matching tools, best first. With a filtered
+    ``queryset`` the ranking runs inside it, so the top ``limit`` are the
+    best matches that pass its filters rather than the best overall.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if queryset is None:
+        from .models import Tool
+        queryset = Tool.objects.all()
+    if connection.vendor != 'sqlite':
+        filters = Q()
+        for term in terms:
+            filters &= (Q(name__icontains=term) | Q(serial_number__icontains=term)
+                        | Q(description__icontains=term))
+        return list(queryset.filter(filters).order_by().values_list('id', flat=True)[:limit])
+
+    restrict, restrict_params = '', []
+    if queryset.query.has_filters():
+        subquery, restrict_params = queryset.order_by().values_list('pk').query.sql_with_params()
+        restrict = f"AND rowid IN ({subquery}) "
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s {restrict}"
+            f"ORDER BY bm25({FTS_TABLE}, %s, %s, %s) LIMIT %s",
+            [fts_match_expression(terms), *restrict_params, *FTS_WEIGHTS, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_tools(queryset, query, limit=DEFAULT_LIMIT):
+    """Restrict ``queryset`` to the tools matching ``query``, in rank order"""
+    ids = ranked_tool_ids(query, limit, queryset)
+    if not ids:
+        return queryset.none()
+    rank = Case(*[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+                output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(rank)
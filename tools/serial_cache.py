@@ -0,0 +1,121 @@
+"""
+In-process LRU cache of the minimal tool payload returned by
+``/api/tools/by-serial/<serial>/``.
+
+Each worker process keeps its own cache, so a kiosk scanning the same
+serials repeatedly is served without a query. Entries expire after
+``TOOL_SERIAL_CACHE['TTL']`` seconds and are dropped by the receivers in
+``tools.signals`` whenever a tool or workcenter changes.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+DEFAULT_MAX_SIZE = 4096
+DEFAULT_TTL = 300.0
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with a per-entry time to live"""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate):
+        """Drop every entry whose value matches ``predicate``"""
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_serial_cache():
+    """Return this process's serial cache, built from settings on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                options = getattr(settings, 'TOOL_SERIAL_CACHE', {})
+                _cache = LRUCache(
+                    max_size=options.get('MAX_SIZE', DEFAULT_MAX_SIZE),
+                    ttl=options.get('TTL', DEFAULT_TTL),
+                )
+    return _cache
+
+
+def tool_payload(tool):
+    """The minimal representation a scanner needs"""
+    return {
+        'id': tool.id,
+        'name': tool.name,
+        'serial_number': tool.serial_number,
+        'calibrated': tool.calibrated,
+        'location': {'id': tool.location.id, 'name': tool.location.name} if tool.location else None,
+    }
+
+
+def invalidate_tools(ids=None, serials=()):
+    """
+    Drop cached entries for the given tool ids and serials; ``ids=None``
+    means the changed rows are unknown and clears the whole cache.
+    """
+    cache = get_serial_cache()
+    if ids is None:
+        cache.clear()
+        return
+    for serial in serials:
+        cache.discard(serial)
+    ids = set(ids)
+    if ids:
+        cache.discard_where(lambda payload: payload['id'] in ids)
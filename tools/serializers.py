@@ -1,18 +1,173 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from django.db import connection, models, transaction
+from django.utils import timezone
 from .models import Tool
+from .signals import tools_bulk_changed
 from workcenters.models import WorkCenter
 from employees.models import Employee
+from toolprogram.profiling import ProfiledSerializerMixin
+
+# Rows per INSERT/UPDATE statement for bulk writes
+BULK_BATCH_SIZE = 500
+
+class SparseFieldsetMixin:
+    """
+    Limit the serialized fields to ``context['fields']`` when the view
+    passes a sparse fieldset (see ``ToolViewSet.get_requested_fields``).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+class LocationField(serializers.PrimaryKeyRelatedField):
+    """
+    Workcenter reference that resolves ids from the parent's
+    ``workcenter_lookup`` map when a bulk request has preloaded one, so a
+    batch of tools is validated without a query per row.
+    """
+
+    def to_internal_value(self, data):
+        lookup = getattr(self.parent, 'workcenter_lookup', None)
+        if lookup is not None and not isinstance(data, bool):
+            try:
+                return lookup[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass  # Let the queryset lookup produce the usual error
+        return super().to_internal_value(data)
+
+
+class SerialNumberUniqueValidator(UniqueValidator):
+    """
+    Unique serial check that uses the parent's ``serial_lookup`` map
+    (serial -> tool id) when a bulk request has preloaded one, so a batch
+    is checked with one query and duplicates within the batch are caught.
+    """
+
+    def __call__(self, value, serializer_field):
+        lookup = getattr(serializer_field.parent, 'serial_lookup', None)
+        if lookup is None:
+            return super().__call__(value, serializer_field)
+        instance = serializer_field.parent.instance
+        pk = instance.pk if instance is not None else None
+        if value in lookup and (pk is None or lookup[value] != pk):
+            raise serializers.ValidationError(self.message, code='unique')
+        lookup[value] = pk
+
+
+class ToolListSerializer(serializers.ListSerializer):
+    """Validate and write many tools with bulk queries in one transaction"""
+
+    def to_representation(self, data):
+        """
+        Load the workcenters of tools fetched without
+        ``select_related('location')`` in one query, not one per tool
+        """
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        tools = list(iterable)
+        if 'location' in self.child.fields:
+            # Skips tools whose location is already joined
+            models.prefetch_related_objects(tools, 'location')
+        return super().to_representation(tools)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            ids = set()
+            serials = set()
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                value = item.get('location')
+                if value not in (None, '') and not isinstance(value, bool):
+                    try:
+                        ids.add(int(value))
+                    except (TypeError, ValueError):
+                        pass
+                if isinstance(item.get('serial_number'), str):
+                    serials.add(item['serial_number'])
+            self.child.workcenter_lookup = WorkCenter.objects.in_bulk(ids)
+            self.child.serial_lookup = dict(
+                Tool.objects.filter(serial_number__in=serials).values_list('serial_number', 'id')
+            )
+        try:
+            return super().to_internal_value(data)
+        finally:
+            self.child.workcenter_lookup = None
+            self.child.serial_lookup = None
+
+    def run_child_validation(self, data):
+        # For bulk updates self.instance is a list aligned with the input
+        if self.instance is not None:
+            self.child.instance = self.instance[self._validation_index]
+            self.child.initial_data = data
+            self._validation_index += 1
+        return super().run_child_validation(data)
+
+    def run_validation(self, data=serializers.empty):
+        self._validation_index = 0
+        return super().run_validation(data)
+
+    def create(self, validated_data):
+        tools = [Tool(**attrs) for attrs in validated_data]
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                Tool.objects.bulk_create(tools, batch_size=BULK_BATCH_SIZE)
+            else:
+                # Backends that can't report generated ids from a bulk
+                # INSERT (e.g. Pervasive) insert row by row instead.
+                for tool in tools:
+                    tool.save(force_insert=True)
+            tools_bulk_changed.send(sender=Tool, action='create', ids=[tool.pk for tool in tools])
+        return tools
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for tool, attrs in zip(instances, validated_data):
+            for name, value in attrs.items():
+                setattr(tool, name, value)
+            fields.update(attrs)
+        if fields:
+            # bulk_update skips auto_now, so stamp updated_at for /api/sync/
+            now = timezone.now()
+            for tool in instances:
+                tool.updated_at = now
+            fields.add('updated_at')
+            with transaction.atomic():
+                Tool.objects.bulk_update(instances, sorted(fields), batch_size=BULK_BATCH_SIZE)
+                tools_bulk_changed.send(sender=Tool, action='update', ids=[tool.pk for tool in instances])
+        return instances
+
+
+class ToolAssignFilterSerializer(serializers.Serializer):
+    """The ``filter`` of a bulk assign_to_workcenter request"""
+    location = serializers.IntegerField(allow_null=True, required=False)
+    calibrated = serializers.BooleanField(required=False)
+    serial_numbers = serializers.ListField(child=serializers.CharField(), required=False)
+
+
+class ToolSerializer(ProfiledSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    location = LocationField(queryset=WorkCenter.objects.all(), allow_null=True, required=False)
 
-class ToolSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tool
         fields = ['id', 'name', 'serial_number', 'calibrated', 'last_checked_in', 'description', 'location']
+        list_serializer_class = ToolListSerializer
+        extra_kwargs = {
+            'serial_number': {
+                'validators': [SerialNumberUniqueValidator(queryset=Tool.objects.all())],
+            },
+        }
         
     def to_representation(self, instance):
         """Add more detailed representation of related fields"""
         ret = super().to_representation(instance)
         
-        if instance.location:
+        if 'location' in ret and instance.location:
             ret['location'] = {
                 'id': instance.location.id,
                 'name': instance.location.name
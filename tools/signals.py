@@ -0,0 +1,47 @@
+"""
+Tool change signals and the receivers that keep caches in step.
+
+``bulk_create``, ``bulk_update`` and ``QuerySet.update()``/``delete()``
+paths send no per-row ``post_save``, so code that writes tools in bulk
+sends ``tools_bulk_changed`` instead:
+
+    tools_bulk_changed.send(sender=Tool, action='update', ids=[...])
+
+``action`` is 'create', 'update' or 'delete'; ``ids`` is None when the
+affected rows are not known (e.g. a filtered UPDATE).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from workcenters.models import WorkCenter
+
+from .models import Tool
+from .serial_cache import invalidate_tools
+
+tools_bulk_changed = Signal()
+
+
+def invalidate_now_and_on_commit(ids=None, serials=()):
+    # Invalidating again after commit drops any entry another request
+    # cached from the old row while the transaction was still open.
+    invalidate_tools(ids, serials)
+    transaction.on_commit(lambda: invalidate_tools(ids, serials))
+
+
+@receiver(post_save, sender=Tool)
+@receiver(post_delete, sender=Tool)
+def tool_changed(sender, instance, **kwargs):
+    invalidate_now_and_on_commit([instance.pk], [instance.serial_number])
+
+
+@receiver(tools_bulk_changed, sender=Tool)
+def tools_changed_in_bulk(sender, ids=None, **kwargs):
+    invalidate_now_and_on_commit(ids)
+
+
+@receiver(post_save, sender=WorkCenter)
+@receiver(post_delete, sender=WorkCenter)
+def workcenter_changed(sender, instance, **kwargs):
+    # Cached payloads embed the workcenter name
+    invalidate_now_and_on_commit(None)
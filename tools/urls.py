@@ -2,7 +2,7 @@ app_name = "tools"
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ToolViewSet, ToolsListView, ToolDetailView, ToolCreateView, ToolUpdateView, ToolDeleteView
+from .views import ToolViewSet, ToolsListView, ToolCardsView, ToolDetailView, ToolCreateView, ToolUpdateView, ToolDeleteView
 
 # Create a router for API endpoints
 router = DefaultRouter()
@@ -10,6 +10,7 @@ router.register(r'tools', ToolViewSet)
 
 urlpatterns = [
     path('', ToolsListView.as_view(), name='tool_list'),
+    path('cards/', ToolCardsView.as_view(), name='tool_cards'),
     path('tool/add/', ToolCreateView.as_view(), name='tool_add'),
     path('create/', ToolCreateView.as_view(), name='tool_create'),
     path('<int:pk>/', ToolDetailView.as_view(), name='tool_detail'),
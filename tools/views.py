@@ -1,24 +1,346 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from django.db import transaction
 from .models import Tool
-from .serializers import ToolSerializer
+from .serializers import ToolAssignFilterSerializer, ToolSerializer
+from .search import search_tools, DEFAULT_LIMIT, MAX_LIMIT
+from .serial_cache import get_serial_cache, tool_payload
+from .signals import tools_bulk_changed
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.shortcuts import render
+from django.utils import timezone
+from django.conf import settings
+from django.db.models.functions import Substr
+from sync.conditional import ConditionalGetMixin
+from toolprogram.budgets import query_budget
+from toolprogram.cache import CachedListMixin, CachedListViewMixin
+from toolprogram.export import ExportMixin
+from toolprogram.pagination import KeysetListViewMixin
+from .forms import ToolFilterForm
 
 # Landing page view
+@query_budget(0)
 def landing_page(request):
     """Landing page with navigation to all sections"""
     return render(request, 'landing.html')
 
-class ToolViewSet(viewsets.ModelViewSet):
+class ToolViewSet(ConditionalGetMixin, CachedListMixin, ExportMixin, viewsets.ModelViewSet):
     """
     API endpoint for tools
+
+    Reads accept ``?fields=id,name,serial_number`` to return (and SELECT)
+    only the named fields.
     """
-    queryset = Tool.objects.all()
+    queryset = Tool.objects.select_related('location')
     serializer_class = ToolSerializer
     permission_classes = [permissions.AllowAny]
+    cache_group = 'tools'
+    export_name = 'tools'
+    export_fields = ['id', 'name', 'serial_number', 'calibrated', 'last_checked_in',
+                     'location_id', 'location__name', 'description', 'updated_at']
+    # Most queries per GET, whatever the row count (see toolprogram.budgets).
+    # list and retrieve include the ETag version check.
+    query_budgets = {
+        'list': 3,
+        'retrieve': 2,
+        'search': 2,
+        'by_serial': 1,
+        'export': 1,
+    }
+
+    # Model columns needed to render each serializer field
+    field_columns = {
+        'location': ['location__id', 'location__name'],
+    }
+
+    def get_requested_fields(self):
+        """Parse ``?fields=`` on reads; None means every field"""
+        if self.request is None or self.request.method not in permissions.SAFE_METHODS:
+            return None
+        raw = self.request.query_params.get('fields')
+        if not raw:
+            return None
+        fields = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = set(fields) - set(ToolSerializer.Meta.fields)
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"})
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        if fields:
+            if 'location' not in fields:
+                queryset = queryset.select_related(None)
+            columns = []
+            for name in fields:
+                columns.extend(self.field_columns.get(name, [name]))
+            queryset = queryset.only(*columns)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
+
+    # Largest batch accepted by the bulk endpoints
+    bulk_max_items = 5000
+
+    def get_bulk_items(self, request):
+        """Return the request body as a list of items, or an error Response"""
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Expected a list of tools"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {"error": f"At most {self.bulk_max_items} tools per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create many tools in one transaction"""
+        items = self.get_bulk_items(request)
+        if isinstance(items, Response):
+            return items
+
+        serializer = self.get_serializer(data=items, many=True)
+        if not serializer.is_valid():
+            return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.put
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """Update many tools, matched on "id", in one transaction"""
+        items = self.get_bulk_items(request)
+        if isinstance(items, Response):
+            return items
+
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        valid_ids = [pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)]
+        tools = Tool.objects.select_related('location').in_bulk(valid_ids)
+
+        # Resolve every item to its tool before validating field values
+        errors = []
+        seen = set()
+        for pk in ids:
+            if pk is None:
+                errors.append({"id": ["This field is required."]})
+            elif not isinstance(pk, int) or isinstance(pk, bool):
+                # Lists and objects aren't hashable; strings aren't ids
+                errors.append({"id": ["A valid integer is required."]})
+            elif pk not in tools:
+                errors.append({"id": ["Tool not found."]})
+            elif pk in seen:
+                errors.append({"id": ["Duplicate id in request."]})
+            else:
+                errors.append({})
+                seen.add(pk)
+        if any(errors):
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(
+            [tools[pk] for pk in ids], data=items, many=True,
+            partial=request.method == 'PATCH'
+        )
+        if not serializer.is_valid():
+            return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response(serializer.data)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        """
+        Delete many tools with a single DELETE ... WHERE id IN (...).
+        Nothing references a tool, so the per-row delete signals are
+        skipped; tombstones, events and cache invalidation are driven by
+        ``tools_bulk_changed`` instead.
+        """
+        raw = request.data.get('ids') if isinstance(request.data, dict) else request.data
+        if not raw and request.query_params.get('ids'):
+            raw = request.query_params['ids'].split(',')
+        error = Response(
+            {"error": "ids must be a list of integers"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+        # A string would otherwise be read one digit at a time
+        if raw is not None and not isinstance(raw, (list, tuple)):
+            return error
+        try:
+            ids = {int(pk) for pk in raw or []}
+        except (TypeError, ValueError):
+            return error
+        if not ids:
+            return Response(
+                {"error": "ids is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > self.bulk_max_items:
+            return Response(
+                {"error": f"At most {self.bulk_max_items} tools per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            found = set(Tool.objects.filter(id__in=ids).values_list('id', flat=True))
+            Tool.objects.filter(id__in=found)._raw_delete(Tool.objects.db)
+            tools_bulk_changed.send(sender=Tool, action='delete', ids=sorted(found))
+        return Response({
+            "deleted": len(found),
+            "not_found": sorted(ids - found),
+        })
+
+    @action(detail=False, methods=['get'], url_path=r'by-serial/(?P<serial>[^/]+)',
+            url_name='by-serial')
+    def by_serial(self, request, serial=None):
+        """
+        Minimal tool lookup for barcode scanners, served from an in-process
+        LRU cache (see ``tools.serial_cache``) once a serial is warm.
+        """
+        cache = get_serial_cache()
+        payload = cache.get(serial)
+        if payload is None:
+            tool = Tool.objects.select_related('location').filter(serial_number=serial).first()
+            if tool is None:
+                return Response(
+                    {"error": "Tool not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            payload = tool_payload(tool)
+            cache.set(serial, payload)
+            return Response(payload, headers={'X-Cache': 'MISS'})
+        return Response(payload, headers={'X-Cache': 'HIT'})
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over name, serial number and description.
+        Every term in ``?q=`` must match, as a prefix; ``?limit=`` caps the
+        number of results.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {"error": "q is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            return Response(
+                {"error": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tools = search_tools(self.get_queryset(), query, max(limit, 1))
+        serializer = self.get_serializer(tools, many=True)
+        return Response({"query": query, "results": serializer.data})
+
+    # Filters accepted by the collection-level assign_to_workcenter
+    assign_filters = {
+        'location': 'location_id',
+        'calibrated': 'calibrated',
+        'serial_numbers': 'serial_number__in',
+    }
+
+    @action(detail=False, methods=['post'], url_path='assign_to_workcenter',
+            url_name='bulk-assign-to-workcenter')
+    def bulk_assign_to_workcenter(self, request):
+        """
+        Move many tools to a workcenter with one UPDATE. The body names the
+        target ``workcenter_id`` and either ``tool_ids`` or a ``filter`` on
+        location, calibrated and/or serial_numbers.
+        """
+        from workcenters.models import WorkCenter
+
+        workcenter_id = request.data.get('workcenter_id')
+        if not workcenter_id:
+            return Response(
+                {"error": "WorkCenter ID is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        tool_ids = request.data.get('tool_ids')
+        filters = request.data.get('filter')
+        if (tool_ids is None) == (filters is None):
+            return Response(
+                {"error": "Provide either tool_ids or filter"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if tool_ids is not None:
+            error = Response(
+                {"error": "tool_ids must be a list of integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            # A string would otherwise be read one digit at a time
+            if not isinstance(tool_ids, (list, tuple)):
+                return error
+            try:
+                ids = {int(pk) for pk in tool_ids}
+            except (TypeError, ValueError):
+                return error
+            if len(ids) > self.bulk_max_items:
+                return Response(
+                    {"error": f"At most {self.bulk_max_items} tools per request"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            lookup = {'id__in': ids}
+        else:
+            if not isinstance(filters, dict) or not filters:
+                return Response(
+                    {"error": "filter must be a non-empty object"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            unknown = set(filters) - set(self.assign_filters)
+            if unknown:
+                return Response(
+                    {"error": f"Unknown filter(s): {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            serializer = ToolAssignFilterSerializer(data=filters)
+            if not serializer.is_valid():
+                return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+            lookup = {self.assign_filters[key]: value for key, value in serializer.validated_data.items()}
+
+        try:
+            workcenter_exists = WorkCenter.objects.filter(id=workcenter_id).exists()
+        except (TypeError, ValueError):
+            workcenter_exists = False
+        if not workcenter_exists:
+            return Response(
+                {"error": "WorkCenter not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # update() skips auto_now, so updated_at is set explicitly
+        changes = {'location_id': workcenter_id, 'updated_at': timezone.now()}
+        with transaction.atomic():
+            if tool_ids is not None:
+                found = set(Tool.objects.filter(**lookup).values_list('id', flat=True))
+                updated = Tool.objects.filter(id__in=found).update(**changes)
+                not_found = sorted(ids - found)
+                changed = sorted(found)
+            else:
+                updated = Tool.objects.filter(**lookup).update(**changes)
+                not_found = []
+                changed = None
+            tools_bulk_changed.send(sender=Tool, action='assign', ids=changed,
+                                    workcenter_id=int(workcenter_id))
+
+        return Response({
+            "workcenter_id": int(workcenter_id),
+            "updated": updated,
+            "not_found": not_found,
+        })
 
     @action(detail=True, methods=['post'])
     def assign_to_workcenter(self, request, pk=None):
@@ -36,6 +358,8 @@ class ToolViewSet(viewsets.ModelViewSet):
         try:
             workcenter = WorkCenter.objects.get(id=workcenter_id)
             tool.location = workcenter
+            # Published by events.signals in place of tool.updated
+            tool._event_type = 'tool.assigned'
             tool.save()
             return Response(ToolSerializer(tool).data)
         except WorkCenter.DoesNotExist:
@@ -44,29 +368,81 @@ class ToolViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-class ToolsListView(ListView):
+class ToolsListView(CachedListViewMixin, KeysetListViewMixin, ListView):
+    """
+    Tool cards, 50 per page, filtered by ``?location=<workcenter id>``,
+    ``?calibrated=true|false`` and ``?q=`` search. Only the columns the
+    cards show are loaded; the description is cut to a preview in SQL.
+    """
     model = Tool
     template_name = 'tools/tool_list.html'
     context_object_name = 'tools'
+    cache_group = 'tools'
+    # The response-cache version check, then the page, the filter form's
+    # workcenters and the ?location= lookup; a search pages by number
+    # instead, with a COUNT(*)
+    query_budget = 5
+
+    # Columns rendered by tools/tool_cards.html
+    card_columns = ['name', 'serial_number', 'calibrated', 'last_checked_in',
+                    'updated_at', 'location__id', 'location__name']
+    description_preview_length = 50
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_filter_form(self):
+        if not hasattr(self, 'filter_form'):
+            self.filter_form = ToolFilterForm(self.request.GET)
+        return self.filter_form
+
+    def get_queryset(self):
+        queryset = (
+            super().get_queryset()
+            .select_related('location')
+            .only(*self.card_columns)
+            # One character over the limit so truncatechars adds the ellipsis
+            .annotate(description_preview=Substr('description', 1, self.description_preview_length + 1))
+        )
+        queryset = self.get_filter_form().filter(queryset)
+        query = self.get_search_query()
+        if query:
+            queryset = search_tools(queryset, query, MAX_LIMIT)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['q'] = self.get_search_query()
+        context['filter_form'] = self.get_filter_form()
+        context['fragment_cache_timeout'] = settings.FRAGMENT_CACHE_TIMEOUT
+        return context
+
+class ToolCardsView(ToolsListView):
+    """The next page of tool cards, fetched by the list's infinite scroll"""
+    template_name = 'tools/tool_cards.html'
 
 class ToolDetailView(DetailView):
     model = Tool
     template_name = 'tools/tool_detail.html'
     context_object_name = 'tool'
+    query_budget = 1
 
 class ToolCreateView(CreateView):
     model = Tool
     fields = '__all__'
     template_name = 'tools/tool_form.html'
     success_url = reverse_lazy('tools:tool_list')
+    query_budget = 1
 
 class ToolUpdateView(UpdateView):
     model = Tool
     fields = '__all__'
     template_name = 'tools/tool_form.html'
     success_url = reverse_lazy('tools:tool_list')
+    query_budget = 2
 
 class ToolDeleteView(DeleteView):
     model = Tool
     template_name = 'tools/tool_confirm_delete.html'
     success_url = reverse_lazy('tools:tool_list')
+    query_budget = 1
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workcenters', '0003_alter_workcenter_options'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workcenter',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
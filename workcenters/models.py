@@ -1,10 +1,11 @@
 from django.db import models
 
 class WorkCenter(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_index=True)
     location = models.CharField(max_length=100)
     supervisor = models.CharField(max_length=100)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['name']
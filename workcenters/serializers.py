@@ -1,20 +1,65 @@
 from rest_framework import serializers
+from django.db import models
 from .models import WorkCenter
 from tools.models import Tool
+from toolprogram.profiling import ProfiledSerializerMixin
 
-class WorkCenterSerializer(serializers.ModelSerializer):
+# Tool columns embedded in each workcenter's "tools" array
+NESTED_TOOL_FIELDS = ('id', 'name', 'serial_number', 'calibrated')
+
+
+def nested_tools_by_workcenter(workcenter_ids):
+    """
+    Load the nested tool rows for many workcenters in a single query,
+    selecting only the embedded columns as plain dicts.
+    """
+    grouped = {pk: [] for pk in workcenter_ids}
+    if not grouped:
+        return grouped
+    rows = Tool.objects.filter(location_id__in=grouped).values('location_id', *NESTED_TOOL_FIELDS)
+    for row in rows:
+        grouped[row.pop('location_id')].append(row)
+    return grouped
+
+
+def wants_nested_tools(request):
+    """
+    Tools are embedded unless the request passes ``?expand=`` without
+    ``tools`` in its comma-separated list, e.g. ``?expand=`` or
+    ``?expand=none`` for header rows only.
+    """
+    if request is None or 'expand' not in request.query_params:
+        return True
+    expand = request.query_params.get('expand', '')
+    return 'tools' in [part.strip() for part in expand.split(',')]
+
+
+class WorkCenterListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        """Batch-load nested tools for the whole page before serializing"""
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        workcenters = list(iterable)
+        if 'tools' in self.child.fields:
+            self.child.nested_tools = nested_tools_by_workcenter([wc.pk for wc in workcenters])
+        return super().to_representation(workcenters)
+
+
+class WorkCenterSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     tools = serializers.SerializerMethodField()
-    
+
     class Meta:
         model = WorkCenter
         fields = ['id', 'name', 'location', 'supervisor', 'description', 'tools']
-        
+        list_serializer_class = WorkCenterListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.nested_tools = None
+        if not wants_nested_tools(self.context.get('request')):
+            self.fields.pop('tools')
+
     def get_tools(self, obj):
         """Get tools assigned to this work center"""
-        tools = Tool.objects.filter(location=obj)
-        return [{
-            'id': tool.id,
-            'name': tool.name,
-            'serial_number': tool.serial_number,
-            'calibrated': tool.calibrated
-        } for tool in tools]
+        if self.nested_tools is not None and obj.pk in self.nested_tools:
+            return self.nested_tools[obj.pk]
+        return nested_tools_by_workcenter([obj.pk])[obj.pk]
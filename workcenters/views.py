@@ -2,39 +2,71 @@ from rest_framework import viewsets, permissions
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from .models import WorkCenter
-from .serializers import WorkCenterSerializer
+from tools.models import Tool
+from .serializers import WorkCenterSerializer, wants_nested_tools
+from sync.conditional import ConditionalGetMixin
+from toolprogram.cache import CachedListMixin, CachedListViewMixin
+from toolprogram.export import ExportMixin
+from toolprogram.pagination import KeysetListViewMixin
 
-class WorkCenterViewSet(viewsets.ModelViewSet):
+class WorkCenterViewSet(ConditionalGetMixin, CachedListMixin, ExportMixin, viewsets.ModelViewSet):
     """
     API endpoint for workcenters
+
+    Each workcenter embeds its tools; pass ``?expand=`` (without ``tools``)
+    to receive the header rows only.
     """
     queryset = WorkCenter.objects.all()
     serializer_class = WorkCenterSerializer
     permission_classes = [permissions.AllowAny]
+    cache_group = 'workcenters'
+    export_name = 'workcenters'
+    export_fields = ['id', 'name', 'location', 'supervisor', 'description', 'updated_at']
+    # Most queries per GET (see toolprogram.budgets): the ETag version
+    # check, then COUNT(*), the page and one query for all nested tools
+    query_budgets = {'list': 4, 'retrieve': 3, 'export': 1}
+
+    def get_version_models(self):
+        # Embedded tools tie the ETag to the tools table too; header rows
+        # alone (?expand=) stay valid across tool writes
+        if wants_nested_tools(self.request):
+            return [WorkCenter, Tool]
+        return [WorkCenter]
 
-class WorkCenterListView(ListView):
+class WorkCenterListView(CachedListViewMixin, KeysetListViewMixin, ListView):
     model = WorkCenter
     template_name = 'workcenters/workcenter_list.html'
     context_object_name = 'workcenters'
+    cache_group = 'workcenters'
+    # The response-cache version check and the page
+    query_budget = 2
+
+    def get_queryset(self):
+        # Only the columns the list shows
+        return super().get_queryset().only('name')
 
 class WorkCenterDetailView(DetailView):
     model = WorkCenter
     template_name = 'workcenters/workcenter_detail.html'
     context_object_name = 'workcenter'
+    query_budget = 1
 
 class WorkCenterCreateView(CreateView):
     model = WorkCenter
     fields = '__all__'
     template_name = 'workcenters/workcenter_form.html'
     success_url = reverse_lazy('workcenters:workcenter_list')
+    query_budget = 0
 
 class WorkCenterUpdateView(UpdateView):
     model = WorkCenter
     fields = '__all__'
     template_name = 'workcenters/workcenter_form.html'
     success_url = reverse_lazy('workcenters:workcenter_list')
+    query_budget = 1
 
 class WorkCenterDeleteView(DeleteView):
     model = WorkCenter
     template_name = 'workcenters/workcenter_confirm_delete.html'
     success_url = reverse_lazy('workcenters:workcenter_list')
+    query_budget = 1